@@ -33,7 +33,7 @@ async def start_playout(_, message: Message):
     if not group_call:
         return await message.reply_text('You are not joined (type /join)')
 
-    input_filename = 'input.raw'
+    input_filename = 'input.ogg'
 
     status = '- Downloading... \n'
     await message.edit_text(status)
@@ -42,7 +42,7 @@ async def start_playout(_, message: Message):
     status += '- Converting... \n'
 
     ffmpeg.input(audio_original).output(
-        input_filename, format='s16le', acodec='pcm_s16le', ac=2, ar='48k'
+        input_filename, format='ogg', acodec='libopus', ac=2, ar='48k', audio_bitrate='128k'
     ).overwrite_output().run()
 
     os.remove(audio_original)
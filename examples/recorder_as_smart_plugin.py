@@ -15,6 +15,7 @@ import os
 from datetime import datetime
 
 import ffmpeg
+import tgcalls
 from pyrogram import Client, filters
 from pyrogram.types import Message
 
@@ -30,7 +31,9 @@ SECONDS_TO_RECORD = 30
 async def record_from_voice_chat(client: Client, m: Message):
     global GROUP_CALL
     if not GROUP_CALL:
-        GROUP_CALL = GroupCallFactory(client, path_to_log_file='').get_file_group_call()
+        GROUP_CALL = GroupCallFactory(client, path_to_log_file='').get_file_group_call(
+            output_format=tgcalls.AudioFileFormat.OggOpus
+        )
 
     GROUP_CALL.add_handler(network_status_changed_handler, GroupCallFileAction.NETWORK_STATUS_CHANGED)
 
@@ -50,20 +53,16 @@ async def record_and_send_opus_and_stop(context):
     chat_id = int(f'-100{context.full_chat.id}')
     chat_info = await context.client.get_chat(chat_id)
 
-    status_msg = await context.client.send_message(chat_id, '1/3 Recording...')
+    status_msg = await context.client.send_message(chat_id, '1/2 Recording...')
 
     utcnow_unix, utcnow_readable = get_utcnow()
-    record_raw_filename, record_opus_filename = f'vcrec-{utcnow_unix}.raw', f'vcrec-{utcnow_unix}.opus'
-    context.output_filename = record_raw_filename
+    # encoded to Ogg/Opus natively
+    record_opus_filename = f'vcrec-{utcnow_unix}.opus'
+    context.output_filename = record_opus_filename
 
     await asyncio.sleep(SECONDS_TO_RECORD)
     context.stop_output()
 
-    await status_msg.edit_text('2/3 Transcoding...')
-    ffmpeg.input(record_raw_filename, format='s16le', acodec='pcm_s16le', ac=2, ar='48k', loglevel='error').output(
-        record_opus_filename
-    ).overwrite_output().run()
-
     record_probe = ffmpeg.probe(record_opus_filename, pretty=None)
 
     stream = record_probe['streams'][0]
@@ -87,7 +86,7 @@ async def record_and_send_opus_and_stop(context):
     if chat_info.photo:
         thumb_file = await context.client.download_media(chat_info.photo.big_file_id)
 
-    await status_msg.edit_text('3/3 Uploading...')
+    await status_msg.edit_text('2/2 Uploading...')
     await context.client.send_audio(
         chat_id,
         record_opus_filename,
@@ -103,7 +102,7 @@ async def record_and_send_opus_and_stop(context):
 
     if thumb_file:
         os.remove(thumb_file)
-    [os.remove(f) for f in (record_raw_filename, record_opus_filename, thumb_file)]
+    os.remove(record_opus_filename)
 
 
 def get_utcnow():
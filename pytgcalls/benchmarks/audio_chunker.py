@@ -0,0 +1,94 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+"""CPU cost of cutting decoded PCM into 10 ms chunks, per stream-hour.
+
+Compares the old bytes concatenation + Queue path of AudioStream with AudioChunkRing.
+Decoding is not included, only the chunking stage.
+
+Run from the pytgcalls directory: python benchmarks/audio_chunker.py
+"""
+
+import os
+import sys
+import time
+from queue import Queue
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pytgcalls.utils import AudioChunkRing, DEFAULT_REQUESTED_AUDIO_BYTES_LENGTH  # noqa: E402
+
+CHUNK_SIZE = DEFAULT_REQUESTED_AUDIO_BYTES_LENGTH
+SAMPLES_PER_DECODED_FRAME = 1152  # mp3
+DECODED_FRAMES_PER_HOUR = 48000 * 3600 // SAMPLES_PER_DECODED_FRAME
+SIMULATED_SECONDS = 600
+
+
+def bytes_and_queue(frames):
+    queue = Queue(maxsize=16)
+    frame_tail = b''
+    for frame in frames:
+        frame_bytes = frame_tail + frame.tobytes()
+        cut_frames = [frame_bytes[i : i + CHUNK_SIZE] for i in range(0, len(frame_bytes), CHUNK_SIZE)]
+
+        for cut_frame in cut_frames:
+            if len(cut_frame) == CHUNK_SIZE:
+                queue.put(cut_frame)
+            else:
+                frame_tail = cut_frame
+
+        while not queue.empty():
+            queue.get_nowait()
+
+
+def chunk_ring(frames):
+    ring = AudioChunkRing(CHUNK_SIZE, 16)
+    for frame in frames:
+        ring.write(memoryview(frame).cast('B'))
+
+        while ring.read() is not None:
+            pass
+
+
+def measure(func, frames) -> float:
+    started_at = time.process_time()
+    func(frames)
+    return time.process_time() - started_at
+
+
+def main():
+    frames_count = DECODED_FRAMES_PER_HOUR * SIMULATED_SECONDS // 3600
+    frames = [
+        np.random.randint(-(2**15), 2**15, size=(1, SAMPLES_PER_DECODED_FRAME), dtype=np.int16)
+        for _ in range(frames_count)
+    ]
+
+    scale = 3600 / SIMULATED_SECONDS
+    before = measure(bytes_and_queue, frames) * scale
+    after = measure(chunk_ring, frames) * scale
+
+    print(f'bytes + Queue:  {before:.3f} CPU seconds per stream-hour')
+    print(f'AudioChunkRing: {after:.3f} CPU seconds per stream-hour')
+    print(f'speedup:        {before / after:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+"""Resampling of AudioStream for the matrix of input sample rates and channels.
+
+For every input a sine WAV file is generated and decoded by AudioStream to the native format.
+Duration and pitch (zero crossings) of the output must match the input, otherwise audio plays
+faster/slower. The same check is asserted by tests/test_audio_stream.py, here CPU cost of decoding
+and resampling is printed per stream-hour.
+
+Run from the pytgcalls directory: python benchmarks/audio_sample_rates.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pytgcalls.utils import AudioStream, DEFAULT_AUDIO_CHANNELS, DEFAULT_AUDIO_SAMPLE_RATE  # noqa: E402
+
+INPUT_SAMPLE_RATES = (8000, 16000, 22050, 32000, 44100, 48000, 96000)
+INPUT_CHANNELS = (1, 2)
+TONE_FREQUENCY = 1000
+DURATION_SECONDS = 10
+# allowed deviation of duration and pitch
+TOLERANCE = 0.01
+
+
+def generate_wav(path: str, sample_rate: int, channels: int):
+    t = np.arange(sample_rate * DURATION_SECONDS) / sample_rate
+    # phase shift keeps zero crossings away from sample points
+    samples = (np.sin(2 * np.pi * TONE_FREQUENCY * t + 0.1) * 16000).astype(np.int16)
+
+    with wave.open(path, 'wb') as file:
+        file.setnchannels(channels)
+        file.setsampwidth(2)
+        file.setframerate(sample_rate)
+        file.writeframes(np.repeat(samples, channels).tobytes())
+
+
+def decode(path: str, sample_rate: int, channels: int) -> (np.ndarray, float):
+    ended = False
+
+    def on_end(_):
+        nonlocal ended
+        ended = True
+
+    stream = AudioStream(path, False, on_end, sample_rate=sample_rate, channels=channels)
+
+    pcm = bytearray()
+    started_at = time.process_time()
+    # chunks are read the same as by the native playout thread, the end is reported after the last one
+    stream.start()
+    while not ended:
+        chunk = stream.read()
+        if chunk is None:
+            time.sleep(0.001)
+            continue
+        pcm += chunk
+    stream.stop()
+    cpu_time = time.process_time() - started_at
+
+    # first channel is enough for the pitch
+    return np.frombuffer(pcm, dtype=np.int16)[::channels], cpu_time
+
+
+def measure_frequency(samples: np.ndarray, sample_rate: int) -> float:
+    crossings = np.count_nonzero(np.diff(np.signbit(samples)))
+    return crossings / 2 / (len(samples) / sample_rate)
+
+
+def main():
+    sample_rate, channels = DEFAULT_AUDIO_SAMPLE_RATE, DEFAULT_AUDIO_CHANNELS
+    print(f'output: {sample_rate} Hz, {channels} channel(s)')
+    print(f'{"input":>16} {"duration, s":>12} {"pitch, Hz":>10} {"CPU s/hour":>11}')
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for input_sample_rate in INPUT_SAMPLE_RATES:
+            for input_channels in INPUT_CHANNELS:
+                path = os.path.join(directory, f'{input_sample_rate}_{input_channels}.wav')
+                generate_wav(path, input_sample_rate, input_channels)
+
+                samples, cpu_time = decode(path, sample_rate, channels)
+                duration = len(samples) / sample_rate
+                frequency = measure_frequency(samples, sample_rate)
+
+                ok = (
+                    abs(duration - DURATION_SECONDS) / DURATION_SECONDS <= TOLERANCE
+                    and abs(frequency - TONE_FREQUENCY) / TONE_FREQUENCY <= TOLERANCE
+                )
+                failed |= not ok
+
+                print(
+                    f'{input_sample_rate:>8} Hz x {input_channels} {duration:>12.3f} {frequency:>10.1f} '
+                    f'{cpu_time * 3600 / DURATION_SECONDS:>11.3f} {"ok" if ok else "FAIL"}'
+                )
+
+    sys.exit(int(failed))
+
+
+if __name__ == '__main__':
+    main()
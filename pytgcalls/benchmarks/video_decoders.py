@@ -0,0 +1,108 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+"""Decoding speed of VideoStream (OpenCV) and AVVideoStream (PyAV) on the same files.
+
+Every frame is decoded into the format passed to the native side (BGR for OpenCV, I420 for PyAV).
+Wall time shows the achievable FPS, CPU time includes decoding threads of the codec.
+Output sizes of scaled frames are checked by tests/test_video_stream.py.
+
+Run from the pytgcalls directory: python benchmarks/video_decoders.py [file ...]
+Without files a 1080p H.264 clip is generated.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import av
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pytgcalls.utils import AVVideoStream, VideoStream  # noqa: E402
+
+GENERATED_WIDTH = 1920
+GENERATED_HEIGHT = 1080
+GENERATED_FPS = 30
+GENERATED_SECONDS = 10
+
+
+def generate_video(path: str):
+    codec = 'libx264' if 'libx264' in av.codecs_available else 'mpeg4'
+    container = av.open(path, 'w')
+    stream = container.add_stream(codec, rate=GENERATED_FPS)
+    stream.width = GENERATED_WIDTH
+    stream.height = GENERATED_HEIGHT
+    stream.pix_fmt = 'yuv420p'
+
+    # moving noise, so the encoder can't skip the work
+    noise = np.random.randint(0, 256, (GENERATED_HEIGHT, GENERATED_WIDTH + GENERATED_FPS, 3), dtype=np.uint8)
+    for i in range(GENERATED_FPS * GENERATED_SECONDS):
+        image = np.ascontiguousarray(noise[:, i % GENERATED_FPS : i % GENERATED_FPS + GENERATED_WIDTH])
+        for packet in stream.encode(av.VideoFrame.from_ndarray(image, format='rgb24')):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+
+    container.close()
+
+
+def decode(stream_class, path: str) -> (int, int, float, float):
+    ended = False
+
+    def on_end(_):
+        nonlocal ended
+        ended = True
+
+    stream = stream_class(path, False, on_end)
+
+    frames = frame_size = 0
+    started_at, cpu_started_at = time.perf_counter(), time.process_time()
+    while not ended:
+        frame = stream.get_next_frame()
+        if frame is not None:
+            frames += 1
+            frame_size = frame.nbytes
+    wall_time, cpu_time = time.perf_counter() - started_at, time.process_time() - cpu_started_at
+
+    stream._release()
+    return frames, frame_size, wall_time, cpu_time
+
+
+def main():
+    paths = sys.argv[1:]
+    with tempfile.TemporaryDirectory() as directory:
+        if not paths:
+            paths = [os.path.join(directory, 'generated.mp4')]
+            generate_video(paths[0])
+
+        print(f'{"file":>20} {"decoder":>14} {"frames":>7} {"frame, KB":>10} {"FPS":>8} {"CPU s":>7}')
+        for path in paths:
+            for stream_class in (VideoStream, AVVideoStream):
+                frames, frame_size, wall_time, cpu_time = decode(stream_class, path)
+                print(
+                    f'{os.path.basename(path)[-20:]:>20} {stream_class.__name__:>14} {frames:>7} '
+                    f'{frame_size / 1024:>10.0f} {frames / wall_time:>8.1f} {cpu_time:>7.2f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
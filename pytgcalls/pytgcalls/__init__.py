@@ -22,12 +22,16 @@ from pytgcalls.exceptions import PytgcallsError
 from pytgcalls.group_call_factory import GroupCallFactory
 from pytgcalls.implementation.group_call_file import GroupCallFileAction
 from pytgcalls.implementation.group_call_base import GroupCallBaseAction
+from pytgcalls.utils import AudioRecordDropPolicy, AudioRecordSink, VideoEncoderConfig
 
 
 __all__ = [
     'GroupCallFactory',
     'GroupCallFileAction',
     'GroupCallBaseAction',
+    'AudioRecordSink',
+    'AudioRecordDropPolicy',
+    'VideoEncoderConfig',
 ]
 __version__ = '3.0.0.dev23'
 __pdoc__ = {
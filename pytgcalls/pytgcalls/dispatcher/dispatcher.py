@@ -84,6 +84,13 @@ class Dispatcher:
     def trigger_handlers(self, action: str, instance: 'GroupCallNative', *args, **kwargs):
         logger.debug(f'Trigger {action} handlers...')
 
+        loop = instance.get_event_loop()
         for handler in self.get_handlers(action):
             logger.debug(f'Trigger {handler.__name__}...')
-            instance.get_event_loop().create_task(handler(instance, *args, **kwargs))
+            coroutine = handler(instance, *args, **kwargs)
+            try:
+                # actions are also triggered by native and worker threads
+                loop.call_soon_threadsafe(loop.create_task, coroutine)
+            except RuntimeError:
+                logger.debug('Event loop is closed.')
+                coroutine.close()
@@ -21,6 +21,8 @@ import importlib
 from importlib.util import find_spec
 from typing import Callable, Optional, Union
 
+import tgcalls
+
 from pytgcalls.exceptions import PytgcallsBaseException, PytgcallsError
 from pytgcalls.group_call_type import GroupCallType
 from pytgcalls.implementation.group_call import GroupCall
@@ -89,16 +91,24 @@ class GroupCallFactory:
             **kwargs,
         )
 
-    def get_group_call(self) -> GroupCall:
+    def get_group_call(
+        self, video_content_type: 'tgcalls.VideoContentType' = tgcalls.VideoContentType.Generic
+    ) -> GroupCall:
         return GroupCall(
             self.get_mtproto_bridge(),
             self.enable_logs_to_console,
             self.path_to_log_file,
             self.outgoing_audio_bitrate_kbit,
+            video_content_type,
         )
 
     def get_file_group_call(
-        self, input_filename: Optional[str] = None, output_filename: Optional[str] = None, play_on_repeat=True
+        self,
+        input_filename: Optional[str] = None,
+        output_filename: Optional[str] = None,
+        play_on_repeat=True,
+        output_format: Optional['tgcalls.AudioFileFormat'] = None,
+        detect_output_format=False,
     ) -> GroupCallFile:
         return GroupCallFile(
             self.get_mtproto_bridge(),
@@ -108,6 +118,8 @@ class GroupCallFactory:
             self.enable_logs_to_console,
             self.path_to_log_file,
             self.outgoing_audio_bitrate_kbit,
+            output_format,
+            detect_output_format,
         )
 
     def get_device_group_call(
@@ -127,6 +139,10 @@ class GroupCallFactory:
         on_played_data: Callable[['GroupCallRaw', int], bytes] = None,
         on_recorded_data: Callable[['GroupCallRaw', bytes, int], None] = None,
         on_video_played_data: Callable[['GroupCallRaw'], bytes] = None,
+        use_audio_buffer_views=False,
+        audio_input_buffer_ms: Optional[int] = None,
+        callback_period_ms=10,
+        video_content_type: 'tgcalls.VideoContentType' = tgcalls.VideoContentType.Generic,
     ) -> GroupCallRaw:
         return GroupCallRaw(
             self.get_mtproto_bridge(),
@@ -136,4 +152,8 @@ class GroupCallFactory:
             self.enable_logs_to_console,
             self.path_to_log_file,
             self.outgoing_audio_bitrate_kbit,
+            use_audio_buffer_views,
+            audio_input_buffer_ms,
+            callback_period_ms,
+            video_content_type,
         )
@@ -17,12 +17,30 @@
 #  You should have received a copy of the GNU Lesser General Public License v3
 #  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
 
+import warnings
 from enum import Enum
-from typing import Callable, Optional
+from typing import AsyncIterator, Callable, Optional, Union
 
+import cv2
+
+import tgcalls
 from pytgcalls.dispatcher import Action, DispatcherMixin
 from pytgcalls.implementation import GroupCallRaw, GroupCallBaseAction
-from pytgcalls.utils import AudioStream, VideoStream
+from pytgcalls.utils import (
+    AUDIO_BUFFER_HIGH_WATERMARK_MS,
+    AUDIO_BUFFER_LOW_WATERMARK_MS,
+    AVVideoStream,
+    AsyncAudioStream,
+    AudioJitterBuffer,
+    AudioRecordSink,
+    AudioStream,
+    MediaDemuxer,
+    VIDEO_STATIC_FRAME_FPS,
+    VideoDecodeAheadBuffer,
+    VideoEncoderConfig,
+    VideoInfo,
+    VideoStream,
+)
 
 
 class MediaType(Enum):
@@ -87,6 +105,7 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
         enable_logs_to_console=False,
         path_to_log_file=None,
         outgoing_audio_bitrate_kbit=128,
+        video_content_type: 'tgcalls.VideoContentType' = tgcalls.VideoContentType.Generic,
     ):
         super().__init__(
             mtproto_bridge,
@@ -96,9 +115,22 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
             enable_logs_to_console,
             path_to_log_file,
             outgoing_audio_bitrate_kbit,
+            use_audio_buffer_views=True,
+            video_content_type=video_content_type,
         )
         super(GroupCallDispatcherMixin, self).__init__(GroupCallAction)
 
+        # recorded data is used only by start_audio_record
+        self.pause_recording()
+        self.__update_native_playout_pause()
+
+    def __update_native_playout_pause(self):
+        # the native thread doesn't call Python at all when there is nothing to play
+        if self.is_audio_running and not self.is_audio_paused:
+            self.resume_playout()
+        else:
+            self.pause_playout()
+
     def __trigger_on_video_playout_ended(self, source):
         self.trigger_handlers(GroupCallAction.VIDEO_PLAYOUT_ENDED, self, source)
 
@@ -113,6 +145,12 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
         self.__trigger_on_media_playout_ended(source, MediaType.VIDEO)
 
     def __combined_audio_trigger(self, source):
+        # called by threads of streams. The stream has already stopped itself at the end,
+        # so the state of playout is decided on the loop after that
+        self.get_event_loop().call_soon_threadsafe(self.__on_audio_playout_ended, source)
+
+    def __on_audio_playout_ended(self, source):
+        self.__update_native_playout_pause()
         self.__trigger_on_audio_playout_ended(source)
         self.__trigger_on_media_playout_ended(source, MediaType.AUDIO)
 
@@ -122,9 +160,9 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
             return self._video_stream.read()
 
     @staticmethod
-    def __on_audio_played_data(self: 'GroupCallRaw', length: int) -> bytes:
+    def __on_audio_played_data(self: 'GroupCallRaw', buffer: memoryview, length: int):
         if self._audio_stream:
-            return self._audio_stream.read(length)
+            self._audio_stream.read_into(buffer)
 
     @staticmethod
     def __on_audio_recorded_data(self, data, length):
@@ -138,7 +176,15 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
         return await self.stop()
 
     async def start_video(
-        self, source: Optional[str] = None, with_audio=True, repeat=True, enable_experimental_lip_sync=False
+        self,
+        source: Optional[str] = None,
+        with_audio=True,
+        repeat=True,
+        enable_experimental_lip_sync=False,
+        use_pyav_decoder=False,
+        encoder_config: Optional[VideoEncoderConfig] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
     ):
         """Enable video playing for current group call.
 
@@ -148,55 +194,211 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
 
             To use device camera you need to pass device index as int to the `source` arg.
 
+            PyAV decoder uses several threads and sends I420 frames without color conversions.
+            Use it for high resolution files and streams. It doesn't support capturing devices.
+            Frames are scaled to `width` and `height` by PyAV, so it's used when any of them is passed.
+
+            With lip sync the source is opened once and audio and video are decoded by PyAV. Video frames are
+            shown by their pts when the same moment of audio is played, so audio and video are always in sync.
+            Measured difference is available in `av_drift_ms`. Pausing of audio pauses video too.
+            Without it audio is played by `start_audio` from the same source.
+
         Args:
             source (`str`): Path to filename or device index or URL with some protocol. For example RTCP.
             with_audio (`bool`): Get and play audio stream from video source.
             repeat (`bool`): rewind video when end of file.
-            enable_experimental_lip_sync (`bool`): enable experimental lip sync feature.
+            enable_experimental_lip_sync (`bool`): Sync video with audio by pts. Used only with audio.
+                PyAV decoder is always used with it.
+            use_pyav_decoder (`bool`): decode video with PyAV instead of OpenCV.
+            encoder_config (`VideoEncoderConfig`, optional): Bitrate, resolution and frame rate of outgoing video.
+                The previous config is kept by default.
+            width (`int`, optional): Width of decoded frames. Width of the source by default.
+            height (`int`, optional): Height of decoded frames. Height of the source by default.
+                When only one of them is passed, the other one keeps the aspect ratio of the source.
         """
 
+        if encoder_config:
+            self.set_video_encoder_config(encoder_config)
+
         if self._video_stream and self._video_stream.is_running:
             self._video_stream.stop()
 
-        self._video_stream = VideoStream(source, repeat, self.__combined_video_trigger)
-        self._configure_video_capture(self._video_stream.get_video_info())
+        if with_audio and enable_experimental_lip_sync:
+            if self._audio_stream and self._audio_stream.is_running:
+                self._audio_stream.stop()
+
+            demuxer = MediaDemuxer(
+                source,
+                repeat,
+                self.__combined_audio_trigger,
+                self.__combined_video_trigger,
+                sample_rate=self.audio_sample_rate,
+                channels=self.audio_channels,
+                width=width,
+                height=height,
+            )
+            self._video_stream, self._audio_stream = demuxer.video, demuxer.audio
+            self._configure_video_capture(demuxer.get_video_info())
+            demuxer.start()
+
+            self.__update_native_playout_pause()
+            if self.is_connected:
+                await self.edit_group_call(muted=False)
+        else:
+            if use_pyav_decoder or width or height:
+                self._video_stream = AVVideoStream(
+                    source, repeat, self.__combined_video_trigger, width=width, height=height
+                )
+            else:
+                self._video_stream = VideoStream(source, repeat, self.__combined_video_trigger)
+            self._configure_video_capture(self._video_stream.get_video_info())
+
+            if with_audio:
+                await self.start_audio(source, repeat)
+            self._video_stream.start()
+
+        self._is_video_stopped = False
+        if self.is_connected:
+            await self.edit_group_call(video_stopped=False)
+
+    async def start_image(self, source: Union[str, 'numpy.ndarray'], fps=VIDEO_STATIC_FRAME_FPS):
+        """Show a still image as video. Call it again with another image for a slideshow.
+
+        Note:
+            The image is converted once and sent by the native side, Python isn't called for frames.
+            Current video is stopped.
+
+        Args:
+            source (`str` | `numpy.ndarray`): Path to an image file or an image array in OpenCV layout:
+                BGR or BGRA with (height, width, channels) shape, or grayscale with (height, width) shape.
+            fps (`float`, optional): Frame rate of sending the image.
+        """
+
+        image = cv2.imread(source) if isinstance(source, str) else source
+        if image is None:
+            raise RuntimeError(f'Cant read image {source}')
+
+        if image.ndim == 2 or image.shape[2] == 1:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        elif image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
+
+        height, width, channels = image.shape
+        pixel_format = tgcalls.PixelFormat.RGBA if channels == 4 else tgcalls.PixelFormat.BGR
+
+        if self._video_stream and self._video_stream.is_running:
+            self._video_stream.stop()
+        self._video_stream = None
 
-        if with_audio:
-            await self.start_audio(source, repeat, self._video_stream if enable_experimental_lip_sync else None)
-        self._video_stream.start()
+        # slides of the same geometry don't need a new video capture
+        video_info = VideoInfo(width, height, fps, pixel_format)
+        if vars(video_info) != vars(self.video_info):
+            self._configure_video_capture(video_info)
+        self.set_static_video_frame(image)
 
         self._is_video_stopped = False
         if self.is_connected:
             await self.edit_group_call(video_stopped=False)
 
-    async def start_audio(self, source: Optional[str] = None, repeat=True, video_stream: Optional[VideoStream] = None):
+    async def start_audio(
+        self,
+        source: Optional[Union[str, AsyncIterator[bytes]]] = None,
+        repeat=True,
+        video_stream: Optional[VideoStream] = None,
+        buffer_low_watermark_ms=AUDIO_BUFFER_LOW_WATERMARK_MS,
+        buffer_high_watermark_ms=AUDIO_BUFFER_HIGH_WATERMARK_MS,
+        cache_decoded_audio=False,
+    ):
         """Enable audio playing for current group call.
 
         Note:
             Source is audio file or direct URL to file or audio live stream.
 
+            Source can also be an async iterator (async generator) of PCM in the native format
+            (`audio_sample_rate`, `audio_channels`, 16-bit). It's consumed on the event loop only when
+            the buffer has room, so slow generators like TTS don't need a thread. `repeat`
+            and `cache_decoded_audio` are ignored for such sources. The playout ends when the iterator
+            is exhausted or raises, see `audio_error`.
+
             If the source is None then empty bytes will be sent.
 
+            Sources with unstable reading speed (network streams) need bigger watermarks.
+            Local files can work with smaller ones to reduce latency of pausing.
+
         Args:
-            source (`str`, optional): Path to filename or URL to audio file or URL to live stream.
+            source (`str` | `AsyncIterator[bytes]`, optional): Path to filename or URL to audio file
+                or URL to live stream or async iterator of PCM.
             repeat (`bool`, optional): rewind audio when end of file.
-            video_stream (`VideoStream`, optional): stream to sync.
+            video_stream (`VideoStream`, optional): Deprecated and ignored. Use `start_video` with lip sync.
+            buffer_low_watermark_ms (`int`, optional): Buffered audio required to start or resume playing.
+            buffer_high_watermark_ms (`int`, optional): Max buffered audio. Decoding waits when it's reached.
+            cache_decoded_audio (`bool`, optional): Keep decoded audio of the first pass in a temporary file
+                and replay it without decoding on next loops. Works only with `repeat` and for finite sources.
         """
 
+        if video_stream is not None:
+            warnings.warn(
+                'video_stream is ignored, use start_video with enable_experimental_lip_sync',
+                DeprecationWarning,
+                stacklevel=2,
+            )
+
         if self._audio_stream and self._audio_stream.is_running:
             self._audio_stream.stop()
 
-        if source is not None:
+        if hasattr(source, '__aiter__'):
+            self._audio_stream = AsyncAudioStream(
+                source,
+                self.__combined_audio_trigger,
+                sample_rate=self.audio_sample_rate,
+                channels=self.audio_channels,
+                buffer_low_watermark_ms=buffer_low_watermark_ms,
+                buffer_high_watermark_ms=buffer_high_watermark_ms,
+            ).start()
+        elif source is not None:
             self._audio_stream = AudioStream(
-                source, repeat, self.__combined_audio_trigger, video_stream=video_stream
+                source,
+                repeat,
+                self.__combined_audio_trigger,
+                sample_rate=self.audio_sample_rate,
+                channels=self.audio_channels,
+                buffer_low_watermark_ms=buffer_low_watermark_ms,
+                buffer_high_watermark_ms=buffer_high_watermark_ms,
+                cache_decoded_audio=cache_decoded_audio,
             ).start()
+        self.__update_native_playout_pause()
 
         if self.is_connected:
             await self.edit_group_call(muted=False)
 
-    async def start_audio_record(self, path):
-        # TODO
-        pass
+    async def start_audio_record(self, path: str, **kwargs):
+        """Start recording of the group call audio to the file.
+
+        Note:
+            Audio is written as raw 16-bit PCM in the native format (`audio_sample_rate`, `audio_channels`)
+            on a separate thread, so slow disks don't delay the native audio thread.
+
+        Args:
+            path (`str`): Path to the output file. It will be overwritten.
+            **kwargs: Batch size, queue size and drop policy passed to `AudioRecordSink`.
+        """
+
+        await self.stop_audio_record()
+
+        sink = AudioRecordSink.to_file(path, sample_rate=self.audio_sample_rate, channels=self.audio_channels, **kwargs)
+        self.set_audio_record_sink(sink.start())
+        self.resume_recording()
+
+    async def stop_audio_record(self):
+        """Stop recording and write the rest of audio to the file."""
+
+        sink = self.audio_record_sink
+        if sink is None:
+            return
+
+        self.pause_recording()
+        self.set_audio_record_sink(None)
+        await self.get_event_loop().run_in_executor(None, sink.stop)
 
     async def set_video_pause(self, pause: bool, with_mtproto=True):
         self._is_video_paused = pause
@@ -211,6 +413,7 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
             await self.edit_group_call(muted=pause)
         if self._audio_stream:
             self._audio_stream.set_pause(pause)
+        self.__update_native_playout_pause()
 
     async def set_pause(self, pause: bool):
         await self.set_video_pause(pause, False)
@@ -223,6 +426,7 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
     async def stop_audio(self, with_mtproto=True):
         if self._audio_stream and self._audio_stream.is_running:
             self._audio_stream.stop()
+        self.__update_native_playout_pause()
 
         if self.is_connected and with_mtproto:
             await self.edit_group_call(muted=True)
@@ -230,6 +434,8 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
     async def stop_video(self, with_mtproto=True):
         if self._video_stream and self._video_stream.is_running:
             self._video_stream.stop()
+        if self.is_group_call_native_created():
+            self.clear_static_video_frame()
 
         if self.is_connected and with_mtproto:
             await self.edit_group_call(video_stopped=True)
@@ -258,6 +464,42 @@ class GroupCall(GroupCallRaw, GroupCallDispatcherMixin):
     def is_video_running(self):
         return self._video_stream and self._video_stream.is_running
 
+    @property
+    def audio_buffer(self) -> Optional[AudioJitterBuffer]:
+        """Buffer of the current audio stream with underruns, padded frames, overruns and depth counters."""
+
+        return self._audio_stream.buffer if self._audio_stream else None
+
+    @property
+    def video_buffer(self) -> Optional[VideoDecodeAheadBuffer]:
+        """Decode-ahead buffer of the current video stream with repeated, dropped and late frames counters.
+
+        Note:
+            Not available for video started with lip sync, see `av_drift_ms` for it.
+        """
+
+        return getattr(self._video_stream, 'buffer', None)
+
+    @property
+    def av_drift_ms(self) -> Optional[float]:
+        """Difference between pts of the shown video frame and played audio. Negative when video is behind.
+
+        Note:
+            Available only for video started with lip sync.
+        """
+
+        return getattr(self._video_stream, 'drift_ms', None)
+
+    @property
+    def audio_error(self) -> Optional[Exception]:
+        """Exception raised by the async iterator of the current audio source. None when it wasn't raised.
+
+        Note:
+            It's set before audio playout ended handlers are triggered, so they can tell a failure from the end.
+        """
+
+        return getattr(self._audio_stream, 'error', None)
+
     @property
     def is_audio_running(self):
         return self._audio_stream and self._audio_stream.is_running
@@ -84,6 +84,7 @@ class GroupCallBase(ABC, GroupCallBaseDispatcherMixin, GroupCallNative):
         enable_logs_to_console: bool,
         path_to_log_file: str,
         outgoing_audio_bitrate_kbit: int,
+        video_content_type: 'tgcalls.VideoContentType' = tgcalls.VideoContentType.Generic,
     ):
         GroupCallNative.__init__(
             self,
@@ -92,6 +93,7 @@ class GroupCallBase(ABC, GroupCallBaseDispatcherMixin, GroupCallNative):
             enable_logs_to_console,
             path_to_log_file,
             outgoing_audio_bitrate_kbit,
+            video_content_type,
         )
         GroupCallBaseDispatcherMixin.__init__(self, GroupCallBaseAction)
 
@@ -17,22 +17,37 @@
 #  You should have received a copy of the GNU Lesser General Public License v3
 #  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Callable
+import os
+from typing import Callable, List, Optional
 
 import tgcalls
 from pytgcalls.implementation import GroupCallBase, GroupCallBaseAction, GroupCallBaseDispatcherMixin
 from pytgcalls.dispatcher import Action
 
 
+OUTPUT_FORMAT_BY_EXTENSION = {
+    '.wav': tgcalls.AudioFileFormat.Wav,
+    '.ogg': tgcalls.AudioFileFormat.OggOpus,
+    '.opus': tgcalls.AudioFileFormat.OggOpus,
+    '.oga': tgcalls.AudioFileFormat.OggOpus,
+}
+
+
 class GroupCallFileAction(GroupCallBaseAction):
     PLAYOUT_ENDED = Action()
-    '''When a input file is ended.'''
+    '''When a input file is ended. Triggered for every file of the queue too.'''
+    RECORDING_SEGMENT_COMPLETED = Action()
+    '''When a output file is completed and closed. Triggered for every segment of the recording.'''
 
 
 class GroupCallFileDispatcherMixin(GroupCallBaseDispatcherMixin):
     def on_playout_ended(self, func: Callable) -> Callable:
         """When a input file is ended.
 
+        Note:
+            Triggered for every played file of the queue. Queued files which can't be opened
+            are skipped and reported as ended too.
+
         Args:
             func (`Callable`): A functions that accept group_call and filename args.
 
@@ -42,6 +57,22 @@ class GroupCallFileDispatcherMixin(GroupCallBaseDispatcherMixin):
 
         return self.add_handler(func, GroupCallFileAction.PLAYOUT_ENDED)
 
+    def on_recording_segment_completed(self, func: Callable) -> Callable:
+        """When a output file is completed and closed, so it can be uploaded or moved.
+
+        Note:
+            Triggered for every segment while recording continues and for the last file when output is stopped.
+            Without segment limits it's triggered once for the whole output file.
+
+        Args:
+            func (`Callable`): A functions that accept group_call and filename args.
+
+        Returns:
+            `Callable`: passed to args callback function.
+        """
+
+        return self.add_handler(func, GroupCallFileAction.RECORDING_SEGMENT_COMPLETED)
+
 
 class GroupCallFile(GroupCallBase, GroupCallFileDispatcherMixin):
     def __init__(
@@ -53,53 +84,95 @@ class GroupCallFile(GroupCallBase, GroupCallFileDispatcherMixin):
         enable_logs_to_console=False,
         path_to_log_file=None,
         outgoing_audio_bitrate_kbit=128,
+        output_format: Optional['tgcalls.AudioFileFormat'] = None,
+        detect_output_format=False,
     ):
         super().__init__(mtproto_bridge, enable_logs_to_console, path_to_log_file, outgoing_audio_bitrate_kbit)
         super(GroupCallFileDispatcherMixin, self).__init__(GroupCallFileAction)
 
-        self.play_on_repeat = play_on_repeat
-        '''When the file ends, play it again'''
-        self.__is_playout_paused = False
-        self.__is_recording_paused = False
-
-        self.__input_filename = input_filename or ''
-        self.__output_filename = output_filename or ''
-
-        self.__file_audio_device_descriptor = None
-
-    def __create_and_return_file_audio_device_descriptor(self):
         self.__file_audio_device_descriptor = tgcalls.FileAudioDeviceDescriptor()
-        self.__file_audio_device_descriptor.getInputFilename = self.__get_input_filename_callback
-        self.__file_audio_device_descriptor.getOutputFilename = self.__get_output_filename_callback
-        self.__file_audio_device_descriptor.isEndlessPlayout = self.__is_endless_playout_callback
-        self.__file_audio_device_descriptor.isPlayoutPaused = self.__is_playout_paused_callback
-        self.__file_audio_device_descriptor.isRecordingPaused = self.__is_recording_paused_callback
         self.__file_audio_device_descriptor.playoutEndedCallback = self.__playout_ended_callback
+        self.__file_audio_device_descriptor.recordingSegmentCompletedCallback = (
+            self.__recording_segment_completed_callback
+        )
+
+        self.__output_format = output_format
+        self.__detect_output_format = detect_output_format
 
-        return self.__file_audio_device_descriptor
+        self.play_on_repeat = play_on_repeat
+        self.input_filename = input_filename
+        self.output_filename = output_filename
 
     def _setup_and_start_group_call(self):
-        self._start_native_group_call(self.__create_and_return_file_audio_device_descriptor())
+        self._start_native_group_call(self.__file_audio_device_descriptor)
 
     def stop_playout(self):
-        """Stop playing of file."""
+        """Stop playing of file and clear the queue."""
 
+        self.clear_queue()
         self.input_filename = ''
 
+    def enqueue(self, filename: str):
+        """Add the file to the queue of playout.
+
+        Note:
+            The next file is opened and read ahead before the current one ends, so files are
+            changed without restart of playout and without a gap. When nothing is played,
+            the file starts right away. With `play_on_repeat` the last file is repeated
+            when the queue is empty.
+
+        Args:
+            filename (`str`): Filename (or path) to play after the queued ones.
+        """
+
+        self.__file_audio_device_descriptor.enqueueInputFilename(filename)
+
+    def clear_queue(self):
+        """Remove all files from the queue. The current file keeps playing."""
+
+        self.__file_audio_device_descriptor.clearPlaylist()
+
+    @property
+    def queue(self) -> List[str]:
+        """Filenames waiting for playout. The next file is removed from the queue when it's opened ahead."""
+
+        return self.__file_audio_device_descriptor.playlist
+
     def stop_output(self):
         """Stop recording to file."""
 
         self.output_filename = ''
 
+    @property
+    def play_on_repeat(self):
+        """When the file ends, play it again.
+
+        Note:
+            Without repeat the playout isn't stopped at the end of the file anymore. The silence is sent
+            until a new file is set or queued, which is played right away. A repeated empty file is reported
+            as ended only once.
+        """
+
+        return self.__file_audio_device_descriptor.isEndlessPlayout
+
+    @play_on_repeat.setter
+    def play_on_repeat(self, value: bool):
+        self.__file_audio_device_descriptor.isEndlessPlayout = value
+
     @property
     def input_filename(self):
-        """Input filename (or path) to play."""
+        """Input filename (or path) to play.
+
+        Note:
+            Ogg/Opus, WAV and RAW (48000 Hz, stereo, s16le) files are supported. The format is detected
+            by the content of the file, everything else is played as RAW.
+        """
 
-        return self.__input_filename
+        return self.__file_audio_device_descriptor.inputFilename
 
     @input_filename.setter
     def input_filename(self, filename):
-        self.__input_filename = filename or ''
+        self.__file_audio_device_descriptor.inputFilename = filename or ''
         if self.is_connected:
             self.restart_playout()
 
@@ -107,44 +180,180 @@ class GroupCallFile(GroupCallBase, GroupCallFileDispatcherMixin):
     def output_filename(self):
         """Output filename (or path) to record."""
 
-        return self.__output_filename
+        return self.__file_audio_device_descriptor.outputFilename
 
     @output_filename.setter
     def output_filename(self, filename):
-        self.__output_filename = filename or ''
+        self.__file_audio_device_descriptor.outputFilename = filename or ''
+        self.__file_audio_device_descriptor.outputFormat = self.__get_output_format(filename)
         if self.is_connected:
             self.restart_recording()
 
+    @property
+    def output_format(self) -> Optional['tgcalls.AudioFileFormat']:
+        """Format of recording: Raw, Wav or OggOpus. None (default) means RAW (48000 Hz, stereo, s16le),
+        or the format by the extension of output filename when `detect_output_format` is enabled.
+
+        Note:
+            Files are encoded natively on a separate thread. WAV header and the end of Ogg/Opus are completed
+            when recording is stopped. A new format is applied to the next output file.
+        """
+
+        return self.__output_format
+
+    @output_format.setter
+    def output_format(self, output_format: Optional['tgcalls.AudioFileFormat']):
+        self.__output_format = output_format
+        self.__file_audio_device_descriptor.outputFormat = self.__get_output_format(self.output_filename)
+
+    @property
+    def detect_output_format(self) -> bool:
+        """Detect format of recording by the extension of output filename when `output_format` is None.
+
+        Note:
+            Disabled by default, so output files are recorded as RAW whatever the extension is.
+            When enabled, files with `.wav` extension are recorded as WAV, `.ogg`, `.opus` and `.oga`
+            as Ogg/Opus, others as RAW.
+        """
+
+        return self.__detect_output_format
+
+    @detect_output_format.setter
+    def detect_output_format(self, value: bool):
+        self.__detect_output_format = value
+        self.__file_audio_device_descriptor.outputFormat = self.__get_output_format(self.output_filename)
+
+    @property
+    def output_bitrate_kbit(self) -> int:
+        """Bitrate of Ogg/Opus recording in kbit/s, 64 by default.
+
+        Note:
+            Limited by 6-510 kbit/s supported by Opus. Applied to the next output file.
+        """
+
+        return self.__file_audio_device_descriptor.outputBitrateKbit
+
+    @output_bitrate_kbit.setter
+    def output_bitrate_kbit(self, value: int):
+        self.__file_audio_device_descriptor.outputBitrateKbit = value
+
+    @property
+    def playout_tick_stats(self) -> 'tgcalls.TickStats':
+        """Pacing counters of the native thread playing the input file."""
+
+        return self.__file_audio_device_descriptor.playoutTickStats
+
+    @property
+    def recording_tick_stats(self) -> 'tgcalls.TickStats':
+        """Pacing counters of the native thread recording to the output file."""
+
+        return self.__file_audio_device_descriptor.recordingTickStats
+
+    @property
+    def output_buffer_ms(self) -> int:
+        """Size of the buffer between the audio thread and the writer of output file, in ms.
+
+        Note:
+            Recording is written on a separate thread. When the disk doesn't keep up and the buffer is full,
+            audio is dropped instead of stalling the call. Applied to the next output file.
+        """
+
+        return self.__file_audio_device_descriptor.outputBufferMs
+
+    @output_buffer_ms.setter
+    def output_buffer_ms(self, value: int):
+        self.__file_audio_device_descriptor.outputBufferMs = value
+
+    @property
+    def output_sync_policy(self) -> 'tgcalls.AudioOutputSyncPolicy':
+        """When output file is flushed to the disk (fsync): Never (default), OnClose or Periodic.
+
+        Note:
+            With Periodic policy WAV header is updated on each sync, so the file is readable after a crash.
+            Applied to the next output file.
+        """
+
+        return self.__file_audio_device_descriptor.outputSyncPolicy
+
+    @output_sync_policy.setter
+    def output_sync_policy(self, value: 'tgcalls.AudioOutputSyncPolicy'):
+        self.__file_audio_device_descriptor.outputSyncPolicy = value
+
+    @property
+    def output_sync_interval_ms(self) -> int:
+        """Interval of Periodic sync policy, in ms."""
+
+        return self.__file_audio_device_descriptor.outputSyncIntervalMs
+
+    @output_sync_interval_ms.setter
+    def output_sync_interval_ms(self, value: int):
+        self.__file_audio_device_descriptor.outputSyncIntervalMs = value
+
+    @property
+    def output_segment_duration_ms(self) -> int:
+        """Duration of segments of the recording in ms, 0 (default) disables the limit.
+
+        Note:
+            The recording is split into files named by output filename with a number: rec.ogg -> rec_00001.ogg.
+            Files are switched between two 10 ms buffers without a gap, so the duration is rounded to 10 ms.
+            Applied to the next output file.
+        """
+
+        return self.__file_audio_device_descriptor.outputSegmentDurationMs
+
+    @output_segment_duration_ms.setter
+    def output_segment_duration_ms(self, value: int):
+        self.__file_audio_device_descriptor.outputSegmentDurationMs = value
+
+    @property
+    def output_segment_max_bytes(self) -> int:
+        """Max size of segments of the recording in bytes, 0 (default) disables the limit.
+
+        Note:
+            The size is checked after every 10 ms of written audio, so a segment can be a bit bigger.
+            Ogg/Opus data is written by pages of one second. Can be combined with the duration limit.
+            Applied to the next output file.
+        """
+
+        return self.__file_audio_device_descriptor.outputSegmentMaxBytes
+
+    @output_segment_max_bytes.setter
+    def output_segment_max_bytes(self, value: int):
+        self.__file_audio_device_descriptor.outputSegmentMaxBytes = value
+
+    @property
+    def output_stats(self) -> 'tgcalls.AudioOutputStats':
+        """Counters of the writer of output file: written and dropped bytes, syncs, completed segments, lag in ms."""
+
+        return self.__file_audio_device_descriptor.outputStats
+
     def pause_playout(self):
         """Pause playout (playing from file)."""
-        self.__is_playout_paused = True
+        self.__file_audio_device_descriptor.isPlayoutPaused = True
 
     def resume_playout(self):
         """Resume playout (playing from file)."""
-        self.__is_playout_paused = False
+        self.__file_audio_device_descriptor.isPlayoutPaused = False
 
     def pause_recording(self):
         """Pause recording (output to file)."""
-        self.__is_recording_paused = True
+        self.__file_audio_device_descriptor.isRecordingPaused = True
 
     def resume_recording(self):
         """Resume recording (output to file)."""
-        self.__is_recording_paused = False
-
-    def __get_input_filename_callback(self):
-        return self.__input_filename
+        self.__file_audio_device_descriptor.isRecordingPaused = False
 
-    def __get_output_filename_callback(self):
-        return self.__output_filename
+    def __get_output_format(self, filename: Optional[str]) -> 'tgcalls.AudioFileFormat':
+        if self.__output_format is not None:
+            return self.__output_format
+        if not self.__detect_output_format:
+            return tgcalls.AudioFileFormat.Raw
 
-    def __is_endless_playout_callback(self):
-        return self.play_on_repeat
-
-    def __is_playout_paused_callback(self):
-        return self.__is_playout_paused
-
-    def __is_recording_paused_callback(self):
-        return self.__is_recording_paused
+        extension = os.path.splitext(filename or '')[1].lower()
+        return OUTPUT_FORMAT_BY_EXTENSION.get(extension, tgcalls.AudioFileFormat.Raw)
 
     def __playout_ended_callback(self, input_filename: str):
         self.trigger_handlers(GroupCallFileAction.PLAYOUT_ENDED, self, input_filename)
+
+    def __recording_segment_completed_callback(self, output_filename: str):
+        self.trigger_handlers(GroupCallFileAction.RECORDING_SEGMENT_COMPLETED, self, output_filename)
@@ -45,12 +45,15 @@ class GroupCallNative:
         enable_logs_to_console: bool,
         path_to_log_file: str,
         outgoing_audio_bitrate_kbit: int,
+        video_content_type: 'tgcalls.VideoContentType' = tgcalls.VideoContentType.Generic,
     ):
         """Create NativeInstance of tgcalls C++ part.
 
         Args:
             enable_logs_to_console (`bool`): Is enable logs to stderr from tgcalls.
             path_to_log_file (`str`, optional): Path to log file for logs of tgcalls.
+            video_content_type (`tgcalls.VideoContentType`, optional): Tuning of the video encoder for camera-like
+                (`Generic`) or screen (`Screencast`) content. Applied on creation of the group call.
         """
 
         # bypass None value
@@ -64,6 +67,7 @@ class GroupCallNative:
             emit_join_payload_callback,
             network_state_updated_callback,
             outgoing_audio_bitrate_kbit,
+            video_content_type,
         )
 
         logger.debug('Native instance created.')
@@ -124,9 +128,109 @@ class GroupCallNative:
         self.__native_instance.startAudioDeviceModule()
 
     @if_native_instance_created
-    def _set_video_capture(self, source_path: Callable, width: int, height: int, fps: int):
+    def _set_video_capture(
+        self,
+        source_path: Callable,
+        width: int,
+        height: int,
+        fps: int,
+        pixel_format: 'tgcalls.PixelFormat' = tgcalls.PixelFormat.RGBA,
+        target_width: int = 0,
+        target_height: int = 0,
+    ):
         logger.debug('Set video capture.')
-        self.__native_instance.setVideoCapture(source_path, fps, width, height)
+        self.__native_instance.setVideoCapture(
+            source_path, fps, width, height, pixel_format, target_width, target_height
+        )
+
+    def _set_outgoing_video_bitrate(self, min_bitrate_kbit: int, max_bitrate_kbit: int):
+        # stored by the native side until the start of the group call
+        logger.debug(f'Set outgoing video bitrate to {min_bitrate_kbit}-{max_bitrate_kbit} kbit/s.')
+        self.__native_instance.setOutgoingVideoBitrate(min_bitrate_kbit, max_bitrate_kbit)
+
+    @if_native_instance_created
+    def _set_static_video_frame(self, frame):
+        logger.debug('Set static video frame.')
+        self.__native_instance.setStaticVideoFrame(frame)
+
+    @if_native_instance_created
+    def _clear_static_video_frame(self):
+        logger.debug('Clear static video frame.')
+        self.__native_instance.clearStaticVideoFrame()
+
+    @property
+    def video_tick_stats(self) -> 'tgcalls.TickStats':
+        """Pacing counters of the thread sending video frames.
+
+        Note:
+            Frames which can't be sent in time are skipped to keep the stream in real time.
+            Counters are reset on each start of the video.
+        """
+
+        return self.__native_instance.videoTickStats
+
+    @if_native_instance_created
+    def set_requested_video_channels(self, channels: List['tgcalls.VideoChannelDescription']):
+        """Request incoming video of endpoints. Video of endpoints which isn't requested isn't received.
+
+        Note:
+            `tgcalls.VideoChannelDescription` describes the video of a participant: `audioSsrc`, `endpointId`,
+            `ssrcGroups` (list of `tgcalls.MediaSsrcGroup` with `semantics` and `ssrcs`), `minQuality` and
+            `maxQuality`. Values come from `video` of group call participant.
+
+        Args:
+            channels (`list` of `tgcalls.VideoChannelDescription`): Full list of requested channels.
+        """
+
+        logger.debug(f'Set requested video channels ({len(channels)}).')
+        self.__native_instance.setRequestedVideoChannels(channels)
+
+    @if_native_instance_created
+    def add_incoming_video_output(
+        self,
+        endpoint_id: str,
+        callback: Callable[['numpy.ndarray', int, int], None],
+        fps: float = 0,
+        max_width: int = 0,
+        max_height: int = 0,
+        pixel_format: 'tgcalls.PixelFormat' = tgcalls.PixelFormat.BGR,
+    ):
+        """Receive incoming video frames of the endpoint.
+
+        Frames are decimated and scaled down in native code, so only requested frames are converted
+        and passed to Python.
+
+        Note:
+            The callback is called with a frame, its width and height from a native thread of the output.
+            The decoder doesn't wait for it. When the callback is slower than incoming video, the oldest
+            waiting frame is dropped, so at most 2 frames wait.
+            The frame is a NumPy array with (height, width, channels) shape for `BGR` and `RGBA`, and a flat array
+            with planes one after another for `I420` and `NV12`.
+
+            One output per endpoint. Adding it again replaces the previous one.
+
+        Args:
+            endpoint_id (`str`): Endpoint of the video.
+            callback (`Callable`): Called for every passed frame.
+            fps (`float`, optional): Max frame rate. 0 means every frame.
+            max_width (`int`, optional): Max width. Frames are scaled down keeping aspect ratio. 0 means no limit.
+            max_height (`int`, optional): Max height. 0 means no limit.
+            pixel_format (`tgcalls.PixelFormat`, optional): Layout of frames.
+        """
+
+        logger.debug(f'Add incoming video output of {endpoint_id}.')
+        self.__native_instance.addIncomingVideoOutput(endpoint_id, callback, fps, max_width, max_height, pixel_format)
+
+    @if_native_instance_created
+    def remove_incoming_video_output(self, endpoint_id: str):
+        """Stop receiving incoming video frames of the endpoint.
+
+        Args:
+            endpoint_id (`str`): Endpoint of the video.
+        """
+
+        logger.debug(f'Remove incoming video output of {endpoint_id}.')
+        self.__native_instance.removeIncomingVideoOutput(endpoint_id)
 
     @if_native_instance_created
     def get_playout_devices(self) -> List['tgcalls.AudioDevice']:
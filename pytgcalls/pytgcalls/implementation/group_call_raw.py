@@ -17,11 +17,24 @@
 #  You should have received a copy of the GNU Lesser General Public License v3
 #  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Callable
+import asyncio
+from logging import getLogger
+from typing import Callable, Optional
 
 import tgcalls
+from pytgcalls.exceptions import PytgcallsError
 from pytgcalls.implementation import GroupCallBase
-from pytgcalls.utils import DEFAULT_COLOR_DEPTH, VideoInfo
+from pytgcalls.utils import (
+    AUDIO_CHUNK_DURATION_MS,
+    AudioRecordSink,
+    MILLIS_IN_SEC,
+    VideoEncoderConfig,
+    VideoFrameBufferPool,
+    VideoInfo,
+    to_contiguous_frame,
+)
+
+logger = getLogger(__name__)
 
 
 class GroupCallRaw(GroupCallBase):
@@ -34,50 +47,360 @@ class GroupCallRaw(GroupCallBase):
         enable_logs_to_console=False,
         path_to_log_file=None,
         outgoing_audio_bitrate_kbit=128,
+        use_audio_buffer_views=False,
+        audio_input_buffer_ms: Optional[int] = None,
+        callback_period_ms=AUDIO_CHUNK_DURATION_MS,
+        video_content_type: 'tgcalls.VideoContentType' = tgcalls.VideoContentType.Generic,
     ):
-        super().__init__(mtproto_bridge, enable_logs_to_console, path_to_log_file, outgoing_audio_bitrate_kbit)
+        """Group call with raw PCM data callbacks.
+
+        Note:
+            When `use_audio_buffer_views` is enabled, audio callbacks get `memoryview` objects
+            over native buffers instead of `bytes`. `on_audio_played_data` must write PCM into
+            the passed writable buffer (anything not written is silence) and return nothing.
+            `on_audio_recorded_data` gets a read-only buffer. Views are valid only until the
+            callback returns, so copy the data if you need it later.
+
+            When `audio_input_buffer_ms` is passed, the call works in push mode. PCM written by
+            `write_audio` is stored in the native ring buffer and played by the native thread
+            without calling Python. `on_audio_played_data` is not used in this mode.
+
+            With `callback_period_ms` greater than 10 audio callbacks are called once per period
+            with the whole period of PCM. It reduces count of Python calls but adds the same latency.
+
+            `on_video_played_data` can return `bytes` or any object supporting the buffer protocol
+            (NumPy array, `memoryview`, `bytearray`) with a frame in `video_info.pixel_format` (RGBA by default).
+            It's read by the native side in place, so don't modify it from other threads until the next call.
+            Missing rows are filled with black. Use `acquire_video_frame_buffer` to avoid allocations per frame.
+            Frames which aren't C-contiguous (sliced or transposed NumPy arrays) are copied before sending.
+
+            PCM in both directions is 16-bit signed little-endian with `audio_sample_rate` and
+            `audio_channels` of the native device. Resample your audio to this format before passing it.
 
-        self.__is_playout_paused = False
-        self.__is_recording_paused = False
+        Args:
+            use_audio_buffer_views (`bool`, optional): Pass `memoryview` instead of `bytes` to audio callbacks.
+            audio_input_buffer_ms (`int`, optional): Size of native input buffer in milliseconds.
+            callback_period_ms (`int`, optional): How often audio callbacks are called. Multiple of 10.
+            video_content_type (`tgcalls.VideoContentType`, optional): Tuning of the video encoder
+                for camera-like or screen content.
+        """
 
-        self.__raw_audio_device_descriptor = None
+        if callback_period_ms < AUDIO_CHUNK_DURATION_MS or callback_period_ms % AUDIO_CHUNK_DURATION_MS:
+            raise ValueError(f'Callback period must be a multiple of {AUDIO_CHUNK_DURATION_MS} ms')
+
+        super().__init__(
+            mtproto_bridge, enable_logs_to_console, path_to_log_file, outgoing_audio_bitrate_kbit, video_content_type
+        )
+
+        self.__audio_input_buffer = None
+        # created on the loop by the first wait of `write_audio`
+        self.__audio_input_space_event = None
+        if audio_input_buffer_ms:
+            self.__audio_input_buffer = tgcalls.AudioRingBuffer(self.__ms_to_bytes(audio_input_buffer_ms))
+
+        self.__raw_audio_device_descriptor = self.__create_raw_audio_device_descriptor(use_audio_buffer_views)
+        self.__raw_audio_device_descriptor.callbackPeriodMs = callback_period_ms
+        self.__audio_record_sink = None
 
         self.on_audio_played_data = on_audio_played_data
         self.on_audio_recorded_data = on_audio_recorded_data
 
         self.on_video_played_data = on_video_played_data
+        self.__video_info = VideoInfo.default()
+        self.__video_encoder_config = VideoEncoderConfig()
+        self.__video_frame_buffer_pool = None
+        self.__is_video_frame_copy_reported = False
 
-    def __create_and_return_raw_audio_device_descriptor(self):
-        self.__raw_audio_device_descriptor = tgcalls.RawAudioDeviceDescriptor()
-        self.__raw_audio_device_descriptor.getPlayedBufferCallback = self.__get_played_audio_buffer_callback
-        self.__raw_audio_device_descriptor.setRecordedBufferCallback = self.__set_recorded_audio_buffer_callback
-        self.__raw_audio_device_descriptor.isPlayoutPaused = self.__is_playout_paused_callback
-        self.__raw_audio_device_descriptor.isRecordingPaused = self.__is_recording_paused_callback
+    def __create_raw_audio_device_descriptor(self, use_audio_buffer_views: bool):
+        descriptor = tgcalls.RawAudioDeviceDescriptor()
+        if use_audio_buffer_views:
+            descriptor.getPlayedBufferViewCallback = self.__get_played_audio_buffer_view_callback
+            descriptor.setRecordedBufferViewCallback = self.__set_recorded_audio_buffer_callback
+        else:
+            descriptor.getPlayedBufferCallback = self.__get_played_audio_buffer_callback
+            descriptor.setRecordedBufferCallback = self.__set_recorded_audio_buffer_callback
+        descriptor.inputRingBuffer = self.__audio_input_buffer
+        if self.__audio_input_buffer is not None:
+            descriptor.inputSpaceCallback = self.__audio_input_space_callback
 
-        return self.__raw_audio_device_descriptor
+        return descriptor
 
     def _setup_and_start_group_call(self):
-        self._start_native_group_call(self.__create_and_return_raw_audio_device_descriptor())
+        self._start_native_group_call(self.__raw_audio_device_descriptor)
         self._configure_video_capture(VideoInfo.default())
 
     def _configure_video_capture(self, video_info: VideoInfo):
+        # geometry is fixed until the next configuration, so buffers of the old one are useless
+        self.__video_info = video_info
+        self.__video_frame_buffer_pool = None
+        self.__is_video_frame_copy_reported = False
+
+        encoder_config = self.__video_encoder_config
         self._set_video_capture(
-            self.__get_played_video_buffer_callback, video_info.width, video_info.height, video_info.fps
+            self.__get_played_video_buffer_callback,
+            video_info.width,
+            video_info.height,
+            encoder_config.fps or video_info.fps,
+            video_info.pixel_format,
+            encoder_config.width,
+            encoder_config.height,
         )
 
+    def set_video_encoder_config(self, config: VideoEncoderConfig):
+        """Set bitrate, resolution and frame rate of outgoing video.
+
+        Note:
+            Bitrate is applied immediately. Resolution and frame rate are applied on the next start of video.
+            Lower values save CPU of the encoder for the cost of quality.
+
+        Args:
+            config (`VideoEncoderConfig`): Settings of the encoder.
+        """
+
+        self.__video_encoder_config = config
+        self._set_outgoing_video_bitrate(config.min_bitrate_kbit, config.max_bitrate_kbit)
+
+    @property
+    def video_encoder_config(self) -> VideoEncoderConfig:
+        return self.__video_encoder_config
+
+    @property
+    def video_info(self) -> VideoInfo:
+        """Geometry, FPS and pixel format of the configured video capture."""
+
+        return self.__video_info
+
+    def acquire_video_frame_buffer(self) -> memoryview:
+        """Get a preallocated buffer for the next frame to return from `on_video_played_data`.
+
+        Note:
+            Buffers are reused in turn, so don't keep references to the old ones.
+            Size of the buffer is `video_info.frame_size`.
+
+        Returns:
+            `memoryview`: Writable buffer. Its content is left from the previous use.
+        """
+
+        if self.__video_frame_buffer_pool is None:
+            self.__video_frame_buffer_pool = VideoFrameBufferPool(self.__video_info)
+
+        return self.__video_frame_buffer_pool.acquire()
+
+    def set_static_video_frame(self, frame):
+        """Send the frame until it's replaced or cleared. For still images and slideshows.
+
+        Note:
+            The frame is converted once and sent by the native side at FPS of `video_info`.
+            `on_video_played_data` isn't called meanwhile. New configuration of the video capture clears the frame.
+
+        Args:
+            frame (`bytes`): Any object supporting the buffer protocol with a frame in `video_info` geometry
+                and pixel format. It's copied, so it can be changed after the call.
+        """
+
+        self._set_static_video_frame(to_contiguous_frame(frame))
+
+    def clear_static_video_frame(self):
+        """Stop sending the static frame and return to `on_video_played_data`."""
+
+        self._clear_static_video_frame()
+
+    def pause_playout(self):
+        """Pause playout (sending of audio to the group call).
+
+        Note:
+            While paused `on_audio_played_data` is not called at all.
+        """
+        self.__raw_audio_device_descriptor.isPlayoutPaused = True
+
+    def resume_playout(self):
+        """Resume playout (sending of audio to the group call)."""
+        self.__raw_audio_device_descriptor.isPlayoutPaused = False
+
+    def pause_recording(self):
+        """Pause recording (receiving of audio from the group call).
+
+        Note:
+            While paused `on_audio_recorded_data` is not called at all.
+        """
+        self.__raw_audio_device_descriptor.isRecordingPaused = True
+
+    def resume_recording(self):
+        """Resume recording (receiving of audio from the group call)."""
+        self.__raw_audio_device_descriptor.isRecordingPaused = False
+
+    def set_audio_record_sink(self, sink: Optional[AudioRecordSink]):
+        """Deliver recorded audio to the sink in addition to `on_audio_recorded_data`.
+
+        Note:
+            The sink must be created with `audio_sample_rate` and `audio_channels` and started.
+            It's not stopped when replaced or removed. Recording isn't resumed automatically.
+
+        Args:
+            sink (`AudioRecordSink`, optional): Sink or `None` to remove the current one.
+        """
+
+        self.__audio_record_sink = sink
+
+    @property
+    def audio_record_sink(self) -> Optional[AudioRecordSink]:
+        return self.__audio_record_sink
+
+    @property
+    def callback_period_ms(self) -> int:
+        return self.__raw_audio_device_descriptor.callbackPeriodMs
+
+    @property
+    def is_playout_paused(self) -> bool:
+        return self.__raw_audio_device_descriptor.isPlayoutPaused
+
+    @property
+    def is_recording_paused(self) -> bool:
+        return self.__raw_audio_device_descriptor.isRecordingPaused
+
+    @property
+    def playout_tick_stats(self) -> 'tgcalls.TickStats':
+        """Pacing counters of the native thread sending audio to the call."""
+
+        return self.__raw_audio_device_descriptor.playoutTickStats
+
+    @property
+    def recording_tick_stats(self) -> 'tgcalls.TickStats':
+        """Pacing counters of the native thread receiving audio of the call."""
+
+        return self.__raw_audio_device_descriptor.recordingTickStats
+
+    @property
+    def audio_sample_rate(self) -> int:
+        """Sample rate of PCM passed to and from the native audio device."""
+
+        return tgcalls.RawAudioDeviceDescriptor.sampleRate
+
+    @property
+    def audio_channels(self) -> int:
+        """Count of channels of PCM passed to and from the native audio device."""
+
+        return tgcalls.RawAudioDeviceDescriptor.channels
+
+    @property
+    def audio_frame_size(self) -> int:
+        """Size of one sample for all channels in bytes (16-bit PCM)."""
+
+        return self.audio_channels * 2
+
+    def __ms_to_bytes(self, ms: float) -> int:
+        return int(self.audio_sample_rate * ms / MILLIS_IN_SEC) * self.audio_frame_size
+
+    def __bytes_to_ms(self, length: int) -> float:
+        return length / self.audio_frame_size * MILLIS_IN_SEC / self.audio_sample_rate
+
+    def __get_audio_input_buffer(self) -> 'tgcalls.AudioRingBuffer':
+        if self.__audio_input_buffer is None:
+            raise PytgcallsError('Audio input buffer is not enabled. Pass audio_input_buffer_ms to enable it')
+
+        return self.__audio_input_buffer
+
+    def write_audio_nowait(self, data) -> int:
+        """Write as much PCM as fits into the native audio input buffer.
+
+        Args:
+            data (`bytes` | `bytearray` | `memoryview`): 16-bit PCM in the native device format.
+
+        Returns:
+            `int`: Count of written bytes.
+        """
+
+        return self.__get_audio_input_buffer().write(data)
+
+    async def write_audio(self, data):
+        """Write PCM into the native audio input buffer, waiting while the buffer is full.
+
+        Args:
+            data (`bytes` | `bytearray` | `memoryview`): 16-bit PCM in the native device format.
+        """
+
+        audio_input_buffer = self.__get_audio_input_buffer()
+        if self.__audio_input_space_event is None:
+            self.__audio_input_space_event = asyncio.Event()
+
+        view = memoryview(data).cast('B')
+        view = view[audio_input_buffer.write(view) :]
+        while view:
+            self.__audio_input_space_event.clear()
+            audio_input_buffer.requestSpaceNotification()
+            # the native thread could read before the request
+            view = view[audio_input_buffer.write(view) :]
+            if view:
+                await self.__audio_input_space_event.wait()
+                view = view[audio_input_buffer.write(view) :]
+
+    def __audio_input_space_callback(self):
+        # called by the native thread after it has read from the audio input buffer
+        event = self.__audio_input_space_event
+        if event is None:
+            return
+
+        try:
+            self.get_event_loop().call_soon_threadsafe(event.set)
+        except RuntimeError:
+            logger.debug('Event loop is closed.')
+
+    def clear_audio_input_buffer(self):
+        """Drop all not played PCM from the native audio input buffer. Call it before a new stream."""
+
+        self.__get_audio_input_buffer().clear()
+
+    @property
+    def audio_input_buffer_capacity_ms(self) -> float:
+        """Capacity of the native audio input buffer in milliseconds."""
+
+        return self.__bytes_to_ms(self.__get_audio_input_buffer().capacity)
+
+    @property
+    def audio_input_buffer_level_ms(self) -> float:
+        """Duration of PCM waiting in the native audio input buffer in milliseconds."""
+
+        return self.__bytes_to_ms(self.__get_audio_input_buffer().available)
+
+    @property
+    def audio_input_buffer_free_ms(self) -> float:
+        """Free space of the native audio input buffer in milliseconds.
+
+        Note:
+            Space of PCM dropped by `clear_audio_input_buffer` is freed on the next native read, in 10 ms.
+        """
+
+        return self.__bytes_to_ms(self.__get_audio_input_buffer().freeSpace)
+
+    @property
+    def audio_input_buffer_underruns(self) -> int:
+        """Count of gaps in written PCM when the native audio input buffer couldn't provide enough of it.
+
+        Note:
+            A gap is counted when PCM is written again after it. Silence before the first written PCM,
+            after the end of a stream and after `clear_audio_input_buffer` isn't an underrun.
+        """
+
+        return self.__get_audio_input_buffer().underruns
+
+    @property
+    def audio_input_buffer_underrun_ms(self) -> float:
+        """Total duration of silence inserted because of underruns in milliseconds."""
+
+        return self.__bytes_to_ms(self.__get_audio_input_buffer().underrunBytes)
+
     def __get_played_video_buffer_callback(self):
-        frame = b''
-        if self.on_video_played_data:
-            data = self.on_video_played_data(self)
-            if data:
-                frame = data
+        # passed to the native side without copying. Not full frames are padded with black there
+        if not self.on_video_played_data:
+            return None
 
-        video_info = VideoInfo.default()
-        if self._video_stream:
-            video_info = self._video_stream.get_video_info()
+        frame = self.on_video_played_data(self)
+        contiguous_frame = to_contiguous_frame(frame)
+        if contiguous_frame is not frame and not self.__is_video_frame_copy_reported:
+            self.__is_video_frame_copy_reported = True
+            logger.warning('Video frames are not C-contiguous, each of them is copied. Use numpy.ascontiguousarray')
 
-        frame_size = video_info.width * video_info.width * DEFAULT_COLOR_DEPTH
-        return frame.ljust(frame_size, b'\0')
+        return contiguous_frame
 
     def __get_played_audio_buffer_callback(self, length: int):
         frame = b''
@@ -88,14 +411,13 @@ class GroupCallRaw(GroupCallBase):
 
         return frame.ljust(length, b'\0')
 
+    def __get_played_audio_buffer_view_callback(self, buffer: memoryview, length: int):
+        if self.on_audio_played_data:
+            self.on_audio_played_data(self, buffer, length)
+
     def __set_recorded_audio_buffer_callback(self, frame: bytes, length: int):
+        if self.__audio_record_sink:
+            self.__audio_record_sink.write(frame)
         if self.on_audio_recorded_data:
             self.on_audio_recorded_data(self, frame, length)
 
-    def __is_playout_paused_callback(self):
-        # native pausing from cpp side. old way to impl it
-        return self.__is_playout_paused
-
-    def __is_recording_paused_callback(self):
-        # native pausing from cpp side. old way to impl it
-        return self.__is_recording_paused
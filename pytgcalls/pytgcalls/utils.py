@@ -17,47 +17,655 @@
 #  You should have received a copy of the GNU Lesser General Public License v3
 #  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
 
-import os
+import asyncio
+import math
+import mmap
+import tempfile
+import time
+from collections import deque
+from enum import Enum
 from logging import getLogger
 from queue import Empty, Queue
-from threading import Lock, Thread
-from typing import List, Optional
+from threading import Condition, Lock, Thread, current_thread
+from typing import TYPE_CHECKING, AsyncIterator, BinaryIO, Callable, List, Optional, Tuple, Union
 
 import cv2
 import av
 
+if TYPE_CHECKING:
+    import tgcalls
+
 
 logger = getLogger(__name__)
 
+# AVFMT_FLAG_NOBUFFER, AVFMT_FLAG_FLUSH_PACKETS and AV_CODEC_FLAG_LOW_DELAY of FFmpeg
+AV_FORMAT_FLAG_NO_BUFFER = 0x0040
+AV_FORMAT_FLAG_FLUSH_PACKETS = 0x0200
+AV_CODEC_FLAG_LOW_DELAY = 1 << 19
+
 uint_ssrc = lambda ssrc: ssrc if ssrc >= 0 else ssrc + 2 ** 32
 int_ssrc = lambda ssrc: ssrc if ssrc < 2 ** 31 else ssrc - 2 ** 32
 
-# increasing this value will increase memory usage
-VIDEO_QUEUE_SIZE = 1  # 1 frame depends on FPS
-AUDIO_QUEUE_SIZE = 1  # 1 frame is 10 ms
+# decoded frames are buffered ahead for this duration, so a single slow decode doesn't stall the video
+VIDEO_DECODE_AHEAD_MS = 300
+# and this memory. Increasing these values will increase memory usage
+VIDEO_DECODE_AHEAD_MAX_BYTES = 32 * 1024 * 1024
+VIDEO_FRAME_BUFFERS_COUNT = 3
+# still images are sent with low FPS, the same frame isn't worth more
+VIDEO_STATIC_FRAME_FPS = 5
+# decoded frames waiting for their pts cover the audio buffer and this duration on top of it,
+# otherwise frames are dropped. The count of frames depends on FPS of the source
+VIDEO_SYNC_QUEUE_MS = 300
+
+# playback starts (and restarts after underrun) only when this amount of audio is buffered
+AUDIO_BUFFER_LOW_WATERMARK_MS = 60
+# decoding waits when this amount of audio is buffered. Increasing this value will increase memory usage
+AUDIO_BUFFER_HIGH_WATERMARK_MS = 200
+AUDIO_CHUNK_DURATION_MS = 10
+# how many chunks are taken from the replay cache at once
+AUDIO_CACHE_READ_CHUNKS = 10
+# recorded audio is delivered to consumers by batches of this duration
+AUDIO_RECORD_BATCH_MS = 100
+# increasing this value will increase memory usage and allowed lag of slow consumers
+AUDIO_RECORD_MAX_BATCHES = 50
 
 DEFAULT_COLOR_DEPTH = 4
 DEFAULT_REQUESTED_AUDIO_BYTES_LENGTH = 960
 DEFAULT_AUDIO_SAMPLE_RATE = 48000
-REVERSED_AUDIO_SAMPLE_RATE = {
-    48000: 44100,
-    44100: 48000,
+DEFAULT_AUDIO_CHANNELS = 1
+AUDIO_CHANNEL_LAYOUTS = {
+    1: 'mono',
+    2: 'stereo',
 }
 
 MILLIS_IN_SEC = 1000
 
 
+def rewind_container(container) -> bool:
+    """Seek PyAV container to the beginning for repeated playout.
+
+    Returns:
+        `bool`: `False` when the source can't be seeked, for example a live stream.
+    """
+
+    try:
+        container.seek(0)
+    except (av.error.FFmpegError, OSError) as e:
+        logger.warning(f'Cant rewind {container.name}, playout ended: {e}')
+        return False
+
+    return True
+
+
+def get_scaled_video_size(
+    source_width: int, source_height: int, width: Optional[int] = None, height: Optional[int] = None
+) -> Tuple[int, int]:
+    """Get size of I420 frames scaled from the source.
+
+    Note:
+        When only one dimension is passed, the other one keeps the aspect ratio of the source.
+        Both dimensions are rounded down to even numbers, because I420 chroma planes are subsampled by 2.
+
+    Returns:
+        `tuple`: Width and height.
+    """
+
+    if width and not height:
+        height = round(source_height * width / source_width)
+    elif height and not width:
+        width = round(source_width * height / source_height)
+    elif not width and not height:
+        width, height = source_width, source_height
+
+    return max(2, width // 2 * 2), max(2, height // 2 * 2)
+
+
+def to_contiguous_frame(frame):
+    """Get the video frame in the C order which the native side reads.
+
+    Note:
+        Frames which are already C-contiguous are returned as is. Others, like sliced or transposed
+        NumPy arrays, are copied.
+
+    Args:
+        frame: Any object supporting the buffer protocol or None.
+
+    Returns:
+        The same frame or its contiguous copy in `bytes`.
+    """
+
+    if frame is None:
+        return None
+
+    with memoryview(frame) as view:
+        if view.c_contiguous:
+            return frame
+
+        return view.tobytes()
+
+
+def get_pixel_format(name: str) -> 'tgcalls.PixelFormat':
+    """Get a pixel format of the native module by its name.
+
+    Note:
+        The native module is imported here, so the rest of utils works without it.
+    """
+
+    import tgcalls
+
+    return getattr(tgcalls.PixelFormat, name)
+
+
 class VideoInfo:
-    def __init__(self, width: int, height: int, fps: int):
+    def __init__(self, width: int, height: int, fps: int, pixel_format: Optional['tgcalls.PixelFormat'] = None):
         self.width = width
         self.height = height
         self.fps = fps
+        self.pixel_format = pixel_format if pixel_format is not None else get_pixel_format('RGBA')
+        '''Layout of frames, RGBA by default. YUV formats (I420, NV12) are planes one after another without padding'''
+
+    @property
+    def frame_size(self) -> int:
+        """Size of one frame in bytes."""
+
+        if self.pixel_format in (get_pixel_format('I420'), get_pixel_format('NV12')):
+            return self.width * self.height + (self.width + 1) // 2 * ((self.height + 1) // 2) * 2
+        if self.pixel_format == get_pixel_format('BGR'):
+            return self.width * self.height * 3
+
+        return self.width * self.height * DEFAULT_COLOR_DEPTH
 
     @classmethod
     def default(cls):
         return cls(1820, 720, 30)
 
 
+class VideoEncoderConfig:
+    def __init__(
+        self,
+        max_bitrate_kbit: int = 0,
+        min_bitrate_kbit: int = 0,
+        width: int = 0,
+        height: int = 0,
+        fps: Optional[float] = None,
+    ):
+        self.max_bitrate_kbit = max_bitrate_kbit
+        '''Max bitrate of outgoing video. 0 is the default limit of tgcalls (about 1 Mbit/s)'''
+        self.min_bitrate_kbit = min_bitrate_kbit
+        '''Min bitrate of outgoing video. Estimation doesn't go lower. 0 is the default of tgcalls (100 kbit/s)'''
+        self.width = width
+        '''Width of frames passed to the encoder. 0 is 1280'''
+        self.height = height
+        '''Height of frames passed to the encoder. 0 is 720'''
+        self.fps = fps
+        '''Frame rate of sending. FPS of the source by default. Lower values drop frames of the source'''
+
+
+class VideoFrameBufferPool:
+    """Preallocated frame buffers given out in turn.
+
+    Note:
+        The native side reads a returned frame only during the video callback. So a producer can fill
+        one buffer while the previous one is being read. With more buffers the producer can work ahead.
+    """
+
+    def __init__(self, video_info: VideoInfo, buffers_count=VIDEO_FRAME_BUFFERS_COUNT):
+        self.video_info = video_info
+
+        self.__buffers = [memoryview(bytearray(video_info.frame_size)) for _ in range(max(2, buffers_count))]
+        self.__index = 0
+
+    def acquire(self) -> memoryview:
+        """Get the next buffer. Its previous content is not cleared."""
+
+        buffer = self.__buffers[self.__index]
+        self.__index = (self.__index + 1) % len(self.__buffers)
+
+        return buffer
+
+
+class AudioChunkRing:
+    """Preallocated ring of PCM which gives out fixed size chunks without allocations.
+
+    Note:
+        It's designed for one producer thread and one consumer thread.
+        The view returned by `read` points into the ring and stays valid until the next `read` call.
+    """
+
+    def __init__(self, chunk_size: int, chunks_count: int):
+        self.chunk_size = chunk_size
+
+        # one more chunk is reserved for the view given out by the last read
+        self.__capacity = chunk_size * (chunks_count + 1)
+        self.__buffer = bytearray(self.__capacity)
+        self.__view = memoryview(self.__buffer)
+
+        # monotonic positions in bytes
+        self.__read_position = 0
+        self.__write_position = 0
+
+        self.__is_closed = False
+        self.__condition = Condition()
+
+    @property
+    def available(self) -> int:
+        return self.__write_position - self.__read_position
+
+    @property
+    def read_position(self) -> int:
+        """Count of bytes read since creation or `clear`."""
+
+        return self.__read_position
+
+    @property
+    def write_position(self) -> int:
+        """Count of bytes written since creation or `clear`."""
+
+        return self.__write_position
+
+    @property
+    def free_space(self) -> int:
+        return self.__capacity - self.chunk_size - self.available
+
+    def write(self, data: memoryview) -> bool:
+        """Write PCM blocking while the ring is full.
+
+        Returns:
+            `bool`: `False` when the ring was closed before all data has been written.
+        """
+
+        data_length = len(data)
+        written = 0
+        with self.__condition:
+            while written < data_length:
+                while not self.free_space and not self.__is_closed:
+                    self.__condition.wait()
+                if self.__is_closed:
+                    return False
+
+                length = min(self.free_space, data_length - written)
+                self.__copy_in(data[written : written + length])
+                written += length
+
+        return True
+
+    def write_nowait(self, data: memoryview) -> int:
+        """Write as much PCM as fits into the ring without blocking.
+
+        Returns:
+            `int`: Count of written bytes. Always 0 when the ring is closed.
+        """
+
+        with self.__condition:
+            if self.__is_closed:
+                return 0
+
+            length = min(self.free_space, len(data))
+            self.__copy_in(data[:length])
+
+            return length
+
+    def __copy_in(self, data: memoryview):
+        length = len(data)
+        offset = self.__write_position % self.__capacity
+        first_part = min(length, self.__capacity - offset)
+
+        self.__view[offset : offset + first_part] = data[:first_part]
+        if first_part < length:
+            self.__view[: length - first_part] = data[first_part:]
+
+        self.__write_position += length
+
+    def read(self) -> Optional[memoryview]:
+        """Get the next chunk or `None` if there is not enough PCM."""
+
+        with self.__condition:
+            if self.available < self.chunk_size:
+                return None
+
+            # read position is always aligned to the chunk size, so chunks never wrap
+            offset = self.__read_position % self.__capacity
+            self.__read_position += self.chunk_size
+            self.__condition.notify()
+
+            return self.__view[offset : offset + self.chunk_size]
+
+    def read_into(self, buffer: memoryview) -> int:
+        """Copy as many whole chunks as fit into the buffer.
+
+        Returns:
+            `int`: Count of copied bytes.
+        """
+
+        with self.__condition:
+            length = min(len(buffer), self.available) // self.chunk_size * self.chunk_size
+            if not length:
+                return 0
+
+            offset = self.__read_position % self.__capacity
+            first_part = min(length, self.__capacity - offset)
+
+            buffer[:first_part] = self.__view[offset : offset + first_part]
+            if first_part < length:
+                buffer[first_part:length] = self.__view[: length - first_part]
+
+            self.__read_position += length
+            self.__condition.notify()
+
+            return length
+
+    def clear(self):
+        with self.__condition:
+            self.__read_position = self.__write_position = 0
+            self.__condition.notify()
+
+    def close(self):
+        """Wake up and reject the blocked writer."""
+
+        with self.__condition:
+            self.__is_closed = True
+            self.__condition.notify()
+
+
+class AudioJitterBuffer:
+    """Audio buffer sized in milliseconds with underrun and overrun accounting.
+
+    Note:
+        After an underrun the reader gets nothing until the buffer is filled up to the low watermark again.
+        The writer waits when the buffer is filled up to the high watermark.
+
+        When the writer calls `finish` at the end of the source, the rest is played without waiting
+        for the low watermark, and `is_drained` tells when everything has been read.
+
+        Callbacks passed to `mark` and `finish` are called by the reader when it reads the position
+        which was written last at the moment of the call. So the end of a source is reported when
+        it's played, not when it's decoded.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        low_watermark_ms=AUDIO_BUFFER_LOW_WATERMARK_MS,
+        high_watermark_ms=AUDIO_BUFFER_HIGH_WATERMARK_MS,
+    ):
+        if low_watermark_ms > high_watermark_ms:
+            raise ValueError('Low watermark must not be greater than high watermark')
+
+        self.chunk_size = chunk_size
+
+        self.low_watermark_ms = low_watermark_ms
+        self.high_watermark_ms = high_watermark_ms
+
+        chunks_count = max(1, math.ceil(high_watermark_ms / AUDIO_CHUNK_DURATION_MS))
+        self.__low_watermark = math.ceil(low_watermark_ms / AUDIO_CHUNK_DURATION_MS) * chunk_size
+        self.__ring = AudioChunkRing(chunk_size, chunks_count)
+        self.__is_buffering = True
+        self.__is_finished = False
+
+        # (write position, callback)
+        self.__marks = deque()
+        self.__marks_lock = Lock()
+
+        self.underruns = 0
+        '''How many times the buffer became empty during playback'''
+        self.padded_frames = 0
+        '''How many 10 ms frames were not delivered and replaced with silence'''
+        self.overruns = 0
+        '''How many times the writer had to wait for free space'''
+
+    @property
+    def depth_ms(self) -> float:
+        """Duration of buffered audio in milliseconds."""
+
+        return self.__ring.available / self.chunk_size * AUDIO_CHUNK_DURATION_MS
+
+    @property
+    def is_buffering(self) -> bool:
+        """Whether the buffer is filling up to the low watermark."""
+
+        return self.__is_buffering
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the writer has marked the end of the source."""
+
+        return self.__is_finished
+
+    @property
+    def is_drained(self) -> bool:
+        """Whether the end of the source is marked and all buffered audio has been read."""
+
+        return self.__is_finished and not self.__ring.available
+
+    def write(self, data: memoryview) -> bool:
+        if self.__ring.free_space < len(data):
+            self.overruns += 1
+
+        return self.__ring.write(data)
+
+    def write_nowait(self, data: memoryview) -> int:
+        """Write as much PCM as fits without blocking.
+
+        Note:
+            Overruns are not counted here, the caller knows when it really waits.
+        """
+
+        return self.__ring.write_nowait(data)
+
+    def read(self) -> Optional[memoryview]:
+        if not self.__is_ready():
+            self.padded_frames += 1
+            return None
+
+        chunk = self.__ring.read()
+        if chunk is None:
+            self.__on_underrun(self.chunk_size)
+        self.__call_marks()
+
+        return chunk
+
+    def read_into(self, buffer: memoryview) -> int:
+        if not self.__is_ready():
+            self.padded_frames += len(buffer) // self.chunk_size
+            return 0
+
+        length = self.__ring.read_into(buffer)
+        if length < len(buffer):
+            self.__on_underrun(len(buffer) - length)
+        self.__call_marks()
+
+        return length
+
+    def mark(self, callback: Callable[[], None]):
+        """Call the callback on the reader thread when everything written so far has been read.
+
+        Note:
+            The callback delays the reader, so it must be fast.
+        """
+
+        with self.__marks_lock:
+            self.__marks.append((self.__ring.write_position, callback))
+
+    def finish(self, on_drained: Optional[Callable[[], None]] = None):
+        """Mark the end of the source. Called by the writer after the last write.
+
+        Note:
+            The tail shorter than a chunk is padded with silence, so it's played too.
+
+        Args:
+            on_drained (`Callable[[], None]`, optional): Called on the reader thread when the rest is read.
+        """
+
+        tail_length = self.__ring.available % self.chunk_size
+        if tail_length:
+            # there is always room for the padding, the ring holds whole chunks
+            self.__ring.write_nowait(memoryview(bytes(self.chunk_size - tail_length)))
+
+        self.__is_finished = True
+        if on_drained:
+            self.mark(on_drained)
+
+    def __call_marks(self):
+        read_position = self.__ring.read_position
+        while True:
+            with self.__marks_lock:
+                if not self.__marks or self.__marks[0][0] > read_position:
+                    return
+                _, callback = self.__marks.popleft()
+
+            # not under the lock, the callback can stop the stream
+            callback()
+
+    def __is_ready(self) -> bool:
+        if self.__is_finished:
+            return True
+
+        if self.__is_buffering and self.__ring.available >= self.__low_watermark:
+            self.__is_buffering = False
+
+        return not self.__is_buffering
+
+    def __on_underrun(self, missed_length: int):
+        # the end of the source isn't an underrun
+        if self.__is_finished:
+            return
+
+        self.underruns += 1
+        self.padded_frames += math.ceil(missed_length / self.chunk_size)
+        self.__is_buffering = True
+
+    def clear(self):
+        with self.__marks_lock:
+            self.__marks.clear()
+        self.__ring.clear()
+        self.__is_buffering = True
+        self.__is_finished = False
+
+    def close(self):
+        # nothing is reported after stop
+        with self.__marks_lock:
+            self.__marks.clear()
+        self.__ring.close()
+
+
+class VideoDecodeAheadBuffer:
+    """Decoded video frames sized in milliseconds and capped by memory.
+
+    Note:
+        Frames are numbered in order of decoding. The reader asks for the frame which is due by its clock
+        and gets the latest decoded one of them, older ones are dropped. The writer waits when the buffer
+        is full by duration or by size. At least one frame is always buffered.
+    """
+
+    def __init__(
+        self,
+        frame_duration_ms: float,
+        duration_ms=VIDEO_DECODE_AHEAD_MS,
+        max_bytes=VIDEO_DECODE_AHEAD_MAX_BYTES,
+    ):
+        self.frame_duration_ms = frame_duration_ms
+        self.duration_ms = duration_ms
+        self.max_bytes = max_bytes
+
+        self.__max_frames = max(1, math.ceil(duration_ms / frame_duration_ms))
+        # (index, pts in ms, frame)
+        self.__frames = deque()
+        self.__bytes = 0
+        self.__next_index = 0
+        self.__condition = Condition()
+        self.__is_closed = False
+
+        self.repeated_frames = 0
+        '''How many times there was no decoded frame to show and the last one was shown again'''
+        self.dropped_frames = 0
+        '''How many decoded frames weren't shown because a newer one was already due'''
+        self.late_frames = 0
+        '''How many frames were shown later than they were due'''
+
+    @property
+    def queued_frames(self) -> int:
+        return len(self.__frames)
+
+    @property
+    def queued_bytes(self) -> int:
+        return self.__bytes
+
+    @property
+    def depth_ms(self) -> float:
+        """Duration of buffered video in milliseconds."""
+
+        return len(self.__frames) * self.frame_duration_ms
+
+    def put(self, pts: float, frame) -> bool:
+        """Add the next decoded frame. Waits for free space.
+
+        Returns:
+            `bool`: `False` if the buffer was closed.
+        """
+
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__is_closed or not self.__is_full(frame.nbytes))
+            if self.__is_closed:
+                return False
+
+            self.__frames.append((self.__next_index, pts, frame))
+            self.__bytes += frame.nbytes
+            self.__next_index += 1
+
+            return True
+
+    def take(self, due_index: Optional[int] = None):
+        """Take the latest frame which is due.
+
+        Args:
+            due_index (`int`, optional): Index of the frame which must be shown now. The oldest frame by default.
+
+        Returns:
+            `tuple`: Index, pts and frame. `None` when there is no due frame.
+        """
+
+        with self.__condition:
+            if not self.__frames:
+                self.repeated_frames += 1
+                return None
+
+            if due_index is None:
+                due_index = self.__frames[0][0]
+
+            taken = None
+            while self.__frames and self.__frames[0][0] <= due_index:
+                if taken is not None:
+                    self.dropped_frames += 1
+                taken = self.__frames.popleft()
+                self.__bytes -= taken[2].nbytes
+
+            if taken is not None:
+                if taken[0] < due_index:
+                    self.late_frames += 1
+                self.__condition.notify_all()
+
+            return taken
+
+    def __is_full(self, frame_size: int) -> bool:
+        if not self.__frames:
+            return False
+
+        return len(self.__frames) >= self.__max_frames or self.__bytes + frame_size > self.max_bytes
+
+    def clear(self):
+        with self.__condition:
+            self.__frames.clear()
+            self.__bytes = 0
+            self.__condition.notify_all()
+
+    def close(self):
+        with self.__condition:
+            self.__is_closed = True
+            self.__frames.clear()
+            self.__bytes = 0
+            self.__condition.notify_all()
+
+
 class QueueStream:
     def __init__(self, on_end_callback, queue_size):
         self.queue_size = queue_size
@@ -100,8 +708,22 @@ class QueueStream:
 
 
 class VideoStream(QueueStream):
-    def __init__(self, source, repeat, on_end_callback, queue_size=VIDEO_QUEUE_SIZE):
-        super().__init__(on_end_callback, queue_size)
+    """Video stream decoded by OpenCV.
+
+    Note:
+        Frames are decoded ahead into `buffer` by a thread. The native thread reads them by the clock
+        of the stream, which starts with the first frame and stops on pause.
+    """
+
+    def __init__(
+        self,
+        source,
+        repeat,
+        on_end_callback,
+        decode_ahead_ms=VIDEO_DECODE_AHEAD_MS,
+        decode_ahead_max_bytes=VIDEO_DECODE_AHEAD_MAX_BYTES,
+    ):
+        super().__init__(on_end_callback, 1)
 
         self.source = source
         self.video_capture = None
@@ -111,65 +733,125 @@ class VideoStream(QueueStream):
 
         self.repeat = repeat
 
+        self.decode_ahead_ms = decode_ahead_ms
+        self.decode_ahead_max_bytes = decode_ahead_max_bytes
+        self.buffer = None
+        '''Decode-ahead buffer with repeated, dropped and late frames counters. Created on start'''
+
         self.__pts = 0
+        self.__decoded_pts = 0
         self.__last_frame = None
-        self.__lock = Lock()
+        # an empty pass after rewind means the source can't be repeated
+        self.__has_decoded_frames = False
+        # monotonic time of the frame with index 0
+        self.__started_at = None
+        self.__paused_at = None
 
     def start(self):
+        fps = self.get_video_info().fps or VideoInfo.default().fps
+        self.buffer = VideoDecodeAheadBuffer(MILLIS_IN_SEC / fps, self.decode_ahead_ms, self.decode_ahead_max_bytes)
+
         return super().start()
 
+    def stop(self):
+        super().stop()
+        if self.buffer:
+            self.buffer.close()
+
+    def set_pause(self, pause: bool):
+        now = time.monotonic()
+        if pause and not self.is_paused:
+            self.__paused_at = now
+        elif not pause and self.is_paused and self.__started_at is not None:
+            # the clock doesn't go while paused
+            self.__started_at += now - self.__paused_at
+
+        super().set_pause(pause)
+
     def get_video_info(self) -> VideoInfo:
         if self.video_capture and self.video_capture.isOpened():
             return VideoInfo(
                 round(self.video_capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
                 round(self.video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
                 self.video_capture.get(cv2.CAP_PROP_FPS),
+                # frames of OpenCV are passed as is
+                get_pixel_format('BGR'),
             )
 
         return VideoInfo.default()
 
     def read(self):
-        try:
-            if self.is_paused:
-                raise Empty
+        if self.is_paused or not self.buffer:
+            return self.__last_frame
 
-            return super().read()
-        except Empty:
-            if self.__last_frame:
-                return self.__last_frame
+        now = time.monotonic()
+        frame_duration = self.buffer.frame_duration_ms / MILLIS_IN_SEC
+
+        due_index = None
+        if self.__started_at is not None:
+            due_index = int((now - self.__started_at) / frame_duration)
+
+        taken = self.buffer.take(due_index)
+        if taken is not None:
+            index, self.__pts, self.__last_frame = taken
+            if self.__started_at is None:
+                # reads land in the middle of frame intervals, so jitter of ticks doesn't drop frames
+                self.__started_at = now - (index + 0.5) * frame_duration
+
+        return self.__last_frame
 
     def get_pts(self):
         return self.__pts
 
-    def skip_next_frame(self):
-        self.__lock.acquire(True)
-
-    def get_next_frame(self) -> Optional[bytes]:
+    def get_next_frame(self):
         # when video file hasn't been passed
-        if not self.video_capture:
+        if not self._is_opened():
             return
 
-        if self.video_capture and self.video_capture.isOpened():
-            grabbed, frame = self.video_capture.read()
-            if not grabbed or frame is None:
-                self._on_end_callback(self.source)
-                if self.repeat:
-                    self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 1)
-                    return
-                else:
-                    self.stop()
-                    return
+        decoded = self._decode_next_frame()
+        if decoded is None:
+            self._on_end_callback(self.source)
+            if self.repeat and self.__has_decoded_frames and self._rewind():
+                self.__has_decoded_frames = False
+                return
+            else:
+                self.stop()
+                return
 
-            self.__pts = self.video_capture.get(cv2.CAP_PROP_POS_MSEC)
+        frame, self.__decoded_pts = decoded
+        self.__has_decoded_frames = True
 
-            if self.__lock.locked():
-                self.__lock.release()
-                return
+        # decoded array is read by the native side in place through the buffer protocol
+        return frame
+
+    def _is_opened(self) -> bool:
+        return self.video_capture is not None and self.video_capture.isOpened()
+
+    def _decode_next_frame(self):
+        """Decode the next frame.
+
+        Returns:
+            `tuple`: Frame in the format of `get_video_info` and its pts in ms. `None` at the end of the source.
+        """
+
+        grabbed, frame = self.video_capture.read()
+        if not grabbed or frame is None:
+            return None
+
+        return frame, self.video_capture.get(cv2.CAP_PROP_POS_MSEC)
+
+    def _rewind(self) -> bool:
+        """Seek to the beginning of the source.
 
-            rgba = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
-            rgba_bytes = rgba.tobytes()
+        Returns:
+            `bool`: `False` when the source can't be seeked.
+        """
 
-            return rgba_bytes
+        return self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 1)
+
+    def _release(self):
+        if self.video_capture:
+            self.video_capture.release()
 
     def _update(self):
         while True:
@@ -181,26 +863,102 @@ class VideoStream(QueueStream):
             if frame is None:
                 continue
 
-            self.__last_frame = frame
-            # its necessary for thread blocking
-            self.put(frame)
+            # waits while the buffer is full
+            self.buffer.put(self.__decoded_pts, frame)
 
-        if self.video_capture:
-            self.video_capture.release()
+        self._release()
 
 
-class AudioStream(QueueStream):
-    __REQUESTED_AUDIO_BYTES_LENGTH = DEFAULT_REQUESTED_AUDIO_BYTES_LENGTH
+class AVVideoStream(VideoStream):
+    """Video stream decoded by PyAV (FFmpeg) instead of OpenCV.
 
+    Note:
+        The codec decodes with its own threads (frame and slice threading). PyAV releases the GIL while
+        decoding and scaling, so other Python threads aren't blocked. Frames are scaled and converted
+        to I420 by libswscale and passed to the native side without any color conversion.
+
+        Capturing devices are not supported, use `VideoStream` for them.
+    """
+
+    def __init__(
+        self,
+        source,
+        repeat,
+        on_end_callback,
+        decode_ahead_ms=VIDEO_DECODE_AHEAD_MS,
+        decode_ahead_max_bytes=VIDEO_DECODE_AHEAD_MAX_BYTES,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        thread_count=0,
+    ):
+        """Open the source.
+
+        Args:
+            width (`int`, optional): Width of output frames. Width of the source by default.
+            height (`int`, optional): Height of output frames. Height of the source by default.
+                When only one of them is passed, the other one keeps the aspect ratio of the source.
+            thread_count (`int`, optional): Count of decoding threads. 0 is auto.
+        """
+
+        super().__init__(None, repeat, on_end_callback, decode_ahead_ms, decode_ahead_max_bytes)
+
+        self.source = source
+        self.__input_container = av.open(source)
+        if not len(self.__input_container.streams.video):
+            raise RuntimeError('Cant find video stream')
+
+        self.__video_stream = self.__input_container.streams.video[0]
+        self.__video_stream.thread_type = 'AUTO'
+        self.__video_stream.codec_context.thread_count = thread_count
+
+        codec_context = self.__video_stream.codec_context
+        self.__width, self.__height = get_scaled_video_size(codec_context.width, codec_context.height, width, height)
+        self.__fps = float(self.__video_stream.average_rate or VideoInfo.default().fps)
+
+        self.__video_frame_iter = iter(self.__input_container.decode(self.__video_stream))
+
+    def get_video_info(self) -> VideoInfo:
+        return VideoInfo(self.__width, self.__height, self.__fps, get_pixel_format('I420'))
+
+    def _is_opened(self) -> bool:
+        return True
+
+    def _decode_next_frame(self):
+        try:
+            frame = next(self.__video_frame_iter)
+        except StopIteration:
+            return None
+
+        # planes of yuv420p array go one after another without padding, as I420 requires
+        image = frame.reformat(self.__width, self.__height, 'yuv420p').to_ndarray()
+        pts = frame.time * MILLIS_IN_SEC if frame.time is not None else 0
+
+        return image, pts
+
+    def _rewind(self) -> bool:
+        if not rewind_container(self.__input_container):
+            return False
+
+        self.__video_frame_iter = iter(self.__input_container.decode(self.__video_stream))
+        return True
+
+    def _release(self):
+        self.__input_container.close()
+
+
+class AudioStream(QueueStream):
     def __init__(
         self,
         source: str,
         repeat: bool,
         on_end_callback,
-        queue_size=AUDIO_QUEUE_SIZE,
-        video_stream: Optional[VideoStream] = None,
+        sample_rate=DEFAULT_AUDIO_SAMPLE_RATE,
+        channels=DEFAULT_AUDIO_CHANNELS,
+        buffer_low_watermark_ms=AUDIO_BUFFER_LOW_WATERMARK_MS,
+        buffer_high_watermark_ms=AUDIO_BUFFER_HIGH_WATERMARK_MS,
+        cache_decoded_audio=False,
     ):
-        super().__init__(on_end_callback, queue_size)
+        super().__init__(on_end_callback, 1)
 
         self.source = source
         self.__input_container = av.open(source)
@@ -209,41 +967,77 @@ class AudioStream(QueueStream):
 
         codec_context = self.__input_container.streams.audio[0].codec_context
 
-        self.__input_container.no_buffer = True
-        self.__input_container.flush_packets = True
-        codec_context.low_delay = True
+        # flag properties were removed from PyAV, the flags are the same in all versions
+        self.__input_container.flags |= AV_FORMAT_FLAG_NO_BUFFER | AV_FORMAT_FLAG_FLUSH_PACKETS
+        codec_context.flags |= AV_CODEC_FLAG_LOW_DELAY
 
-        # TODO so strange dirty fix
-        audio_rate = codec_context.sample_rate
-        rate = REVERSED_AUDIO_SAMPLE_RATE.get(audio_rate, DEFAULT_AUDIO_SAMPLE_RATE)
+        if channels not in AUDIO_CHANNEL_LAYOUTS:
+            raise ValueError(f'Unsupported count of channels: {channels}')
 
-        self.__audio_resampler = av.AudioResampler(format='s16', layout='mono', rate=rate)
+        # the only conversion on the way to the native device. It must produce exactly the native format,
+        # any other rate changes duration and pitch of the played audio
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.__audio_resampler = self.__create_resampler()
         self.__audio_stream_iter = iter(self.__input_container.decode(audio=0))
 
-        self.__video_stream = video_stream
-
         self.repeat = repeat
 
         self.__pts = 0
         self.__pts_offset = None
+        # an empty pass after rewind means the source can't be repeated
+        self.__has_decoded_frames = False
 
-        self.__frame_tail = b''
+        chunk_size = sample_rate * AUDIO_CHUNK_DURATION_MS // MILLIS_IN_SEC * channels * 2
+        self.buffer = AudioJitterBuffer(chunk_size, buffer_low_watermark_ms, buffer_high_watermark_ms)
 
-    def read(self, length: int):
-        self.__REQUESTED_AUDIO_BYTES_LENGTH = length
+        # resampled PCM of the first pass is stored in the file and replayed from its mmap on next loops
+        self.__cache_file = None
+        if cache_decoded_audio and repeat:
+            self.__cache_file = tempfile.TemporaryFile(prefix='pytgcalls_audio_')
+        self.__cache = None
+        self.__cache_position = 0
 
-        try:
-            if self.is_paused:
-                raise Empty
+    @property
+    def is_replaying_cache(self) -> bool:
+        return self.__cache is not None
+
+    def stop(self):
+        super().stop()
+        self.buffer.close()
+
+    def read(self) -> Optional[memoryview]:
+        """Get the next 10 ms chunk.
+
+        Note:
+            Returned view is valid until the next call of `read`.
+        """
+
+        if self.is_paused:
+            return None
+
+        return self.buffer.read()
 
-            return super().read()
-        except Empty:
-            pass
+    def read_into(self, buffer: memoryview) -> int:
+        """Copy buffered PCM into the buffer.
+
+        Returns:
+            `int`: Count of copied bytes.
+        """
+
+        if self.is_paused:
+            return 0
+
+        return self.buffer.read_into(buffer)
 
     def get_pts(self):
-        return self.__pts - self.__pts_offset
+        if self.__pts_offset is None:
+            return 0
+
+        # decoded but not played audio is still in the buffer
+        return self.__pts - self.__pts_offset - self.buffer.depth_ms
 
-    def get_next_frame(self) -> Optional[List[bytes]]:
+    def get_next_frame(self) -> Optional[List[memoryview]]:
         try:
             frame = next(self.__audio_stream_iter)
 
@@ -251,70 +1045,769 @@ class AudioStream(QueueStream):
                 self.__pts_offset = frame.time * MILLIS_IN_SEC
             self.__pts = frame.time * MILLIS_IN_SEC
 
-            if self.__video_stream:
-                pts_diff = self.__video_stream.get_pts() - self.get_pts()
-                if os.environ.get('DEBUG'):
-                    if pts_diff < 0:
-                        logger.debug(f'Video behind the audio {-pts_diff}')
-                    if pts_diff > 0:
-                        logger.debug(f'Audio behind the video {pts_diff}')
-
-                # welcome to my magic values
-                if pts_diff > 100:
-                    logger.debug(f'Skip 1 audio frame')
-                    frame = next(self.__audio_stream_iter)
-                if pts_diff < -100:
-                    logger.debug('Skip 1 video frame')
-                    self.__video_stream.skip_next_frame()
-
             frame.pts = None
+            self.__has_decoded_frames = True
         except StopIteration:
-            self._on_end_callback(self.source)
-            if self.repeat:
-                # TODO it doesnt work with live streams and will crash on the end of stream
-                self.__input_container.seek(0)
+            # samples held by the resampler are the end of the source, they go to the cache too
+            for pcm in self.__resample(None):
+                self.buffer.write(pcm)
+
+            if self.repeat and self.__cache_file and self.__cache_file.tell():
+                logger.debug('Replay audio from decoded cache.')
+                self.__cache_file.flush()
+                self.__cache = mmap.mmap(self.__cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.__input_container.close()
+                self.buffer.mark(self.__on_loop_played)
+                return
+            elif self.repeat and self.__has_decoded_frames and rewind_container(self.__input_container):
+                self.__has_decoded_frames = False
                 self.__audio_stream_iter = iter(self.__input_container.decode(audio=0))
-                self.__frame_tail = b''
+                self.buffer.mark(self.__on_loop_played)
                 return
             else:
-                self.stop()
+                # the rest of the buffer is still played, the decoding thread ends
+                self.buffer.finish(self.__on_played)
                 return
 
-        resampled_frame = self.__audio_resampler.resample(frame)
+        return self.__resample(frame)
 
-        frame_bytes = self.__frame_tail
-        if resampled_frame:
-            if isinstance(resampled_frame, list):
-                # for av 9.0+
-                frame_bytes += resampled_frame[0].to_ndarray().tobytes()
-            else:
-                # for av 8
-                frame_bytes += resampled_frame.to_ndarray().tobytes()
-
-        cut_frames = [
-            frame_bytes[i : i + self.__REQUESTED_AUDIO_BYTES_LENGTH]
-            for i in range(0, len(frame_bytes), self.__REQUESTED_AUDIO_BYTES_LENGTH)
-        ]
-
-        frames_to_return = []
-        for frame in cut_frames:
-            if len(frame) == self.__REQUESTED_AUDIO_BYTES_LENGTH:
-                frames_to_return.append(frame)
-            else:
-                self.__frame_tail = frame
+    def __create_resampler(self) -> 'av.AudioResampler':
+        return av.AudioResampler(format='s16', layout=AUDIO_CHANNEL_LAYOUTS[self.channels], rate=self.sample_rate)
+
+    def __resample(self, frame) -> List[memoryview]:
+        """Convert the frame to the native format. `None` flushes the resampler at the end of the source."""
+
+        resampled_frames = self.__audio_resampler.resample(frame)
+        if not isinstance(resampled_frames, list):
+            # for av 8
+            resampled_frames = [resampled_frames] if resampled_frames else []
+        if frame is None:
+            # flushed resampler doesn't accept frames of the next loop
+            self.__audio_resampler = self.__create_resampler()
+
+        # views over decoded data without copying. Tail of 10 ms chunk stays in the ring
+        pcm_list = [memoryview(resampled_frame.to_ndarray()).cast('B') for resampled_frame in resampled_frames]
+        if self.__cache_file:
+            for pcm in pcm_list:
+                self.__cache_file.write(pcm)
+
+        return pcm_list
+
+    def __on_loop_played(self):
+        self._on_end_callback(self.source)
 
-        return frames_to_return
+    def __on_played(self):
+        self.stop()
+        self._on_end_callback(self.source)
+
+    def get_next_cached_frame(self) -> Optional[memoryview]:
+        if self.__cache_position >= len(self.__cache):
+            self.buffer.mark(self.__on_loop_played)
+            self.__cache_position = 0
+            return
+
+        start = self.__cache_position
+        self.__cache_position = min(start + AUDIO_CACHE_READ_CHUNKS * self.buffer.chunk_size, len(self.__cache))
+        # the cache starts with the first decoded frame
+        self.__pts = self.__pts_offset + self.__cache_position / self.buffer.chunk_size * AUDIO_CHUNK_DURATION_MS
+
+        return memoryview(self.__cache)[start : self.__cache_position]
 
     def _update(self):
         while True:
-            if not self.is_running:
+            if not self.is_running or self.buffer.is_finished:
                 break
 
-            frame_list = self.get_next_frame()
-            if frame_list is None:
+            if self.__cache is not None:
+                pcm = self.get_next_cached_frame()
+                if pcm is not None:
+                    self.buffer.write(pcm)
+                    # views must be released before closing of mmap
+                    pcm.release()
+                continue
+
+            pcm_list = self.get_next_frame()
+            if pcm_list is None:
                 continue
 
-            for frame in frame_list:
-                self.put(frame)
+            for pcm in pcm_list:
+                # its necessary for thread blocking
+                self.buffer.write(pcm)
 
         self.__input_container.close()
+        if self.__cache is not None:
+            self.__cache.close()
+        if self.__cache_file:
+            self.__cache_file.close()
+
+
+class DemuxedAudioStream:
+    """Audio output of `MediaDemuxer`. It's read by the native thread as `AudioStream`."""
+
+    def __init__(self, demuxer: 'MediaDemuxer', on_end_callback, chunk_size: int, low_watermark_ms, high_watermark_ms):
+        self.source = demuxer.source
+        self.buffer = AudioJitterBuffer(chunk_size, low_watermark_ms, high_watermark_ms)
+
+        self.is_running = False
+        self.is_paused = False
+
+        self._on_end_callback = on_end_callback
+
+    def set_pause(self, pause: bool):
+        self.is_paused = pause
+
+    def stop(self):
+        self.is_running = False
+        self.buffer.close()
+
+    def read(self) -> Optional[memoryview]:
+        if self.is_paused:
+            return None
+
+        return self.buffer.read()
+
+    def read_into(self, buffer: memoryview) -> int:
+        if self.is_paused:
+            return 0
+
+        return self.buffer.read_into(buffer)
+
+
+class DemuxedVideoStream:
+    """Video output of `MediaDemuxer`. Frames are given out when the media clock reaches their pts.
+
+    Note:
+        The native thread calls `read` with the frame rate of the source. It gets the next frame which is due.
+        When video is behind the clock by more than one frame, late frames are dropped to catch up.
+        Until the next frame is due the last one is repeated.
+    """
+
+    def __init__(self, demuxer: 'MediaDemuxer', on_end_callback, queue_size: int):
+        self.source = demuxer.source
+
+        # (pts in ms, I420 frame)
+        self.__frames = deque()
+        self.__queue_size = queue_size
+        self.__lock = Lock()
+        self.__demuxer = demuxer
+        self.__frame_duration_ms = MILLIS_IN_SEC / demuxer.get_video_info().fps
+
+        self.__last_frame = None
+        self.__last_frame_pts = 0
+
+        self.is_running = False
+        self.is_paused = False
+
+        self.dropped_frames = 0
+        '''How many frames weren't shown because they were late or the queue was full'''
+        self.drift_ms = 0.0
+        '''PTS of the last shown frame minus the media clock. Negative when video is behind audio'''
+
+        self._on_end_callback = on_end_callback
+
+    def set_pause(self, pause: bool):
+        self.is_paused = pause
+
+    def stop(self):
+        self.is_running = False
+
+    def get_video_info(self) -> VideoInfo:
+        return self.__demuxer.get_video_info()
+
+    def get_pts(self):
+        return self.__last_frame_pts
+
+    @property
+    def queued_frames(self) -> int:
+        return len(self.__frames)
+
+    def put(self, pts: float, frame):
+        with self.__lock:
+            if len(self.__frames) >= self.__queue_size:
+                self.__frames.popleft()
+                self.dropped_frames += 1
+            self.__frames.append((pts, frame))
+
+    def read(self):
+        if self.is_paused:
+            return self.__last_frame
+
+        clock = self.__demuxer.get_clock_ms()
+        with self.__lock:
+            while self.__frames and self.__frames[0][0] <= clock:
+                pts, frame = self.__frames.popleft()
+                # ticks of the native thread and pts don't match exactly, so one frame of lag is normal
+                if self.__frames and self.__frames[0][0] <= clock - self.__frame_duration_ms:
+                    self.dropped_frames += 1
+                    continue
+
+                self.__last_frame, self.__last_frame_pts = frame, pts
+                self.drift_ms = pts - clock
+                break
+
+        return self.__last_frame
+
+
+class MediaDemuxer:
+    """One demuxer and decoder for audio and video of the same source.
+
+    Note:
+        The source is opened and read once. Audio goes to the jitter buffer of `audio` output
+        and paces decoding. Video frames wait in `video` output until the media clock reaches their pts.
+
+        The media clock is pts of audio handed to the native side right now. So video follows audio,
+        and pausing of audio pauses video too. When audio output is stopped, the clock continues by wall time.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        repeat: bool,
+        on_audio_end_callback,
+        on_video_end_callback,
+        sample_rate=DEFAULT_AUDIO_SAMPLE_RATE,
+        channels=DEFAULT_AUDIO_CHANNELS,
+        buffer_low_watermark_ms=AUDIO_BUFFER_LOW_WATERMARK_MS,
+        buffer_high_watermark_ms=AUDIO_BUFFER_HIGH_WATERMARK_MS,
+        video_queue_ms=VIDEO_SYNC_QUEUE_MS,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ):
+        self.source = source
+        self.repeat = repeat
+
+        self.__input_container = av.open(source)
+        if not len(self.__input_container.streams.audio) or not len(self.__input_container.streams.video):
+            raise RuntimeError('Cant find audio and video streams')
+
+        self.__audio_stream = self.__input_container.streams.audio[0]
+        self.__video_stream = self.__input_container.streams.video[0]
+        self.__video_stream.thread_type = 'AUTO'
+
+        if channels not in AUDIO_CHANNEL_LAYOUTS:
+            raise ValueError(f'Unsupported count of channels: {channels}')
+
+        self.__sample_rate = sample_rate
+        self.__channels = channels
+        self.__audio_resampler = self.__create_resampler()
+
+        codec_context = self.__video_stream.codec_context
+        self.__width, self.__height = get_scaled_video_size(codec_context.width, codec_context.height, width, height)
+        self.__fps = float(self.__video_stream.average_rate or VideoInfo.default().fps)
+
+        self.__packets = self.__input_container.demux(self.__audio_stream, self.__video_stream)
+        # an empty pass after rewind means the source can't be repeated
+        self.__has_packets = False
+
+        # pts of repeated source starts from 0 on every loop, but the clock must grow
+        self.__loop_offset_ms = 0.0
+        self.__video_end_ms = 0.0
+
+        # pts of the end of audio written to the buffer
+        self.__audio_end_ms = None
+        self.__last_clock_ms = 0.0
+        self.__wall_clock_start = None
+
+        chunk_size = sample_rate * AUDIO_CHUNK_DURATION_MS // MILLIS_IN_SEC * channels * 2
+        self.audio = DemuxedAudioStream(
+            self, on_audio_end_callback, chunk_size, buffer_low_watermark_ms, buffer_high_watermark_ms
+        )
+        video_queue_size = max(2, math.ceil(self.__fps * (buffer_high_watermark_ms + video_queue_ms) / MILLIS_IN_SEC))
+        self.video = DemuxedVideoStream(self, on_video_end_callback, video_queue_size)
+
+        self.thread = Thread(target=self._update, args=())
+        self.thread.daemon = True
+
+    def get_video_info(self) -> VideoInfo:
+        return VideoInfo(self.__width, self.__height, self.__fps, get_pixel_format('I420'))
+
+    def get_clock_ms(self) -> float:
+        """Current position of playback by pts in milliseconds."""
+
+        if self.audio.is_running:
+            self.__wall_clock_start = None
+            if self.__audio_end_ms is not None:
+                # decoded but not played audio is still in the buffer
+                self.__last_clock_ms = self.__audio_end_ms - self.audio.buffer.depth_ms
+
+            return self.__last_clock_ms
+
+        now = time.monotonic() * MILLIS_IN_SEC
+        if self.__wall_clock_start is None:
+            self.__wall_clock_start = now - self.__last_clock_ms
+
+        return now - self.__wall_clock_start
+
+    def start(self):
+        self.audio.is_running = self.video.is_running = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.audio.stop()
+        self.video.stop()
+
+    def __create_resampler(self) -> 'av.AudioResampler':
+        return av.AudioResampler(format='s16', layout=AUDIO_CHANNEL_LAYOUTS[self.__channels], rate=self.__sample_rate)
+
+    def __write_audio(self, frame, pts: float):
+        """Resample and buffer the frame. `None` flushes the resampler at the end of the source."""
+
+        if frame is not None:
+            # resampler doesn't accept pts of frames of different sources
+            frame.pts = None
+        resampled_frames = self.__audio_resampler.resample(frame)
+        if not isinstance(resampled_frames, list):
+            # for av 8
+            resampled_frames = [resampled_frames] if resampled_frames else []
+        if frame is None:
+            # flushed resampler doesn't accept frames of the next loop
+            self.__audio_resampler = self.__create_resampler()
+
+        for resampled_frame in resampled_frames:
+            # its necessary for thread blocking
+            self.audio.buffer.write(memoryview(resampled_frame.to_ndarray()).cast('B'))
+
+            pts += resampled_frame.samples * MILLIS_IN_SEC / self.__sample_rate
+            self.__audio_end_ms = pts
+
+    def __on_end(self) -> bool:
+        if self.audio.is_running and self.__audio_end_ms is not None:
+            # samples held by the resampler are the end of audio
+            self.__write_audio(None, self.__audio_end_ms)
+
+        if not self.repeat or not self.__has_packets or not rewind_container(self.__input_container):
+            # the rest of the buffer is still played
+            self.__when_played(self.__on_played, is_last=True)
+            return False
+
+        self.__when_played(self.__on_loop_played)
+        self.__has_packets = False
+        self.__packets = self.__input_container.demux(self.__audio_stream, self.__video_stream)
+        self.__loop_offset_ms = max(self.__audio_end_ms or 0, self.__video_end_ms)
+
+        return True
+
+    def __when_played(self, callback: Callable[[], None], is_last=False):
+        # video follows the audio clock, so both end when the buffered audio is played
+        if not self.audio.is_running:
+            callback()
+        elif is_last:
+            self.audio.buffer.finish(callback)
+        else:
+            self.audio.buffer.mark(callback)
+
+    def __on_loop_played(self):
+        for output in (self.audio, self.video):
+            if output.is_running:
+                output._on_end_callback(self.source)
+
+    def __on_played(self):
+        outputs = [output for output in (self.audio, self.video) if output.is_running]
+        self.stop()
+        for output in outputs:
+            output._on_end_callback(self.source)
+
+    def _update(self):
+        while self.audio.is_running or self.video.is_running:
+            try:
+                packet = next(self.__packets)
+            except StopIteration:
+                if not self.__on_end():
+                    break
+                continue
+
+            self.__has_packets = True
+            is_audio = packet.stream.type == 'audio'
+            # outputs can be stopped separately
+            if not (self.audio.is_running if is_audio else self.video.is_running):
+                continue
+
+            for frame in packet.decode():
+                if frame.time is None:
+                    continue
+
+                pts = frame.time * MILLIS_IN_SEC + self.__loop_offset_ms
+                if is_audio:
+                    self.__write_audio(frame, pts)
+                    continue
+
+                image = frame.reformat(self.__width, self.__height, 'yuv420p').to_ndarray()
+                self.__video_end_ms = pts + MILLIS_IN_SEC / self.__fps
+
+                # without audio nothing else paces decoding
+                while not self.audio.is_running and self.video.is_running and self.video.queued_frames > 1:
+                    time.sleep(1 / self.__fps)
+                self.video.put(pts, image)
+
+        self.__input_container.close()
+
+
+class AsyncAudioStream:
+    """Audio stream fed by an async iterator of PCM.
+
+    Note:
+        The iterator is consumed by a task on the event loop, no threads are used. The native thread
+        reads from the jitter buffer as with `AudioStream`. When the buffer is full the task waits
+        without blocking the loop until the reader frees space, so the iterator is asked for the next piece
+        only when there is room.
+
+        Yielded PCM must already be in the native format (16-bit, `sample_rate`, `channels`).
+        Pieces of any size are accepted. The end callback is called on the loop when the buffered audio is played.
+        When the iterator raises, the audio yielded before is played, the exception is kept in `error`
+        and the end callback is called too.
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterator[bytes],
+        on_end_callback,
+        sample_rate=DEFAULT_AUDIO_SAMPLE_RATE,
+        channels=DEFAULT_AUDIO_CHANNELS,
+        buffer_low_watermark_ms=AUDIO_BUFFER_LOW_WATERMARK_MS,
+        buffer_high_watermark_ms=AUDIO_BUFFER_HIGH_WATERMARK_MS,
+    ):
+        self.source = source
+        self.__iterator = source.__aiter__()
+
+        chunk_size = sample_rate * AUDIO_CHUNK_DURATION_MS // MILLIS_IN_SEC * channels * 2
+        self.buffer = AudioJitterBuffer(chunk_size, buffer_low_watermark_ms, buffer_high_watermark_ms)
+
+        self.task = None
+        # created on the loop by `start`
+        self.__loop = None
+        self.__space_event = None
+        self.__drained_event = None
+        self.__is_space_waited = False
+
+        self.is_running = False
+        self.is_paused = False
+
+        self.error = None
+        '''Exception raised by the iterator. None when it was exhausted normally'''
+
+        self._on_end_callback = on_end_callback
+
+    def set_pause(self, pause: bool):
+        self.is_paused = pause
+
+    def start(self):
+        self.__loop = asyncio.get_event_loop()
+        self.__space_event = asyncio.Event()
+        self.__drained_event = asyncio.Event()
+
+        self.is_running = True
+        self.task = asyncio.ensure_future(self._update())
+        return self
+
+    def stop(self):
+        self.is_running = False
+        self.buffer.close()
+        if self.task and not self.task.done() and self.task is not asyncio.current_task():
+            self.task.cancel()
+
+    def read(self) -> Optional[memoryview]:
+        """Get the next 10 ms chunk.
+
+        Note:
+            Returned view is valid until the next call of `read`.
+        """
+
+        if self.is_paused:
+            return None
+
+        chunk = self.buffer.read()
+        self.__notify_space()
+        return chunk
+
+    def read_into(self, buffer: memoryview) -> int:
+        """Copy buffered PCM into the buffer.
+
+        Returns:
+            `int`: Count of copied bytes.
+        """
+
+        if self.is_paused:
+            return 0
+
+        length = self.buffer.read_into(buffer)
+        self.__notify_space()
+        return length
+
+    def __notify_space(self):
+        # reader thread. The loop is woken up only when the task waits
+        if self.__is_space_waited:
+            self.__is_space_waited = False
+            self.__call_soon_threadsafe(self.__space_event.set)
+
+    def __call_soon_threadsafe(self, callback):
+        try:
+            self.__loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            logger.debug('Event loop is closed.')
+
+    async def __write(self, pcm: memoryview):
+        pcm = pcm[self.buffer.write_nowait(pcm) :]
+        if pcm:
+            self.buffer.overruns += 1
+
+        while pcm and self.is_running:
+            self.__space_event.clear()
+            self.__is_space_waited = True
+            # the reader could free space before the flag was set
+            pcm = pcm[self.buffer.write_nowait(pcm) :]
+            if pcm:
+                await self.__space_event.wait()
+                pcm = pcm[self.buffer.write_nowait(pcm) :]
+
+    async def _update(self):
+        try:
+            async for data in self.__iterator:
+                await self.__write(memoryview(data).cast('B'))
+                if not self.is_running:
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # audio yielded before is still played
+            self.error = e
+        finally:
+            # the iterator could be suspended in the middle, let it clean up
+            aclose = getattr(self.__iterator, 'aclose', None)
+            if aclose and not self.is_running:
+                await aclose()
+
+        # the playout ends when buffered audio is played, not when the iterator is exhausted
+        self.buffer.finish(lambda: self.__call_soon_threadsafe(self.__drained_event.set))
+        await self.__drained_event.wait()
+
+        if not self.is_running:
+            return
+
+        self.stop()
+        self._on_end_callback(self.source)
+
+
+class AudioRecordDropPolicy(Enum):
+    DROP_OLDEST = 'drop_oldest'
+    '''Drop the oldest not delivered batch to make room for the new one.'''
+    DROP_NEWEST = 'drop_newest'
+    '''Drop the new batch and keep already queued ones.'''
+
+
+class AudioRecordSink:
+    """Batched delivery of recorded PCM to a consumer on a worker thread.
+
+    Note:
+        `write` is called by the native thread every 10 ms. It only copies PCM into the current batch,
+        so slow consumers don't delay the native thread. Full batches wait in a bounded queue.
+        When the queue is full, a batch is dropped according to `drop_policy`.
+
+        The consumer gets `bytearray` with `batch_ms` of PCM (the last batch can be shorter). Batches are reused
+        from a small pool, so the passed one is valid only until the consumer returns. Copy it (`bytes(batch)`)
+        to keep the data. Use `to_asyncio_queue` and `to_file` for the common consumers.
+    """
+
+    def __init__(
+        self,
+        consumer: Callable[[bytearray], None],
+        batch_ms=AUDIO_RECORD_BATCH_MS,
+        max_batches=AUDIO_RECORD_MAX_BATCHES,
+        drop_policy=AudioRecordDropPolicy.DROP_OLDEST,
+        sample_rate=DEFAULT_AUDIO_SAMPLE_RATE,
+        channels=DEFAULT_AUDIO_CHANNELS,
+        on_stop: Optional[Callable[[], None]] = None,
+    ):
+        """Create a sink. It must be started before the first `write`.
+
+        Args:
+            consumer (`Callable[[bytearray], None]`): Called on the worker thread for every batch.
+            batch_ms (`int`, optional): Duration of one batch in milliseconds.
+            max_batches (`int`, optional): Max count of batches waiting for the consumer.
+            drop_policy (`AudioRecordDropPolicy`, optional): What to drop when the consumer is too slow.
+            sample_rate (`int`, optional): Sample rate of recorded PCM.
+            channels (`int`, optional): Count of channels of recorded PCM.
+            on_stop (`Callable[[], None]`, optional): Called on the worker thread after the last batch.
+        """
+
+        if max_batches < 1:
+            raise ValueError('At least one batch must fit into the queue')
+
+        self.consumer = consumer
+        self.batch_ms = batch_ms
+        self.drop_policy = drop_policy
+
+        self.__batch_size = int(sample_rate * channels * 2 * batch_ms / MILLIS_IN_SEC)
+        # delivered and dropped batches are reused. Queued ones, the delivered one and the current one are enough
+        self.__free_batches = deque()
+        self.__max_free_batches = max_batches + 2
+        self.__batch = bytearray(self.__batch_size)
+        self.__batch_length = 0
+
+        # (batch, monotonic time when it became full)
+        self.__batches = deque()
+        self.__max_batches = max_batches
+        self.__condition = Condition()
+
+        self.__on_stop = on_stop
+        self.__thread = Thread(target=self._update, args=())
+        self.__thread.daemon = True
+        self.is_running = False
+
+        self.delivered_batches = 0
+        '''How many batches were passed to the consumer'''
+        self.dropped_batches = 0
+        '''How many batches were dropped because the consumer was too slow'''
+        self.lag_ms = 0.0
+        '''Time between completion and delivery of the last batch'''
+        self.max_lag_ms = 0.0
+        '''Max value of `lag_ms`'''
+
+    @classmethod
+    def to_asyncio_queue(cls, queue: asyncio.Queue, loop: Optional[asyncio.AbstractEventLoop] = None, **kwargs):
+        """Put batches into the asyncio queue.
+
+        Note:
+            Must be created in the event loop thread if `loop` is not passed. The queue gets copies of batches
+            as `bytes`. Batches which don't fit into a bounded asyncio queue are dropped and counted
+            in `dropped_batches`.
+        """
+
+        loop = loop or asyncio.get_event_loop()
+        sink = None
+
+        def put_nowait(batch: bytes):
+            try:
+                queue.put_nowait(batch)
+            except asyncio.QueueFull:
+                sink.dropped_batches += 1
+
+        # the batch is reused by the sink after the consumer returns
+        sink = cls(lambda batch: loop.call_soon_threadsafe(put_nowait, bytes(batch)), **kwargs)
+        return sink
+
+    @classmethod
+    def to_file(cls, file: Union[str, BinaryIO], **kwargs):
+        """Write batches to the file on the worker thread.
+
+        Note:
+            The file is opened and closed by the sink when the path is passed.
+            Otherwise it's only flushed on stop.
+        """
+
+        if isinstance(file, str):
+            file = open(file, 'wb')
+            on_stop = file.close
+        else:
+            on_stop = file.flush
+
+        return cls(file.write, on_stop=on_stop, **kwargs)
+
+    @property
+    def queued_ms(self) -> float:
+        """Duration of PCM waiting for the consumer in milliseconds."""
+
+        return len(self.__batches) * self.batch_ms
+
+    @property
+    def dropped_ms(self) -> float:
+        """Duration of PCM dropped because the consumer was too slow in milliseconds."""
+
+        return self.dropped_batches * self.batch_ms
+
+    def start(self):
+        self.is_running = True
+        self.__thread.start()
+        return self
+
+    def stop(self, wait=True):
+        """Deliver the rest of PCM and stop the worker thread.
+
+        Note:
+            When called by the consumer, it doesn't wait. The rest is delivered after the consumer returns.
+
+        Args:
+            wait (`bool`, optional): Block until all queued batches are delivered.
+        """
+
+        with self.__condition:
+            if not self.is_running:
+                return
+
+            self.__complete_batch()
+            self.is_running = False
+            self.__condition.notify()
+
+        # the worker can't join itself
+        if wait and current_thread() is not self.__thread:
+            self.__thread.join()
+
+    def write(self, data: Union[bytes, memoryview]):
+        """Append recorded PCM. Called by the native thread."""
+
+        data = memoryview(data).cast('B')
+        with self.__condition:
+            if not self.is_running:
+                return
+
+            while data:
+                length = min(len(data), self.__batch_size - self.__batch_length)
+                self.__batch[self.__batch_length : self.__batch_length + length] = data[:length]
+                self.__batch_length += length
+                data = data[length:]
+
+                if self.__batch_length == self.__batch_size:
+                    self.__complete_batch()
+
+    def __complete_batch(self):
+        if not self.__batch_length:
+            return
+
+        batch = self.__batch
+        if self.__batch_length < self.__batch_size:
+            del batch[self.__batch_length :]
+
+        if len(self.__batches) >= self.__max_batches:
+            self.dropped_batches += 1
+            if self.drop_policy == AudioRecordDropPolicy.DROP_NEWEST:
+                self.__release_batch(batch)
+                batch = None
+            else:
+                self.__release_batch(self.__batches.popleft()[0])
+
+        if batch is not None:
+            self.__batches.append((batch, time.monotonic()))
+            self.__condition.notify()
+
+        self.__batch = self.__free_batches.pop() if self.__free_batches else bytearray(self.__batch_size)
+        self.__batch_length = 0
+
+    def __release_batch(self, batch: bytearray):
+        # the last shorter batch isn't reused
+        if len(batch) == self.__batch_size and len(self.__free_batches) < self.__max_free_batches:
+            self.__free_batches.append(batch)
+
+    def _update(self):
+        while True:
+            with self.__condition:
+                while not self.__batches and self.is_running:
+                    self.__condition.wait()
+                if not self.__batches:
+                    break
+
+                batch, completed_at = self.__batches.popleft()
+
+            self.lag_ms = (time.monotonic() - completed_at) * MILLIS_IN_SEC
+            self.max_lag_ms = max(self.max_lag_ms, self.lag_ms)
+
+            try:
+                self.consumer(batch)
+            except Exception:
+                logger.exception('Audio record consumer raised an exception.')
+            self.delivered_batches += 1
+
+            with self.__condition:
+                self.__release_batch(batch)
+
+        if self.__on_stop:
+            self.__on_stop()
@@ -0,0 +1,88 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+import time
+from threading import Thread
+
+from pytgcalls.utils import AsyncAudioStream
+
+CHUNK_SIZE = 960
+
+
+def play(stream: AsyncAudioStream, played: bytearray):
+    # the same as the native playout thread does
+    buffer = memoryview(bytearray(CHUNK_SIZE))
+    while stream.is_running:
+        length = stream.read_into(buffer)
+        played.extend(buffer[:length])
+        time.sleep(0.001)
+
+
+def run(source):
+    async def main():
+        ended = asyncio.Event()
+
+        stream = AsyncAudioStream(
+            source(),
+            lambda _: ended.set(),
+            sample_rate=48000,
+            channels=1,
+            buffer_low_watermark_ms=10,
+            buffer_high_watermark_ms=30,
+        ).start()
+        played = bytearray()
+        thread = Thread(target=play, args=(stream, played))
+        thread.start()
+        await asyncio.wait_for(ended.wait(), 5)
+        thread.join()
+
+        return stream, played
+
+    return asyncio.run(main())
+
+
+def test_source_waits_for_space_and_is_played_in_order():
+    pieces = [bytes([i]) * (CHUNK_SIZE * 2 + 100) for i in range(1, 20)]
+
+    async def source():
+        for piece in pieces:
+            yield piece
+
+    stream, played = run(source)
+
+    assert stream.error is None
+    assert not stream.is_running
+    expected = b''.join(pieces)
+    assert played[: len(expected)] == expected
+    # the tail shorter than a chunk is padded with silence
+    assert not any(played[len(expected) :])
+    assert stream.buffer.overruns > 0
+
+
+def test_source_exception_is_kept_and_ends_the_stream():
+    async def source():
+        yield bytes([1]) * CHUNK_SIZE * 3
+        raise ValueError('broken source')
+
+    stream, played = run(source)
+
+    assert isinstance(stream.error, ValueError)
+    assert played[: CHUNK_SIZE * 3] == bytes([1]) * CHUNK_SIZE * 3
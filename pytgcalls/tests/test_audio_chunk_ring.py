@@ -0,0 +1,109 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+
+from threading import Thread
+
+from pytgcalls.utils import AudioChunkRing
+
+
+def pcm(length: int, start=0) -> memoryview:
+    return memoryview(bytes((start + i) % 256 for i in range(length)))
+
+
+def test_chunks_are_read_in_order_across_the_wrap():
+    ring = AudioChunkRing(chunk_size=4, chunks_count=3)
+    data = pcm(40)
+
+    read = bytearray()
+    written = 0
+    while len(read) < len(data):
+        written += ring.write_nowait(data[written : written + 6])
+        chunk = ring.read()
+        if chunk is not None:
+            assert len(chunk) == 4
+            read += chunk
+
+    assert read == data
+
+
+def test_write_nowait_fills_only_free_space():
+    ring = AudioChunkRing(chunk_size=4, chunks_count=2)
+
+    assert ring.free_space == 8
+    assert ring.write_nowait(pcm(10)) == 8
+    assert ring.available == 8
+    assert ring.free_space == 0
+    assert ring.write_nowait(pcm(1)) == 0
+
+
+def test_partial_chunk_is_not_read():
+    ring = AudioChunkRing(chunk_size=4, chunks_count=2)
+    ring.write_nowait(pcm(6))
+
+    assert ring.read() == pcm(4)
+    assert ring.read() is None
+    assert ring.available == 2
+
+
+def test_read_into_copies_whole_chunks():
+    ring = AudioChunkRing(chunk_size=4, chunks_count=4)
+    ring.write_nowait(pcm(14))
+
+    buffer = memoryview(bytearray(10))
+    assert ring.read_into(buffer) == 8
+    assert buffer[:8] == pcm(8)
+    assert ring.read_position == 8
+    assert ring.write_position == 14
+
+
+def test_clear_drops_everything():
+    ring = AudioChunkRing(chunk_size=4, chunks_count=2)
+    ring.write_nowait(pcm(8))
+    ring.clear()
+
+    assert ring.available == 0
+    assert ring.read() is None
+    assert ring.write_nowait(pcm(8, 100)) == 8
+    assert ring.read() == pcm(4, 100)
+
+
+def test_blocking_write_waits_for_reader_and_close_releases_it():
+    ring = AudioChunkRing(chunk_size=4, chunks_count=2)
+    results = []
+
+    writer = Thread(target=lambda: results.append(ring.write(pcm(16))))
+    writer.start()
+    read = bytearray()
+    while len(read) < 8:
+        chunk = ring.read()
+        if chunk is not None:
+            read += chunk
+    writer.join(5)
+
+    assert results == [True]
+    assert read == pcm(8)
+
+    ring.write_nowait(pcm(8))
+    writer = Thread(target=lambda: results.append(ring.write(pcm(4))))
+    writer.start()
+    ring.close()
+    writer.join(5)
+
+    assert results == [True, False]
@@ -0,0 +1,148 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+
+import pytest
+
+from pytgcalls.utils import AUDIO_CHUNK_DURATION_MS, AudioJitterBuffer
+
+CHUNK_SIZE = 8
+
+
+def chunks(count: int, value=1) -> memoryview:
+    return memoryview(bytes([value]) * CHUNK_SIZE * count)
+
+
+def create_buffer(low_chunks=3, high_chunks=6) -> AudioJitterBuffer:
+    return AudioJitterBuffer(CHUNK_SIZE, low_chunks * AUDIO_CHUNK_DURATION_MS, high_chunks * AUDIO_CHUNK_DURATION_MS)
+
+
+def test_watermarks_must_be_ordered():
+    with pytest.raises(ValueError):
+        AudioJitterBuffer(CHUNK_SIZE, 100, 50)
+
+
+def test_playback_starts_at_the_low_watermark():
+    buffer = create_buffer()
+
+    buffer.write_nowait(chunks(2))
+    assert buffer.is_buffering
+    assert buffer.read() is None
+    assert buffer.padded_frames == 1
+    assert buffer.underruns == 0
+
+    buffer.write_nowait(chunks(1))
+    assert buffer.read() == chunks(1)
+    assert not buffer.is_buffering
+    assert buffer.depth_ms == 2 * AUDIO_CHUNK_DURATION_MS
+
+
+def test_underrun_is_counted_and_rebuffers():
+    buffer = create_buffer()
+    buffer.write_nowait(chunks(3))
+    for _ in range(3):
+        assert buffer.read() is not None
+
+    assert buffer.read() is None
+    assert buffer.underruns == 1
+    assert buffer.padded_frames == 1
+    assert buffer.is_buffering
+
+    # waits for the low watermark again
+    buffer.write_nowait(chunks(1))
+    assert buffer.read() is None
+    assert buffer.underruns == 1
+    assert buffer.padded_frames == 2
+
+
+def test_high_watermark_limits_writes_and_overruns_are_counted():
+    buffer = create_buffer()
+
+    assert buffer.write_nowait(chunks(10)) == 6 * CHUNK_SIZE
+    assert buffer.overruns == 0
+
+    buffer.close()
+    assert not buffer.write(chunks(1))
+    assert buffer.overruns == 1
+
+
+def test_read_into_pads_underrun_by_chunks():
+    buffer = create_buffer(low_chunks=1)
+    buffer.write_nowait(chunks(2))
+
+    target = memoryview(bytearray(CHUNK_SIZE * 5))
+    assert buffer.read_into(target) == 2 * CHUNK_SIZE
+    assert buffer.underruns == 1
+    assert buffer.padded_frames == 3
+
+
+def test_finish_plays_the_tail_without_watermark_and_drains():
+    buffer = create_buffer()
+    buffer.write_nowait(memoryview(bytes([1]) * (CHUNK_SIZE + 3)))
+    drained = []
+    buffer.finish(lambda: drained.append(True))
+
+    assert buffer.is_finished
+    assert not buffer.is_drained
+    assert buffer.read() == chunks(1)
+    assert not drained
+
+    # the tail is padded with silence up to a whole chunk
+    assert buffer.read() == memoryview(bytes([1]) * 3 + bytes(CHUNK_SIZE - 3))
+    assert buffer.is_drained
+    assert drained == [True]
+
+    # the end of the source isn't an underrun
+    assert buffer.read() is None
+    assert buffer.underruns == 0
+
+
+def test_marks_are_called_when_their_position_is_read():
+    buffer = create_buffer(low_chunks=1)
+    calls = []
+
+    buffer.write_nowait(chunks(2))
+    buffer.mark(lambda: calls.append('first'))
+    buffer.write_nowait(chunks(1))
+    buffer.mark(lambda: calls.append('second'))
+
+    buffer.read()
+    assert calls == []
+    buffer.read()
+    assert calls == ['first']
+    buffer.read()
+    assert calls == ['first', 'second']
+
+
+def test_clear_and_close_drop_marks():
+    buffer = create_buffer(low_chunks=1)
+    calls = []
+
+    buffer.write_nowait(chunks(1))
+    buffer.mark(lambda: calls.append('cleared'))
+    buffer.clear()
+    assert buffer.depth_ms == 0
+    assert buffer.is_buffering
+
+    buffer.write_nowait(chunks(1))
+    buffer.mark(lambda: calls.append('closed'))
+    buffer.close()
+    buffer.read()
+
+    assert calls == []
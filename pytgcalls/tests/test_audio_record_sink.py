@@ -0,0 +1,173 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+import io
+from threading import Event
+
+import pytest
+
+from pytgcalls.utils import AudioRecordDropPolicy, AudioRecordSink
+
+# 1 ms of mono PCM
+MS_SIZE = 96
+
+
+def pcm(ms: int, value: int) -> bytes:
+    return bytes([value]) * MS_SIZE * ms
+
+
+def create_sink(consumer, **kwargs) -> AudioRecordSink:
+    return AudioRecordSink(consumer, sample_rate=48000, channels=1, **kwargs)
+
+
+def test_queue_must_fit_a_batch():
+    with pytest.raises(ValueError):
+        create_sink(print, max_batches=0)
+
+
+def test_pcm_is_delivered_by_batches_and_the_rest_on_stop():
+    batches = []
+    sink = create_sink(lambda batch: batches.append(bytes(batch)), batch_ms=20).start()
+
+    for i in range(5):
+        sink.write(pcm(10, i))
+    sink.stop()
+
+    assert [len(batch) for batch in batches] == [20 * MS_SIZE, 20 * MS_SIZE, 10 * MS_SIZE]
+    assert b''.join(batches) == b''.join(pcm(10, i) for i in range(5))
+    assert sink.delivered_batches == 3
+    assert sink.dropped_batches == 0
+    assert not sink.is_running
+
+
+def test_write_after_stop_is_ignored():
+    batches = []
+    sink = create_sink(batches.append, batch_ms=10).start()
+    sink.stop()
+    sink.write(pcm(10, 1))
+
+    assert batches == []
+
+
+@pytest.mark.parametrize(
+    'drop_policy, expected_values',
+    [(AudioRecordDropPolicy.DROP_OLDEST, [0, 3, 4]), (AudioRecordDropPolicy.DROP_NEWEST, [0, 1, 2])],
+)
+def test_slow_consumer_drops_batches_by_policy(drop_policy, expected_values):
+    is_consuming = Event()
+    is_released = Event()
+    values = []
+
+    def consumer(batch: bytearray):
+        values.append(batch[0])
+        is_consuming.set()
+        is_released.wait(5)
+
+    sink = create_sink(consumer, batch_ms=10, max_batches=2, drop_policy=drop_policy).start()
+    sink.write(pcm(10, 0))
+    assert is_consuming.wait(5)
+
+    # the consumer is busy with the first batch, only 2 of the next ones fit into the queue
+    for value in range(1, 5):
+        sink.write(pcm(10, value))
+    assert sink.dropped_batches == 2
+    assert sink.queued_ms == 20
+    assert sink.dropped_ms == 20
+
+    is_released.set()
+    sink.stop()
+
+    assert values == expected_values
+    assert sink.delivered_batches == 3
+
+
+def test_consumer_exception_doesnt_stop_delivery():
+    batches = []
+
+    def consumer(batch: bytearray):
+        batches.append(bytes(batch))
+        if len(batches) == 1:
+            raise RuntimeError('broken consumer')
+
+    sink = create_sink(consumer, batch_ms=10).start()
+    sink.write(pcm(20, 1))
+    sink.stop()
+
+    assert len(batches) == 2
+    assert sink.delivered_batches == 2
+
+
+def test_to_file_writes_everything_and_flushes():
+    file = io.BytesIO()
+    sink = AudioRecordSink.to_file(file, batch_ms=10, sample_rate=48000, channels=1).start()
+    sink.write(pcm(25, 7))
+    sink.stop()
+
+    assert file.getvalue() == pcm(25, 7)
+
+
+def test_to_asyncio_queue_puts_batches_on_the_loop():
+    async def main():
+        queue = asyncio.Queue()
+        sink = AudioRecordSink.to_asyncio_queue(queue, batch_ms=10, sample_rate=48000, channels=1).start()
+        sink.write(pcm(20, 3))
+        await asyncio.get_event_loop().run_in_executor(None, sink.stop)
+
+        batches = [await asyncio.wait_for(queue.get(), 5) for _ in range(2)]
+        assert b''.join(batches) == pcm(20, 3)
+
+    asyncio.run(main())
+
+
+def test_batches_are_reused():
+    batches = []
+    is_delivered = Event()
+
+    def consumer(batch: bytearray):
+        batches.append(batch)
+        is_delivered.set()
+
+    sink = create_sink(consumer, batch_ms=10, max_batches=2).start()
+    for i in range(10):
+        is_delivered.clear()
+        sink.write(pcm(10, i))
+        assert is_delivered.wait(5)
+    sink.stop()
+
+    assert len(batches) == 10
+    # the consumer keeps references, so new batches would have different ids
+    assert len({id(batch) for batch in batches}) < 10
+
+
+def test_stop_by_consumer_doesnt_wait_for_itself():
+    is_stopped = Event()
+    sink = None
+
+    def consumer(_):
+        sink.stop()
+        is_stopped.set()
+
+    sink = create_sink(consumer, batch_ms=10).start()
+    sink.write(pcm(10, 1))
+
+    assert is_stopped.wait(5)
+    assert not sink.is_running
+    assert sink.delivered_batches <= 1
@@ -0,0 +1,90 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from pytgcalls.utils import AudioStream
+
+TONE_FREQUENCY = 1000
+DURATION_SECONDS = 2
+# allowed deviation of duration and pitch
+TOLERANCE = 0.01
+
+
+def generate_wav(path: str, sample_rate: int, channels: int):
+    t = np.arange(sample_rate * DURATION_SECONDS) / sample_rate
+    # phase shift keeps zero crossings away from sample points
+    samples = (np.sin(2 * np.pi * TONE_FREQUENCY * t + 0.1) * 16000).astype(np.int16)
+
+    with wave.open(path, 'wb') as file:
+        file.setnchannels(channels)
+        file.setsampwidth(2)
+        file.setframerate(sample_rate)
+        file.writeframes(np.repeat(samples, channels).tobytes())
+
+
+def decode(path: str, sample_rate: int, channels: int) -> np.ndarray:
+    ended = False
+
+    def on_end(_):
+        nonlocal ended
+        ended = True
+
+    stream = AudioStream(path, False, on_end, sample_rate=sample_rate, channels=channels)
+
+    # chunks are read the same as by the native playout thread, the end is reported after the last one
+    stream.start()
+    pcm = bytearray()
+    started_at = time.monotonic()
+    while not ended and time.monotonic() - started_at < 30:
+        chunk = stream.read()
+        if chunk is None:
+            time.sleep(0.001)
+            continue
+        pcm += chunk
+    stream.stop()
+    assert ended
+
+    return np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels)
+
+
+def measure_frequency(samples: np.ndarray, sample_rate: int) -> float:
+    crossings = np.count_nonzero(np.diff(np.signbit(samples)))
+    return crossings / 2 / (len(samples) / sample_rate)
+
+
+@pytest.mark.parametrize('output_channels', [1, 2])
+@pytest.mark.parametrize('input_channels', [1, 2])
+@pytest.mark.parametrize('input_sample_rate', [8000, 16000, 22050, 32000, 44100, 48000, 96000])
+def test_resampling_keeps_duration_and_pitch(tmp_path, input_sample_rate, input_channels, output_channels):
+    path = str(tmp_path / 'tone.wav')
+    generate_wav(path, input_sample_rate, input_channels)
+
+    sample_rate = 48000
+    samples = decode(path, sample_rate, output_channels)
+
+    duration = len(samples) / sample_rate
+    assert duration == pytest.approx(DURATION_SECONDS, rel=TOLERANCE)
+    for channel in range(output_channels):
+        assert measure_frequency(samples[:, channel], sample_rate) == pytest.approx(TONE_FREQUENCY, rel=TOLERANCE)
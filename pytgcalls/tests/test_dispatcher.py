@@ -0,0 +1,69 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+from pytgcalls.dispatcher import Dispatcher
+
+
+class Actions:
+    ENDED = 'ENDED'
+
+
+def test_handlers_triggered_by_other_threads_run_on_the_loop():
+    async def main():
+        loop = asyncio.get_running_loop()
+        instance = MagicMock()
+        instance.get_event_loop.return_value = loop
+
+        called = asyncio.Event()
+        threads = []
+
+        async def handler(_, source):
+            assert source == 'source'
+            threads.append(threading.current_thread())
+            called.set()
+
+        dispatcher = Dispatcher(Actions)
+        dispatcher.add_handler(handler, Actions.ENDED)
+
+        thread = threading.Thread(target=dispatcher.trigger_handlers, args=(Actions.ENDED, instance, 'source'))
+        thread.start()
+        thread.join()
+
+        await asyncio.wait_for(called.wait(), 5)
+        assert threads == [threading.main_thread()]
+
+    asyncio.run(main())
+
+
+def test_handlers_are_not_triggered_after_the_loop_is_closed():
+    loop = asyncio.new_event_loop()
+    loop.close()
+    instance = MagicMock()
+    instance.get_event_loop.return_value = loop
+
+    async def handler(_):
+        pass
+
+    dispatcher = Dispatcher(Actions)
+    dispatcher.add_handler(handler, Actions.ENDED)
+    dispatcher.trigger_handlers(Actions.ENDED, instance)
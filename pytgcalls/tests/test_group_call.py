@@ -0,0 +1,88 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import time
+from threading import Thread
+from unittest.mock import MagicMock
+
+import numpy
+
+from pytgcalls.implementation.group_call import GroupCall
+from pytgcalls.utils import AUDIO_CHUNK_DURATION_MS, MILLIS_IN_SEC
+
+
+def play(group_call: GroupCall, chunk_size: int):
+    # the same as the native playout thread does
+    buffer = memoryview(bytearray(chunk_size))
+    while group_call.is_audio_running:
+        group_call._GroupCall__on_audio_played_data(group_call, buffer, chunk_size)
+        time.sleep(0.001)
+
+
+def test_playout_is_paused_after_the_end_of_the_source():
+    async def main():
+        group_call = GroupCall(MagicMock())
+        chunk_size = group_call.audio_sample_rate * AUDIO_CHUNK_DURATION_MS // MILLIS_IN_SEC
+        chunk_size *= group_call.audio_frame_size
+
+        async def source():
+            for _ in range(10):
+                yield bytes(chunk_size)
+
+        ended = asyncio.Event()
+
+        @group_call.on_audio_playout_ended
+        async def on_audio_playout_ended(_, __):
+            ended.set()
+
+        assert group_call.is_playout_paused
+
+        await group_call.start_audio(source())
+        assert not group_call.is_playout_paused
+
+        thread = Thread(target=play, args=(group_call, chunk_size))
+        thread.start()
+        await asyncio.wait_for(ended.wait(), 5)
+        thread.join()
+
+        assert not group_call.is_audio_running
+        assert group_call.is_playout_paused
+
+    asyncio.run(main())
+
+
+def test_start_image_converts_opencv_layouts():
+    async def main():
+        group_call = GroupCall(MagicMock())
+        group_call.set_static_video_frame = MagicMock()
+
+        await group_call.start_image(numpy.full((4, 6), 7, numpy.uint8))
+        frame = group_call.set_static_video_frame.call_args[0][0]
+        assert frame.shape == (4, 6, 3)
+        assert (frame == 7).all()
+
+        bgra = numpy.zeros((4, 6, 4), numpy.uint8)
+        bgra[..., 0] = 255
+        await group_call.start_image(bgra)
+        frame = group_call.set_static_video_frame.call_args[0][0]
+        assert frame.shape == (4, 6, 4)
+        assert list(frame[0, 0]) == [0, 0, 255, 0]
+
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+import tgcalls
+
+from pytgcalls.implementation.group_call_file import GroupCallFile
+
+
+def create_group_call(**kwargs) -> GroupCallFile:
+    async def main():
+        return GroupCallFile(MagicMock(), **kwargs)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('filename', ['rec.raw', 'rec.wav', 'rec.ogg', 'rec.opus', 'rec.oga', 'rec'])
+def test_output_is_raw_by_default_whatever_the_extension_is(filename):
+    group_call = create_group_call(output_filename=filename)
+
+    assert group_call.output_format is None
+    assert group_call._GroupCallFile__get_output_format(filename) == tgcalls.AudioFileFormat.Raw
+
+
+@pytest.mark.parametrize(
+    'filename, expected_format',
+    [
+        ('rec.raw', tgcalls.AudioFileFormat.Raw),
+        ('rec.WAV', tgcalls.AudioFileFormat.Wav),
+        ('rec.ogg', tgcalls.AudioFileFormat.OggOpus),
+        ('rec.opus', tgcalls.AudioFileFormat.OggOpus),
+        ('rec.oga', tgcalls.AudioFileFormat.OggOpus),
+    ],
+)
+def test_output_format_is_detected_by_the_extension_when_enabled(filename, expected_format):
+    group_call = create_group_call(output_filename=filename, detect_output_format=True)
+
+    assert group_call._GroupCallFile__get_output_format(filename) == expected_format
+
+
+def test_explicit_output_format_wins_over_the_extension():
+    group_call = create_group_call(output_format=tgcalls.AudioFileFormat.Wav, detect_output_format=True)
+
+    assert group_call._GroupCallFile__get_output_format('rec.ogg') == tgcalls.AudioFileFormat.Wav
@@ -0,0 +1,85 @@
+#  tgcalls - a Python binding for C++ library by Telegram
+#  pytgcalls - a library connecting the Python binding with MTProto
+#  Copyright (C) 2020-2021 Il`ya (Marshal) <https://github.com/MarshalX>
+#
+#  This file is part of tgcalls and pytgcalls.
+#
+#  tgcalls and pytgcalls is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  tgcalls and pytgcalls is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License v3
+#  along with tgcalls. If not, see <http://www.gnu.org/licenses/>.
+
+
+import av
+import numpy as np
+import pytest
+
+from pytgcalls.utils import AVVideoStream, get_scaled_video_size
+
+FPS = 10
+
+
+def generate_video(path: str, width: int, height: int, frame_count: int = 3):
+    container = av.open(path, 'w')
+    stream = container.add_stream('mpeg4', rate=FPS)
+    stream.width = width
+    stream.height = height
+    stream.pix_fmt = 'yuv420p'
+
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(frame_count):
+        for packet in stream.encode(av.VideoFrame.from_ndarray(image, format='rgb24')):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+
+
+@pytest.mark.parametrize(
+    'source_size, width, height, expected_size',
+    [
+        ((320, 240), None, None, (320, 240)),
+        ((320, 240), 100, None, (100, 74)),
+        ((320, 240), None, 101, (134, 100)),
+        ((256, 144), None, 100, (178, 100)),
+        ((1920, 1080), 640, 640, (640, 640)),
+        ((1080, 1920), 1280, 720, (1280, 720)),
+        ((321, 241), None, None, (320, 240)),
+        ((320, 240), 1, None, (2, 2)),
+    ],
+)
+def test_scaled_video_size(source_size, width, height, expected_size):
+    assert get_scaled_video_size(*source_size, width, height) == expected_size
+
+
+@pytest.mark.parametrize(
+    'source_size, width, height, expected_size',
+    [
+        ((320, 240), 100, None, (100, 74)),
+        ((256, 144), None, 100, (178, 100)),
+        # aspect ratio of the source isn't kept when both dimensions are passed
+        ((320, 240), 160, 90, (160, 90)),
+    ],
+)
+def test_av_video_stream_scales_frames(tmp_path, source_size, width, height, expected_size):
+    path = str(tmp_path / 'video.mp4')
+    generate_video(path, *source_size)
+
+    stream = AVVideoStream(path, False, None, width=width, height=height)
+    video_info = stream.get_video_info()
+    image, _ = stream._decode_next_frame()
+    stream._release()
+
+    expected_width, expected_height = expected_size
+    assert (video_info.width, video_info.height) == expected_size
+    # I420 planes go one after another: full size luma and two quarter size chroma planes
+    assert image.shape == (expected_height * 3 // 2, expected_width)
+    assert image.flags['C_CONTIGUOUS']
@@ -0,0 +1,87 @@
+#include "AudioFileDecoder.h"
+
+#include <algorithm>
+#include <cstring>
+
+#include <rtc_base/logging.h>
+
+#include "OggOpusFileDecoder.h"
+#include "WavFileDecoder.h"
+
+constexpr int AudioFileDecoder::kSampleRate;
+constexpr size_t AudioFileDecoder::kNumChannels;
+
+// 10 ms
+const size_t kRawChunkSamples = AudioFileDecoder::kSampleRate / 100 * AudioFileDecoder::kNumChannels;
+
+std::unique_ptr<AudioFileDecoder> AudioFileDecoder::open(const std::string &filename) {
+  auto file = webrtc::FileWrapper::OpenReadOnly(filename);
+  if (!file.is_open()) {
+    return nullptr;
+  }
+
+  char header[12] = {0};
+  auto headerSize = file.Read(header, sizeof(header));
+  if (!file.Rewind()) {
+    return nullptr;
+  }
+
+  std::unique_ptr<AudioFileDecoder> decoder;
+  if (headerSize >= 4 && memcmp(header, "OggS", 4) == 0) {
+    decoder = std::make_unique<OggOpusFileDecoder>(std::move(file));
+  } else if (headerSize == sizeof(header) && memcmp(header, "RIFF", 4) == 0 && memcmp(header + 8, "WAVE", 4) == 0) {
+    decoder = std::make_unique<WavFileDecoder>(std::move(file));
+  } else {
+    return std::make_unique<RawAudioFileDecoder>(std::move(file));
+  }
+
+  if (!decoder->reset()) {
+    RTC_LOG(LS_ERROR) << "Unsupported audio file: " << filename;
+    return nullptr;
+  }
+
+  return decoder;
+}
+
+AudioFileDecoder::AudioFileDecoder(webrtc::FileWrapper file) : _file(std::move(file)) {}
+
+size_t AudioFileDecoder::read(int8_t *data, size_t size) {
+  size_t length = 0;
+  while (length < size) {
+    auto pcmSize = _pcm.size() * sizeof(int16_t);
+    if (_pcmPosition == pcmSize) {
+      _pcm.clear();
+      _pcmPosition = 0;
+      // decoded part can be empty, for example, when it's skipped at the beginning of Opus stream
+      if (!decode()) {
+        break;
+      }
+      continue;
+    }
+
+    auto count = std::min(size - length, pcmSize - _pcmPosition);
+    memcpy(data + length, reinterpret_cast<const int8_t *>(_pcm.data()) + _pcmPosition, count);
+    _pcmPosition += count;
+    length += count;
+  }
+
+  return length;
+}
+
+bool AudioFileDecoder::rewind() {
+  _pcm.clear();
+  _pcmPosition = 0;
+  return reset();
+}
+
+RawAudioFileDecoder::RawAudioFileDecoder(webrtc::FileWrapper file) : AudioFileDecoder(std::move(file)) {}
+
+bool RawAudioFileDecoder::decode() {
+  _pcm.resize(kRawChunkSamples);
+  _pcm.resize(_file.Read(_pcm.data(), kRawChunkSamples * sizeof(int16_t)) / sizeof(int16_t));
+  return !_pcm.empty();
+}
+
+bool RawAudioFileDecoder::reset() {
+  return _file.Rewind();
+}
@@ -0,0 +1,52 @@
+#pragma once
+
+#include <cstdint>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include <rtc_base/system/file_wrapper.h>
+
+// Decodes an input file of FileAudioDevice to 48k stereo 16 bit PCM
+class AudioFileDecoder {
+public:
+  static constexpr int kSampleRate = 48000;
+  static constexpr size_t kNumChannels = 2;
+
+  // the format is detected by the content: WAV, Ogg/Opus, otherwise raw PCM in the output format.
+  // Returns nullptr when the file can't be opened or isn't supported
+  static std::unique_ptr<AudioFileDecoder> open(const std::string &filename);
+
+  virtual ~AudioFileDecoder() = default;
+
+  // returns count of bytes, it's less than size at the end of the file
+  size_t read(int8_t *data, size_t size);
+
+  bool rewind();
+
+protected:
+  explicit AudioFileDecoder(webrtc::FileWrapper file);
+
+  // appends the next decoded part of the file to _pcm. Returns false at the end of the file
+  virtual bool decode() = 0;
+
+  // decoding starts from the beginning of the file
+  virtual bool reset() = 0;
+
+  webrtc::FileWrapper _file;
+  std::vector<int16_t> _pcm;
+
+private:
+  // in bytes
+  size_t _pcmPosition = 0;
+};
+
+class RawAudioFileDecoder : public AudioFileDecoder {
+public:
+  explicit RawAudioFileDecoder(webrtc::FileWrapper file);
+
+protected:
+  bool decode() override;
+
+  bool reset() override;
+};
@@ -0,0 +1,101 @@
+#include "AudioFileEncoder.h"
+
+#if defined(WEBRTC_WIN)
+#include <io.h>
+#else
+#include <unistd.h>
+#endif
+
+#include <rtc_base/logging.h>
+
+#include "OggOpusFileEncoder.h"
+#include "WavFileEncoder.h"
+
+constexpr int AudioFileEncoder::kSampleRate;
+constexpr size_t AudioFileEncoder::kNumChannels;
+constexpr int AudioFileEncoder::kDefaultBitrateKbit;
+
+std::unique_ptr<AudioFileEncoder> AudioFileEncoder::open(const std::string &filename,
+                                                         AudioFileFormat format,
+                                                         int bitrateKbit) {
+  auto file = webrtc::FileWrapper::OpenWriteOnly(filename);
+  if (!file.is_open()) {
+    return nullptr;
+  }
+
+  std::unique_ptr<AudioFileEncoder> encoder;
+  switch (format) {
+    case AudioFileFormat::Wav:
+      encoder = std::make_unique<WavFileEncoder>(std::move(file));
+      break;
+    case AudioFileFormat::OggOpus:
+      encoder = std::make_unique<OggOpusFileEncoder>(std::move(file), bitrateKbit);
+      break;
+    default:
+      return std::make_unique<RawAudioFileEncoder>(std::move(file));
+  }
+
+  if (!encoder->start()) {
+    RTC_LOG(LS_ERROR) << "Failed to start encoding of audio file: " << filename;
+    return nullptr;
+  }
+
+  return encoder;
+}
+
+AudioFileEncoder::AudioFileEncoder(webrtc::FileWrapper file) : _file(std::move(file)) {}
+
+bool AudioFileEncoder::close(bool isSynced) {
+  auto isCompleted = finish();
+  if (isSynced) {
+    isCompleted = sync() && isCompleted;
+  }
+  return _file.Close() && isCompleted;
+}
+
+bool AudioFileEncoder::sync() {
+  if (!updateHeaders() || !_file.Flush()) {
+    return false;
+  }
+
+  // FileWrapper doesn't give access to the descriptor
+  auto file = _file.Release();
+#if defined(WEBRTC_WIN)
+  auto isSynced = _commit(_fileno(file)) == 0;
+#else
+  auto isSynced = fsync(fileno(file)) == 0;
+#endif
+  _file = webrtc::FileWrapper(file);
+
+  return isSynced;
+}
+
+uint64_t AudioFileEncoder::fileSize() const {
+  return _fileSize;
+}
+
+bool AudioFileEncoder::append(const void *data, size_t size) {
+  if (!_file.Write(data, size)) {
+    return false;
+  }
+  _fileSize += size;
+  return true;
+}
+
+bool AudioFileEncoder::start() {
+  return true;
+}
+
+bool AudioFileEncoder::finish() {
+  return true;
+}
+
+bool AudioFileEncoder::updateHeaders() {
+  return true;
+}
+
+RawAudioFileEncoder::RawAudioFileEncoder(webrtc::FileWrapper file) : AudioFileEncoder(std::move(file)) {}
+
+bool RawAudioFileEncoder::write(const int8_t *data, size_t size) {
+  return append(data, size);
+}
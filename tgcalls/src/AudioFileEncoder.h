@@ -0,0 +1,68 @@
+#pragma once
+
+#include <cstdint>
+#include <memory>
+#include <string>
+
+#include <rtc_base/system/file_wrapper.h>
+
+enum class AudioFileFormat {
+  // 48k stereo 16 bit PCM without header
+  Raw,
+  Wav,
+  OggOpus,
+};
+
+// Encodes 48k stereo 16 bit PCM recorded by FileAudioDevice to an output file
+class AudioFileEncoder {
+public:
+  static constexpr int kSampleRate = 48000;
+  static constexpr size_t kNumChannels = 2;
+  static constexpr int kDefaultBitrateKbit = 64;
+
+  // returns nullptr when the file can't be opened. Bitrate is used by encoded formats only
+  static std::unique_ptr<AudioFileEncoder> open(const std::string &filename,
+                                                AudioFileFormat format,
+                                                int bitrateKbit = kDefaultBitrateKbit);
+
+  virtual ~AudioFileEncoder() = default;
+
+  // size is a multiple of the frame size (4 bytes)
+  virtual bool write(const int8_t *data, size_t size) = 0;
+
+  // completes headers and closes the file. With isSynced the file is flushed to the disk before closing
+  bool close(bool isSynced);
+
+  // written data is flushed to the disk (fsync)
+  bool sync();
+
+  // bytes appended to the file, including headers
+  uint64_t fileSize() const;
+
+protected:
+  explicit AudioFileEncoder(webrtc::FileWrapper file);
+
+  // writes headers
+  virtual bool start();
+
+  // writes buffered data and completes headers
+  virtual bool finish();
+
+  // headers are updated before sync, so the file is readable after a crash
+  virtual bool updateHeaders();
+
+  // writes to the end of the file and counts its size
+  bool append(const void *data, size_t size);
+
+  webrtc::FileWrapper _file;
+
+private:
+  uint64_t _fileSize = 0;
+};
+
+class RawAudioFileEncoder : public AudioFileEncoder {
+public:
+  explicit RawAudioFileEncoder(webrtc::FileWrapper file);
+
+  bool write(const int8_t *data, size_t size) override;
+};
@@ -0,0 +1,61 @@
+#include "AudioInputFile.h"
+
+#include <algorithm>
+#include <cstring>
+
+bool AudioInputFile::open(const std::string &filename, size_t readAheadSize) {
+  close();
+
+  _decoder = AudioFileDecoder::open(filename);
+  if (!_decoder) {
+    return false;
+  }
+
+  _filename = filename;
+  _readAhead.resize(readAheadSize);
+  _readAhead.resize(_decoder->read(_readAhead.data(), readAheadSize));
+  _readAheadPosition = 0;
+
+  return true;
+}
+
+size_t AudioInputFile::read(int8_t *data, size_t size) {
+  if (!_decoder) {
+    return 0;
+  }
+
+  auto fromReadAhead = std::min(size, _readAhead.size() - _readAheadPosition);
+  memcpy(data, _readAhead.data() + _readAheadPosition, fromReadAhead);
+  _readAheadPosition += fromReadAhead;
+
+  if (fromReadAhead == size) {
+    return size;
+  }
+
+  return fromReadAhead + _decoder->read(data + fromReadAhead, size - fromReadAhead);
+}
+
+bool AudioInputFile::rewind() {
+  if (!_decoder) {
+    return false;
+  }
+
+  // read ahead part is dropped, it would be decoded again
+  _readAheadPosition = _readAhead.size();
+  return _decoder->rewind();
+}
+
+void AudioInputFile::close() {
+  _decoder.reset();
+  _filename.clear();
+  _readAhead.clear();
+  _readAheadPosition = 0;
+}
+
+bool AudioInputFile::isOpen() const {
+  return _decoder != nullptr;
+}
+
+const std::string &AudioInputFile::filename() const {
+  return _filename;
+}
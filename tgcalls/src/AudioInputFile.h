@@ -0,0 +1,33 @@
+#pragma once
+
+#include <cstdint>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "AudioFileDecoder.h"
+
+// Input file of FileAudioDevice. The beginning of the file is decoded on open,
+// so the file can be opened ahead and the switch to it doesn't wait for the disk.
+class AudioInputFile {
+public:
+  // readAheadSize bytes are read immediately
+  bool open(const std::string &filename, size_t readAheadSize);
+
+  // returns count of read bytes, it's less than size at the end of the file
+  size_t read(int8_t *data, size_t size);
+
+  bool rewind();
+
+  void close();
+
+  bool isOpen() const;
+
+  const std::string &filename() const;
+
+private:
+  std::string _filename;
+  std::unique_ptr<AudioFileDecoder> _decoder;
+  std::vector<int8_t> _readAhead;
+  size_t _readAheadPosition = 0;
+};
@@ -0,0 +1,134 @@
+#include "AudioInputPrefetcher.h"
+
+#include <chrono>
+
+#include <rtc_base/logging.h>
+
+// a file queued right before the end of the current one can be picked up with this delay
+const auto kPrefetchPeriod = std::chrono::milliseconds(10);
+
+AudioInputPrefetcher::AudioInputPrefetcher(std::shared_ptr<FileAudioDeviceDescriptor> descriptor,
+                                           size_t readAheadSize)
+    : _descriptor(std::move(descriptor)), _readAheadSize(readAheadSize) {}
+
+AudioInputPrefetcher::~AudioInputPrefetcher() {
+  stop();
+}
+
+void AudioInputPrefetcher::start() {
+  if (_thread.joinable()) {
+    return;
+  }
+
+  _isStopping = false;
+  _thread = std::thread(&AudioInputPrefetcher::run, this);
+}
+
+void AudioInputPrefetcher::stop() {
+  if (!_thread.joinable()) {
+    return;
+  }
+
+  {
+    std::lock_guard<std::mutex> lock(_mutex);
+    _isStopping = true;
+  }
+  _condition.notify_one();
+  _thread.join();
+
+  _retiredInputs.clear();
+}
+
+bool AudioInputPrefetcher::take(AudioInputFile &input) {
+  int state = Ready;
+  if (!_state.compare_exchange_strong(state, Taken, std::memory_order_acquire)) {
+    return false;
+  }
+
+  // the playlist was cleared after the file was opened, it's replaced by the prefetch thread
+  if (_inputPlaylistVersion != _descriptor->_getPlaylistVersion()) {
+    _state.store(Ready, std::memory_order_release);
+    return false;
+  }
+
+  input = std::move(_input);
+  _state.store(Empty, std::memory_order_release);
+  return true;
+}
+
+void AudioInputPrefetcher::takeSkippedFilenames(std::vector<std::string> &filenames) {
+  std::unique_lock<std::mutex> lock(_filesMutex, std::try_to_lock);
+  if (!lock.owns_lock() || _skippedFilenames.empty()) {
+    return;
+  }
+
+  filenames.insert(filenames.end(), _skippedFilenames.begin(), _skippedFilenames.end());
+  _skippedFilenames.clear();
+}
+
+void AudioInputPrefetcher::retire(AudioInputFile input) {
+  if (!input.isOpen()) {
+    return;
+  }
+
+  std::unique_lock<std::mutex> lock(_filesMutex, std::try_to_lock);
+  if (lock.owns_lock()) {
+    _retiredInputs.push_back(std::move(input));
+  }
+  // otherwise it's closed right here
+}
+
+void AudioInputPrefetcher::run() {
+  while (true) {
+    {
+      std::unique_lock<std::mutex> lock(_mutex);
+      _condition.wait_for(lock, kPrefetchPeriod, [this] { return _isStopping; });
+      if (_isStopping) {
+        return;
+      }
+    }
+
+    {
+      std::lock_guard<std::mutex> lock(_filesMutex);
+      _retiredInputs.clear();
+    }
+
+    prepare();
+  }
+}
+
+void AudioInputPrefetcher::prepare() {
+  auto version = _descriptor->_getPlaylistVersion();
+  int state = Ready;
+  if (_inputPlaylistVersion != version) {
+    // the playlist was cleared, the prepared file is outdated
+    _state.compare_exchange_strong(state, Empty, std::memory_order_acquire);
+  }
+  if (_state.load(std::memory_order_acquire) != Empty) {
+    return;
+  }
+
+  _input.close();
+
+  std::string filename;
+  while (_descriptor->_peekPlaylistItem(filename, version)) {
+    auto isOpen = _input.open(filename, _readAheadSize);
+    // the item is removed here, so the audio thread doesn't lock the playlist. Fails when it was cleared
+    if (!_descriptor->_popPlaylistItem(version)) {
+      _input.close();
+      continue;
+    }
+
+    if (isOpen) {
+      _inputPlaylistVersion = version;
+      _state.store(Ready, std::memory_order_release);
+      return;
+    }
+
+    // skipped file is reported as ended, so the queue on Python side keeps going
+    RTC_LOG(LS_ERROR) << "Failed to open queued audio input file: " << filename;
+
+    std::lock_guard<std::mutex> lock(_filesMutex);
+    _skippedFilenames.push_back(filename);
+  }
+}
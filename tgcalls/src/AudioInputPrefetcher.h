@@ -0,0 +1,68 @@
+#pragma once
+
+#include <atomic>
+#include <condition_variable>
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "AudioInputFile.h"
+#include "FileAudioDeviceDescriptor.h"
+
+// Opens and reads ahead the next queued input file of FileAudioDevice on its own thread.
+// The prepared file is handed off to the audio thread through a single-slot lock-free state switch,
+// so slow opening and decoding of the beginning of the file don't delay its ticks.
+class AudioInputPrefetcher {
+public:
+  AudioInputPrefetcher(std::shared_ptr<FileAudioDeviceDescriptor> descriptor, size_t readAheadSize);
+
+  ~AudioInputPrefetcher();
+
+  void start();
+
+  // the prepared file is kept for the next start
+  void stop();
+
+  // audio thread, lock-free. Takes the prepared first file of the playlist, which is already removed
+  // from the playlist. Returns false when it isn't prepared yet or the playlist was cleared after that
+  bool take(AudioInputFile &input);
+
+  // audio thread. Files which can't be opened are removed from the playlist and reported here
+  void takeSkippedFilenames(std::vector<std::string> &filenames);
+
+  // audio thread. The file is closed on the prefetch thread
+  void retire(AudioInputFile input);
+
+private:
+  enum State {
+    Empty,
+    Ready,
+    // owned by the audio thread
+    Taken,
+  };
+
+  void run();
+
+  void prepare();
+
+  std::shared_ptr<FileAudioDeviceDescriptor> _descriptor;
+  size_t _readAheadSize;
+
+  std::atomic<int> _state{Empty};
+  // accessed by the prefetch thread when the state is Empty and by the audio thread when it's Taken
+  AudioInputFile _input;
+  uint64_t _inputPlaylistVersion = 0;
+
+  // the audio thread only tries to lock it
+  std::mutex _filesMutex;
+  std::vector<std::string> _skippedFilenames;
+  std::vector<AudioInputFile> _retiredInputs;
+
+  std::thread _thread;
+  std::mutex _mutex;
+  std::condition_variable _condition;
+  bool _isStopping = false;
+};
@@ -0,0 +1,215 @@
+#include "AudioOutputFile.h"
+
+#include <algorithm>
+#include <chrono>
+#include <cstdio>
+
+#include <rtc_base/logging.h>
+
+const size_t kFrameSize = AudioFileEncoder::kNumChannels * sizeof(int16_t);
+const size_t kBytesPerMs = AudioFileEncoder::kSampleRate / 1000 * kFrameSize;
+// 10 ms written by the audio thread at once. Segments are switched between such chunks
+const size_t kChunkSize = kBytesPerMs * 10;
+// the writer wakes up by itself, the audio thread doesn't notify it
+const auto kWriterPeriod = std::chrono::milliseconds(20);
+const size_t kMaxWriteSize = kChunkSize * 32;
+
+AudioOutputFile::~AudioOutputFile() {
+  close();
+}
+
+bool AudioOutputFile::open(const std::string &filename,
+                           AudioFileFormat format,
+                           const AudioOutputConfig &config,
+                           std::shared_ptr<AudioOutputStats> stats,
+                           SegmentCompletedCallback segmentCompletedCallback) {
+  close();
+
+  _filename = filename;
+  _format = format;
+  _config = config;
+  _segmentIndex = 1;
+  _segmentBytes = 0;
+  _isSegmentCompleted = false;
+  _segmentFilename = isSegmented() ? segmentFilename(_segmentIndex) : filename;
+
+  _encoder = AudioFileEncoder::open(_segmentFilename, format, config.bitrateKbit);
+  if (!_encoder) {
+    return false;
+  }
+
+  _stats = stats ? std::move(stats) : std::make_shared<AudioOutputStats>();
+  _segmentCompletedCallback = std::move(segmentCompletedCallback);
+  // at least 10 ms written by the audio thread at once
+  _buffer = std::make_unique<AudioRingBuffer>(std::max(config.bufferMs, 10) * kBytesPerMs);
+  _isClosing = false;
+  _hasWriteError = false;
+  _thread = std::thread(&AudioOutputFile::run, this);
+  _isOpen = true;
+  return true;
+}
+
+void AudioOutputFile::write(const int8_t *data, size_t size) {
+  // whole chunk or nothing, a partial write would break alignment of frames
+  if (_buffer->freeSpace() < size) {
+    _stats->droppedBytes += size;
+    return;
+  }
+
+  _buffer->write(data, size);
+}
+
+void AudioOutputFile::close() {
+  if (!_thread.joinable()) {
+    return;
+  }
+
+  _isOpen = false;
+  {
+    std::lock_guard<std::mutex> lock(_mutex);
+    _isClosing = true;
+  }
+  _condition.notify_one();
+  _thread.join();
+
+  completeSegment();
+  _buffer.reset();
+  _segmentCompletedCallback = nullptr;
+}
+
+bool AudioOutputFile::isOpen() const {
+  return _isOpen;
+}
+
+void AudioOutputFile::run() {
+  auto syncInterval = std::chrono::milliseconds(std::max(_config.syncIntervalMs, 0));
+  auto syncedAt = std::chrono::steady_clock::now();
+
+  while (true) {
+    bool isClosing;
+    {
+      std::unique_lock<std::mutex> lock(_mutex);
+      _condition.wait_for(lock, kWriterPeriod, [this] { return _isClosing; });
+      isClosing = _isClosing;
+    }
+
+    // the audio thread is stopped before closing, so the buffer is drained completely
+    drain();
+    if (isClosing) {
+      return;
+    }
+
+    auto now = std::chrono::steady_clock::now();
+    if (_config.syncPolicy == AudioOutputSyncPolicy::Periodic && now - syncedAt >= syncInterval) {
+      syncedAt = now;
+      if (_encoder && _encoder->sync()) {
+        _stats->syncs++;
+      }
+    }
+  }
+}
+
+void AudioOutputFile::drain() {
+  auto available = _buffer->available() / kFrameSize * kFrameSize;
+
+  uint64_t lagMs = available / kBytesPerMs;
+  _stats->lagMs = lagMs;
+  if (lagMs > _stats->maxLagMs) {
+    _stats->maxLagMs = lagMs;
+  }
+
+  // duration of a segment is rounded to 10 ms
+  uint64_t segmentDurationBytes = 0;
+  if (_config.segmentDurationMs > 0) {
+    segmentDurationBytes = std::max<uint64_t>(_config.segmentDurationMs / 10, 1) * kChunkSize;
+  }
+
+  _chunk.resize(std::min(available, kMaxWriteSize));
+  while (available > 0) {
+    // the next file is opened when there is audio for it, so no empty file is left on close
+    if (_isSegmentCompleted) {
+      rotate();
+    }
+
+    auto size = std::min(available, kMaxWriteSize);
+    if (segmentDurationBytes) {
+      size = std::min<uint64_t>(size, segmentDurationBytes - _segmentBytes);
+    }
+    // size limit is checked after every 10 ms
+    if (_config.segmentMaxBytes) {
+      size = std::min(size, kChunkSize);
+    }
+
+    _buffer->read(_chunk.data(), size);
+    available -= size;
+    _segmentBytes += size;
+
+    if (!_encoder) {
+      _stats->droppedBytes += size;
+    } else if (_encoder->write(_chunk.data(), size)) {
+      _stats->writtenBytes += size;
+    } else if (!_hasWriteError) {
+      _hasWriteError = true;
+      RTC_LOG(LS_ERROR) << "Failed to write audio output file: " << _segmentFilename;
+    }
+
+    auto isDurationReached = segmentDurationBytes && _segmentBytes >= segmentDurationBytes;
+    // without the file the dropped PCM is counted, so the open is retried with the next segment
+    auto segmentSize = _encoder ? _encoder->fileSize() : _segmentBytes;
+    auto isSizeReached = _config.segmentMaxBytes && segmentSize >= _config.segmentMaxBytes;
+    if (isDurationReached || isSizeReached) {
+      completeSegment();
+      _isSegmentCompleted = true;
+    }
+  }
+}
+
+bool AudioOutputFile::isSegmented() const {
+  return _config.segmentDurationMs > 0 || _config.segmentMaxBytes > 0;
+}
+
+std::string AudioOutputFile::segmentFilename(int index) const {
+  auto extensionPosition = _filename.find_last_of('.');
+  auto directoryPosition = _filename.find_last_of("/\\");
+  if (extensionPosition == std::string::npos
+      || (directoryPosition != std::string::npos && extensionPosition < directoryPosition)) {
+    extensionPosition = _filename.size();
+  }
+
+  char number[16];
+  snprintf(number, sizeof(number), "_%05d", index);
+  return _filename.substr(0, extensionPosition) + number + _filename.substr(extensionPosition);
+}
+
+void AudioOutputFile::rotate() {
+  _isSegmentCompleted = false;
+  _segmentIndex++;
+  _segmentBytes = 0;
+  _segmentFilename = segmentFilename(_segmentIndex);
+  _hasWriteError = false;
+
+  _encoder = AudioFileEncoder::open(_segmentFilename, _format, _config.bitrateKbit);
+  if (!_encoder) {
+    // audio is dropped until the next segment
+    RTC_LOG(LS_ERROR) << "Failed to open audio output segment: " << _segmentFilename;
+  }
+}
+
+void AudioOutputFile::completeSegment() {
+  if (!_encoder) {
+    return;
+  }
+
+  auto isSynced = _config.syncPolicy != AudioOutputSyncPolicy::Never;
+  if (!_encoder->close(isSynced)) {
+    RTC_LOG(LS_ERROR) << "Failed to complete audio output file: " << _segmentFilename;
+  } else if (isSynced) {
+    _stats->syncs++;
+  }
+  _encoder.reset();
+
+  _stats->completedSegments++;
+  if (_segmentCompletedCallback) {
+    _segmentCompletedCallback(_segmentFilename);
+  }
+}
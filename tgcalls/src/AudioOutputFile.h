@@ -0,0 +1,112 @@
+#pragma once
+
+#include <atomic>
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "AudioFileEncoder.h"
+#include "AudioRingBuffer.h"
+
+enum class AudioOutputSyncPolicy {
+  // flushing to the disk is left to the OS
+  Never,
+  OnClose,
+  // every sync interval and on close
+  Periodic,
+};
+
+struct AudioOutputConfig {
+  // size of the ring buffer between the audio thread and the writer
+  int bufferMs = 2000;
+  AudioOutputSyncPolicy syncPolicy = AudioOutputSyncPolicy::Never;
+  int syncIntervalMs = 1000;
+  // the recording is split into files by duration and/or size, 0 disables the limit
+  int segmentDurationMs = 0;
+  uint64_t segmentMaxBytes = 0;
+  // of encoded formats, Ogg/Opus
+  int bitrateKbit = AudioFileEncoder::kDefaultBitrateKbit;
+};
+
+// counters shared with Python. Written by the audio and the writer threads, read by any
+struct AudioOutputStats {
+  std::atomic<uint64_t> writtenBytes{0};
+  // the ring buffer was full, the writer doesn't keep up with the disk
+  std::atomic<uint64_t> droppedBytes{0};
+  std::atomic<uint64_t> syncs{0};
+  std::atomic<uint64_t> completedSegments{0};
+  // audio waiting for the writer when it woke up last time, and the maximum
+  std::atomic<uint64_t> lagMs{0};
+  std::atomic<uint64_t> maxLagMs{0};
+};
+
+// Output file of FileAudioDevice. The audio thread only copies data to a lock-free ring buffer,
+// encoding, writing and syncing happen on the writer thread, so a slow disk doesn't stall audio.
+// With segment limits the writer switches to the next file between two 10 ms buffers, without a gap.
+// Segments are named by the filename with a number before the extension: rec.ogg -> rec_00001.ogg
+class AudioOutputFile {
+public:
+  // called with the path of every completed file, from the writer thread or the closing one
+  using SegmentCompletedCallback = std::function<void(const std::string &)>;
+
+  ~AudioOutputFile();
+
+  bool open(const std::string &filename,
+            AudioFileFormat format,
+            const AudioOutputConfig &config,
+            std::shared_ptr<AudioOutputStats> stats,
+            SegmentCompletedCallback segmentCompletedCallback = nullptr);
+
+  // never blocks. Data which doesn't fit into the buffer is dropped
+  void write(const int8_t *data, size_t size);
+
+  // waits until everything written before is encoded
+  void close();
+
+  bool isOpen() const;
+
+private:
+  void run();
+
+  // writes everything available in the buffer
+  void drain();
+
+  bool isSegmented() const;
+
+  std::string segmentFilename(int index) const;
+
+  // the next file is opened
+  void rotate();
+
+  void completeSegment();
+
+  std::string _filename;
+  AudioFileFormat _format = AudioFileFormat::Raw;
+  SegmentCompletedCallback _segmentCompletedCallback;
+  // the current file
+  std::string _segmentFilename;
+  int _segmentIndex = 0;
+  uint64_t _segmentBytes = 0;
+  bool _isSegmentCompleted = false;
+
+  // is null between segments and when the next segment can't be opened
+  std::unique_ptr<AudioFileEncoder> _encoder;
+  // read by the audio thread, the encoder is replaced by the writer
+  std::atomic<bool> _isOpen{false};
+  std::unique_ptr<AudioRingBuffer> _buffer;
+  AudioOutputConfig _config;
+  std::shared_ptr<AudioOutputStats> _stats;
+  std::vector<int8_t> _chunk;
+  std::thread _thread;
+
+  std::mutex _mutex;
+  std::condition_variable _condition;
+  bool _isClosing = false;
+  // logged once
+  bool _hasWriteError = false;
+};
@@ -0,0 +1,110 @@
+#include "AudioRingBuffer.h"
+
+#include <algorithm>
+#include <cstring>
+
+AudioRingBuffer::AudioRingBuffer(size_t capacity) : _buffer(std::max<size_t>(capacity, 1)) {}
+
+size_t AudioRingBuffer::write(const int8_t *data, size_t length) {
+  auto writePosition = _writePosition.load(std::memory_order_relaxed);
+  // skipped data may be still read right now, its space is free only after the consumer has applied the clear
+  auto readPosition = _readPosition.load(std::memory_order_acquire);
+
+  auto count = std::min(length, _buffer.size() - (writePosition - readPosition));
+  if (count == 0) {
+    return 0;
+  }
+
+  auto offset = writePosition % _buffer.size();
+  auto firstPart = std::min(count, _buffer.size() - offset);
+  memcpy(_buffer.data() + offset, data, firstPart);
+  memcpy(_buffer.data(), data + firstPart, count - firstPart);
+
+  _writePosition.store(writePosition + count, std::memory_order_release);
+  return count;
+}
+
+size_t AudioRingBuffer::read(int8_t *data, size_t length) {
+  auto readPosition = _readPosition.load(std::memory_order_relaxed);
+
+  auto clearGeneration = _clearGeneration.load(std::memory_order_acquire);
+  if (clearGeneration != _appliedClearGeneration) {
+    _appliedClearGeneration = clearGeneration;
+    readPosition = std::max(readPosition, _clearPosition.load(std::memory_order_acquire));
+    _isStreamStarted = false;
+    _gapBytes = 0;
+  }
+
+  // write position is loaded after the clear one, so it's never behind it
+  auto writePosition = _writePosition.load(std::memory_order_acquire);
+
+  auto count = std::min(length, writePosition - readPosition);
+  if (count) {
+    auto offset = readPosition % _buffer.size();
+    auto firstPart = std::min(count, _buffer.size() - offset);
+    memcpy(data, _buffer.data() + offset, firstPart);
+    memcpy(data + firstPart, _buffer.data(), count - firstPart);
+
+    // the stream continues after the gap
+    if (_gapBytes) {
+      _underruns.fetch_add(1, std::memory_order_relaxed);
+      _underrunBytes.fetch_add(_gapBytes, std::memory_order_relaxed);
+      _gapBytes = 0;
+    }
+    _isStreamStarted = true;
+  }
+  _readPosition.store(readPosition + count, std::memory_order_release);
+
+  if (count < length) {
+    memset(data + count, 0, length - count);
+    if (_isStreamStarted) {
+      _gapBytes += length - count;
+    }
+  }
+
+  return count;
+}
+
+void AudioRingBuffer::clear() {
+  _clearPosition.store(_writePosition.load(std::memory_order_relaxed), std::memory_order_release);
+  _clearGeneration.fetch_add(1, std::memory_order_release);
+}
+
+void AudioRingBuffer::requestSpaceNotification() {
+  _isSpaceNotificationRequested.store(true, std::memory_order_release);
+}
+
+bool AudioRingBuffer::takeSpaceNotificationRequest() {
+  if (!_isSpaceNotificationRequested.load(std::memory_order_relaxed)) {
+    return false;
+  }
+  return _isSpaceNotificationRequested.exchange(false, std::memory_order_acq_rel);
+}
+
+size_t AudioRingBuffer::capacity() const {
+  return _buffer.size();
+}
+
+size_t AudioRingBuffer::available() const {
+  auto readPosition = this->readPosition();
+  return _writePosition.load(std::memory_order_acquire) - readPosition;
+}
+
+size_t AudioRingBuffer::freeSpace() const {
+  // the same as write sees it
+  auto readPosition = _readPosition.load(std::memory_order_acquire);
+  return capacity() - (_writePosition.load(std::memory_order_acquire) - readPosition);
+}
+
+uint64_t AudioRingBuffer::underruns() const {
+  return _underruns.load(std::memory_order_relaxed);
+}
+
+uint64_t AudioRingBuffer::underrunBytes() const {
+  return _underrunBytes.load(std::memory_order_relaxed);
+}
+
+size_t AudioRingBuffer::readPosition() const {
+  // positions only grow, a clear before the last read is already passed
+  return std::max(_readPosition.load(std::memory_order_acquire), _clearPosition.load(std::memory_order_acquire));
+}
@@ -0,0 +1,62 @@
+#pragma once
+
+#include <atomic>
+#include <cstdint>
+#include <vector>
+
+// Lock-free single-producer single-consumer ring buffer of PCM bytes.
+// Python writes into it in bulk, the native recording thread drains it without GIL.
+class AudioRingBuffer {
+public:
+  explicit AudioRingBuffer(size_t capacity);
+
+  // producer side. Returns count of written bytes, it's less than length when buffer is full
+  size_t write(const int8_t *data, size_t length);
+
+  // consumer side. Always fills length bytes, missing tail is padded with silence.
+  // The silence is counted as underrun only when PCM is written again, so the end of a stream and idle ticks
+  // aren't underruns
+  size_t read(int8_t *data, size_t length);
+
+  // producer side. Everything written before is skipped, data written after clear is kept.
+  // It's applied by the consumer on its next read, so space of skipped data is freed then
+  void clear();
+
+  // producer side. The next read tells the consumer to notify the producer about free space
+  void requestSpaceNotification();
+
+  // consumer side. True once after the request
+  bool takeSpaceNotificationRequest();
+
+  size_t capacity() const;
+  size_t available() const;
+  size_t freeSpace() const;
+
+  uint64_t underruns() const;
+  uint64_t underrunBytes() const;
+
+private:
+  // read position with the last clear applied, even if the consumer hasn't applied it yet
+  size_t readPosition() const;
+
+  std::vector<int8_t> _buffer;
+
+  std::atomic<size_t> _readPosition{0};
+  std::atomic<size_t> _writePosition{0};
+  // write position at the last clear, the consumer skips data up to it
+  std::atomic<size_t> _clearPosition{0};
+  // incremented by every clear after its position is stored
+  std::atomic<uint64_t> _clearGeneration{0};
+
+  std::atomic<bool> _isSpaceNotificationRequested{false};
+
+  std::atomic<uint64_t> _underruns{0};
+  std::atomic<uint64_t> _underrunBytes{0};
+
+  // consumer side
+  uint64_t _appliedClearGeneration = 0;
+  // PCM was read after the last clear, so missing PCM is a gap in the stream
+  bool _isStreamStarted = false;
+  // silence of the current gap, it's counted when the gap ends
+  uint64_t _gapBytes = 0;
+};
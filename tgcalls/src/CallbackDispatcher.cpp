@@ -0,0 +1,56 @@
+#include "CallbackDispatcher.h"
+
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+CallbackDispatcher::CallbackDispatcher() : _thread(&CallbackDispatcher::run, this) {}
+
+CallbackDispatcher::~CallbackDispatcher() {
+  stop();
+
+  if (PyGILState_Check()) {
+    // pending callbacks wait for the GIL held by this thread
+    py::gil_scoped_release release;
+    _thread.join();
+  } else {
+    _thread.join();
+  }
+}
+
+void CallbackDispatcher::post(std::function<void()> callback) {
+  {
+    std::lock_guard<std::mutex> lock(_mutex);
+    if (_isStopping) {
+      return;
+    }
+    _callbacks.push_back(std::move(callback));
+  }
+  _condition.notify_one();
+}
+
+void CallbackDispatcher::stop() {
+  {
+    std::lock_guard<std::mutex> lock(_mutex);
+    _isStopping = true;
+  }
+  _condition.notify_one();
+}
+
+void CallbackDispatcher::run() {
+  while (true) {
+    std::function<void()> callback;
+    {
+      std::unique_lock<std::mutex> lock(_mutex);
+      _condition.wait(lock, [this] { return _isStopping || !_callbacks.empty(); });
+      if (_callbacks.empty()) {
+        return;
+      }
+
+      callback = std::move(_callbacks.front());
+      _callbacks.pop_front();
+    }
+
+    callback();
+  }
+}
@@ -0,0 +1,33 @@
+#pragma once
+
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <mutex>
+#include <thread>
+
+// Calls Python callbacks of a native device one by one in the order of posting on its own thread.
+// Native threads don't wait for the GIL, and threads joined by a caller holding the GIL never take it.
+class CallbackDispatcher {
+public:
+  CallbackDispatcher();
+
+  // callbacks posted before are still called, then the thread is joined
+  ~CallbackDispatcher();
+
+  // never blocks. Ignored after stop
+  void post(std::function<void()> callback);
+
+  void stop();
+
+private:
+  void run();
+
+  std::mutex _mutex;
+  std::condition_variable _condition;
+  std::deque<std::function<void()>> _callbacks;
+  bool _isStopping = false;
+
+  // the last one, it's started when the rest is initialized
+  std::thread _thread;
+};
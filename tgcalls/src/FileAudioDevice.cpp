@@ -18,6 +18,11 @@ const size_t kPlayoutBufferSize =
     kPlayoutFixedSampleRate / 100 * kPlayoutNumChannels * 2;
 const size_t kRecordingBufferSize =
     kRecordingFixedSampleRate / 100 * kRecordingNumChannels * 2;
+// native threads work by 10 ms. Up to 10 missed ticks are caught up, older ones are skipped
+const auto kTickPeriod = std::chrono::milliseconds(10);
+const auto kMaxTickLag = std::chrono::milliseconds(100);
+// beginning of the next queued file read in advance, 500 ms
+const size_t kInputReadAheadSize = kRecordingBufferSize * 50;
 
 FileAudioDevice::FileAudioDevice(std::shared_ptr<FileAudioDeviceDescriptor> fileAudioDeviceDescriptor)
     : _ptrAudioBuffer(nullptr),
@@ -30,8 +35,10 @@ FileAudioDevice::FileAudioDevice(std::shared_ptr<FileAudioDeviceDescriptor> file
       _playoutFramesIn10MS(0),
       _playing(false),
       _recording(false),
-      _lastCallPlayoutMillis(0),
-      _lastCallRecordMillis(0),
+      // playout of WebRTC is recording for Python and vice versa
+      _playoutScheduler(kTickPeriod, kMaxTickLag, fileAudioDeviceDescriptor->_recordingTickStats),
+      _recordingScheduler(kTickPeriod, kMaxTickLag, fileAudioDeviceDescriptor->_playoutTickStats),
+      _inputPrefetcher(fileAudioDeviceDescriptor, kInputReadAheadSize),
       _fileAudioDeviceDescriptor(std::move(fileAudioDeviceDescriptor)) {}
 
 FileAudioDevice::~FileAudioDevice() = default;
@@ -46,6 +53,8 @@ webrtc::AudioDeviceGeneric::InitStatus FileAudioDevice::Init() {
 }
 
 int32_t FileAudioDevice::Terminate() {
+  // files completed before are still reported
+  _callbackDispatcher.stop();
   return 0;
 }
 
@@ -193,10 +202,20 @@ int32_t FileAudioDevice::StartPlayout() {
   }
 
   // PLAYOUT
-  auto _outputFilename = _fileAudioDeviceDescriptor->_getOutputFilename();
+  auto _outputFilename = _fileAudioDeviceDescriptor->getOutputFilename();
   if (!_outputFilename.empty()) {
-    _outputFile = webrtc::FileWrapper::OpenWriteOnly(_outputFilename.c_str());
-    if (!_outputFile.is_open()) {
+    if (!_output.open(_outputFilename,
+                      _fileAudioDeviceDescriptor->getOutputFormat(),
+                      _fileAudioDeviceDescriptor->getOutputConfig(),
+                      _fileAudioDeviceDescriptor->_outputStats,
+                      [this, descriptor = _fileAudioDeviceDescriptor](const std::string &filename) {
+                        // the writer is joined on stop by a thread which may hold the GIL
+                        _callbackDispatcher.post([descriptor, filename] {
+                          if (descriptor->_recordingSegmentCompletedCallback) {
+                            descriptor->_recordingSegmentCompletedCallback(filename);
+                          }
+                        });
+                      })) {
       RTC_LOG(LS_ERROR) << "Failed to open playout file: " << _outputFilename;
       _playing = false;
       delete[] _playoutBuffer;
@@ -205,6 +224,7 @@ int32_t FileAudioDevice::StartPlayout() {
     }
   }
 
+  _playoutScheduler.reset();
   _ptrThreadPlay.reset(new rtc::PlatformThread(
       PlayThreadFunc, this, "webrtc_audio_module_play_thread",
       rtc::kRealtimePriority));
@@ -226,12 +246,15 @@ int32_t FileAudioDevice::StopPlayout() {
     _ptrThreadPlay.reset();
   }
 
+  // the rest is encoded and the header is completed. It can take long on a slow disk, so the mutex
+  // taken by the recording thread on every tick isn't held. Only the stopped playout thread uses the output
+  _output.close();
+
   webrtc::MutexLock lock(&mutex_);
 
   _playoutFramesLeft = 0;
   delete[] _playoutBuffer;
   _playoutBuffer = nullptr;
-  _outputFile.Close();
 
   RTC_LOG(LS_INFO) << "Stopped playout capture to output file";
   return 0;
@@ -251,26 +274,29 @@ int32_t FileAudioDevice::StartRecording() {
     _recordingBuffer = new int8_t[_recordingBufferSizeIn10MS];
   }
 
-  auto _inputFilename = _fileAudioDeviceDescriptor->_getInputFilename();
-  if (!_inputFilename.empty()) {
-    _inputFile = webrtc::FileWrapper::OpenReadOnly(_inputFilename.c_str());
-    if (!_inputFile.is_open()) {
+  // without input file the queue is played
+  auto inputFilename = _fileAudioDeviceDescriptor->getInputFilename();
+  if (!inputFilename.empty()) {
+    if (!_input.open(inputFilename, 0)) {
       RTC_LOG(LS_ERROR) << "Failed to open audio input file: "
-                        << _inputFilename;
+                        << inputFilename;
       _recording = false;
       delete[] _recordingBuffer;
       _recordingBuffer = nullptr;
       return -1;
     }
+    _isInputRewound = false;
   }
 
+  _inputPrefetcher.start();
+  _recordingScheduler.reset();
   _ptrThreadRec.reset(new rtc::PlatformThread(
       RecThreadFunc, this, "webrtc_audio_module_capture_thread",
       rtc::kRealtimePriority));
 
   _ptrThreadRec->Start();
 
-  RTC_LOG(LS_INFO) << "Started recording from input file: " << _inputFilename;
+  RTC_LOG(LS_INFO) << "Started recording from input file: " << inputFilename;
 
   return 0;
 }
@@ -285,6 +311,7 @@ int32_t FileAudioDevice::StopRecording() {
     _ptrThreadRec->Stop();
     _ptrThreadRec.reset();
   }
+  _inputPrefetcher.stop();
 
   webrtc::MutexLock lock(&mutex_);
   _recordingFramesLeft = 0;
@@ -292,7 +319,8 @@ int32_t FileAudioDevice::StopRecording() {
     delete[] _recordingBuffer;
     _recordingBuffer = nullptr;
   }
-  _inputFile.Close();
+  // the file opened ahead is kept for the next start
+  _input.close();
 
   RTC_LOG(LS_INFO) << "Stopped recording from input file";
   return 0;
@@ -444,30 +472,23 @@ bool FileAudioDevice::PlayThreadProcess() {
   if (!_playing) {
     return false;
   }
-  int64_t currentTime = rtc::TimeMillis();
+  _playoutScheduler.wait();
   mutex_.Lock();
 
-  if (_lastCallPlayoutMillis == 0 ||
-      currentTime - _lastCallPlayoutMillis >= 10) {
+  {
     mutex_.Unlock();
     _ptrAudioBuffer->RequestPlayoutData(_playoutFramesIn10MS);
     mutex_.Lock();
 
     _playoutFramesLeft = _ptrAudioBuffer->GetPlayoutData(_playoutBuffer);
     RTC_DCHECK_EQ(_playoutFramesIn10MS, _playoutFramesLeft);
-    if (_outputFile.is_open() && !_fileAudioDeviceDescriptor->_isRecordingPaused()) {
-      _outputFile.Write(_playoutBuffer, kPlayoutBufferSize);
+    if (_output.isOpen() && !_fileAudioDeviceDescriptor->_isRecordingPaused) {
+      _output.write(_playoutBuffer, kPlayoutBufferSize);
     }
-    _lastCallPlayoutMillis = currentTime;
   }
   _playoutFramesLeft = 0;
   mutex_.Unlock();
 
-  int64_t deltaTimeMillis = rtc::TimeMillis() - currentTime;
-  if (deltaTimeMillis < 10) {
-    webrtc::SleepMs(10 - deltaTimeMillis);
-  }
-
   return true;
 }
 
@@ -476,43 +497,96 @@ bool FileAudioDevice::RecThreadProcess() {
     return false;
   }
 
-  int64_t currentTime = rtc::TimeMillis();
+  _recordingScheduler.wait();
+  std::vector<std::string> endedFilenames;
   mutex_.Lock();
 
-  if (_lastCallRecordMillis == 0 || currentTime - _lastCallRecordMillis >= 10) {
-    if (_inputFile.is_open() && !_fileAudioDeviceDescriptor->_isPlayoutPaused()) {
-      auto _inputFilename = _fileAudioDeviceDescriptor->_getInputFilename();
-      if (_inputFile.Read(_recordingBuffer, kRecordingBufferSize) > 0) {
-        _ptrAudioBuffer->SetRecordedBuffer(_recordingBuffer,
-                                           _recordingFramesIn10MS);
-      } else if (_fileAudioDeviceDescriptor->_isEndlessPlayout()) {
-        _inputFile.Rewind();
-
-        if (_fileAudioDeviceDescriptor->_playoutEndedCallback) {
-          _fileAudioDeviceDescriptor->_playoutEndedCallback(_inputFilename);
-        }
-      } else {
-        mutex_.Unlock();
-
-        if (_fileAudioDeviceDescriptor->_playoutEndedCallback) {
-          _fileAudioDeviceDescriptor->_playoutEndedCallback(_inputFilename);
-        }
-
-        return false;
-      }
-      _lastCallRecordMillis = currentTime;
+  if (!_fileAudioDeviceDescriptor->_isPlayoutPaused) {
+    auto length = readInput(_recordingBuffer, kRecordingBufferSize, endedFilenames);
+    if (length > 0) {
+      // the last chunk of the last file is padded with silence
+      memset(_recordingBuffer + length, 0, kRecordingBufferSize - length);
+      _ptrAudioBuffer->SetRecordedBuffer(_recordingBuffer,
+                                         _recordingFramesIn10MS);
+
       mutex_.Unlock();
       _ptrAudioBuffer->DeliverRecordedData();
       mutex_.Lock();
     }
   }
 
+  _inputPrefetcher.takeSkippedFilenames(endedFilenames);
+
   mutex_.Unlock();
 
-  int64_t deltaTimeMillis = rtc::TimeMillis() - currentTime;
-  if (deltaTimeMillis < 10) {
-    webrtc::SleepMs(10 - deltaTimeMillis);
+  // callback takes the GIL, it must not be called under the mutex
+  if (_fileAudioDeviceDescriptor->_playoutEndedCallback) {
+    for (const auto &filename : endedFilenames) {
+      _fileAudioDeviceDescriptor->_playoutEndedCallback(filename);
+    }
+  }
+
+  return true;
+}
+
+size_t FileAudioDevice::readInput(int8_t *data, size_t size, std::vector<std::string> &endedFilenames) {
+  size_t length = 0;
+  bool isRewound = false;
+
+  while (length < size) {
+    if (!_input.isOpen() && !switchToNextInput()) {
+      break;
+    }
+
+    auto readLength = _input.read(data + length, size - length);
+    length += readLength;
+    if (readLength > 0) {
+      _isInputRewound = false;
+    }
+    if (length == size) {
+      break;
+    }
+
+    // the end of the file. Rest of the chunk is taken from the next file.
+    // Repeated empty file isn't reported on every tick
+    if (!_isInputRewound) {
+      endedFilenames.push_back(_input.filename());
+    }
+    if (switchToNextInput()) {
+      continue;
+    }
+
+    // once per tick, so an empty file doesn't loop forever
+    if (_fileAudioDeviceDescriptor->_isEndlessPlayout && !isRewound) {
+      isRewound = _input.rewind();
+      if (isRewound) {
+        _isInputRewound = true;
+        continue;
+      }
+    }
+
+    // unlike the device without the queue, it isn't stopped at the end and plays files queued later
+    if (!_fileAudioDeviceDescriptor->_isEndlessPlayout) {
+      _inputPrefetcher.retire(std::move(_input));
+      _input.close();
+    }
+    break;
+  }
+
+  return length;
+}
+
+bool FileAudioDevice::switchToNextInput() {
+  AudioInputFile input;
+  if (!_inputPrefetcher.take(input)) {
+    return false;
   }
 
+  _inputPrefetcher.retire(std::move(_input));
+  _input = std::move(input);
+  _isInputRewound = false;
+  _fileAudioDeviceDescriptor->setInputFilename(_input.filename());
+
+  RTC_LOG(LS_INFO) << "Switched to queued audio input file: " << _input.filename();
   return true;
 }
@@ -12,6 +12,7 @@
 
 #include <memory>
 #include <string>
+#include <vector>
 
 #include <modules/audio_device/audio_device_impl.h>
 #include <modules/audio_device/audio_device_generic.h>
@@ -19,7 +20,12 @@
 #include <rtc_base/system/file_wrapper.h>
 #include <rtc_base/time_utils.h>
 
+#include "AudioInputFile.h"
+#include "AudioInputPrefetcher.h"
+#include "AudioOutputFile.h"
+#include "CallbackDispatcher.h"
 #include "FileAudioDeviceDescriptor.h"
+#include "TickScheduler.h"
 
 namespace rtc {
   class PlatformThread;
@@ -33,9 +39,9 @@ public:
   // Constructs a file audio device with |id|. It will read audio from
   // |inputFilename| and record output audio to |outputFilename|.
   //
-  // The input file should be a readable 48k stereo raw file, and the output
-  // file should point to a writable location. The output format will also be
-  // 48k stereo raw audio.
+  // The input file should be a readable Ogg/Opus, WAV or 48k stereo raw file,
+  // and the output file should point to a writable location. The output format
+  // is set by the descriptor: 48k stereo raw audio, WAV or Ogg/Opus.
   explicit FileAudioDevice(std::shared_ptr<FileAudioDeviceDescriptor>);
 
   ~FileAudioDevice() override;
@@ -173,6 +179,13 @@ private:
 
   bool PlayThreadProcess();
 
+  // fills data from the current input and the queued files, returns count of filled bytes.
+  // Names of finished files are appended to endedFilenames
+  size_t readInput(int8_t *data, size_t size, std::vector<std::string> &endedFilenames);
+
+  // makes the next queued file current and removes it from the queue
+  bool switchToNextInput();
+
   int32_t _playout_index;
   int32_t _record_index;
   webrtc::AudioDeviceBuffer *_ptrAudioBuffer;
@@ -192,11 +205,17 @@ private:
 
   bool _playing;
   bool _recording;
-  int64_t _lastCallPlayoutMillis;
-  int64_t _lastCallRecordMillis;
-
-  webrtc::FileWrapper _outputFile;
-  webrtc::FileWrapper _inputFile;
+  TickScheduler _playoutScheduler;
+  TickScheduler _recordingScheduler;
+
+  // completed output files are reported in order. Declared before the output, which posts to it on close
+  CallbackDispatcher _callbackDispatcher;
+  AudioOutputFile _output;
+  AudioInputFile _input;
+  // nothing was read from the input after its rewind, so its end isn't reported again
+  bool _isInputRewound = false;
+  // the next queued file is opened ahead on its own thread
+  AudioInputPrefetcher _inputPrefetcher;
 
   std::shared_ptr<FileAudioDeviceDescriptor> _fileAudioDeviceDescriptor;
 };
@@ -1,16 +1,135 @@
 #pragma once
 
+#include <atomic>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
 #include <string>
+#include <vector>
 
+#include "AudioOutputFile.h"
+#include "TickScheduler.h"
 
+// State is pushed from Python, so audio threads don't need to take the GIL on each tick.
 class FileAudioDeviceDescriptor {
 public:
-    std::function<std::string()> _getInputFilename = nullptr;
-    std::function<std::string()> _getOutputFilename = nullptr;
+    std::atomic<bool> _isEndlessPlayout{true};
+    std::atomic<bool> _isPlayoutPaused{false};
+    std::atomic<bool> _isRecordingPaused{false};
 
-    std::function<bool()> _isEndlessPlayout = nullptr;
-    std::function<bool()> _isPlayoutPaused = nullptr;
-    std::function<bool()> _isRecordingPaused = nullptr;
+    // pacing of native threads. Playout is the thread reading the input file
+    std::shared_ptr<TickStats> _playoutTickStats = std::make_shared<TickStats>();
+    std::shared_ptr<TickStats> _recordingTickStats = std::make_shared<TickStats>();
 
+    // writer of the output file, applied to the next opened file
+    std::atomic<int> _outputBufferMs{AudioOutputConfig().bufferMs};
+    std::atomic<AudioOutputSyncPolicy> _outputSyncPolicy{AudioOutputConfig().syncPolicy};
+    std::atomic<int> _outputSyncIntervalMs{AudioOutputConfig().syncIntervalMs};
+    std::atomic<int> _outputSegmentDurationMs{AudioOutputConfig().segmentDurationMs};
+    std::atomic<uint64_t> _outputSegmentMaxBytes{AudioOutputConfig().segmentMaxBytes};
+    std::atomic<int> _outputBitrateKbit{AudioOutputConfig().bitrateKbit};
+    std::shared_ptr<AudioOutputStats> _outputStats = std::make_shared<AudioOutputStats>();
+
+    // called from the native thread for every played input file, including queued ones
     std::function<void(std::string)> _playoutEndedCallback = nullptr;
+    // called from a native thread for every completed output file, segmented or not
+    std::function<void(std::string)> _recordingSegmentCompletedCallback = nullptr;
+
+    std::string getInputFilename() const {
+      std::lock_guard<std::mutex> lock(_mutex);
+      return _inputFilename;
+    }
+
+    void setInputFilename(std::string filename) {
+      std::lock_guard<std::mutex> lock(_mutex);
+      _inputFilename = std::move(filename);
+    }
+
+    std::string getOutputFilename() const {
+      std::lock_guard<std::mutex> lock(_mutex);
+      return _outputFilename;
+    }
+
+    void setOutputFilename(std::string filename) {
+      std::lock_guard<std::mutex> lock(_mutex);
+      _outputFilename = std::move(filename);
+    }
+
+    AudioOutputConfig getOutputConfig() const {
+      AudioOutputConfig config;
+      config.bufferMs = _outputBufferMs;
+      config.syncPolicy = _outputSyncPolicy;
+      config.syncIntervalMs = _outputSyncIntervalMs;
+      config.segmentDurationMs = _outputSegmentDurationMs;
+      config.segmentMaxBytes = _outputSegmentMaxBytes;
+      config.bitrateKbit = _outputBitrateKbit;
+      return config;
+    }
+
+    AudioFileFormat getOutputFormat() const {
+      std::lock_guard<std::mutex> lock(_mutex);
+      return _outputFormat;
+    }
+
+    void setOutputFormat(AudioFileFormat format) {
+      std::lock_guard<std::mutex> lock(_mutex);
+      _outputFormat = format;
+    }
+
+    // the file is played after the current input and earlier queued ones without restart of the device
+    void enqueueInputFilename(std::string filename) {
+      std::lock_guard<std::mutex> lock(_mutex);
+      _playlist.push_back(std::move(filename));
+    }
+
+    void clearPlaylist() {
+      std::lock_guard<std::mutex> lock(_mutex);
+      _playlist.clear();
+      // the file opened ahead by the device is outdated now
+      _playlistVersion++;
+    }
+
+    std::vector<std::string> getPlaylist() const {
+      std::lock_guard<std::mutex> lock(_mutex);
+      return {_playlist.begin(), _playlist.end()};
+    }
+
+    // device side. Version of the playlist is changed by clear
+    bool _peekPlaylistItem(std::string &filename, uint64_t &version) const {
+      std::lock_guard<std::mutex> lock(_mutex);
+      if (_playlist.empty()) {
+        return false;
+      }
+
+      filename = _playlist.front();
+      version = _playlistVersion;
+      return true;
+    }
+
+    // removes the first item when the playlist wasn't cleared after peek. Prefetch thread only
+    bool _popPlaylistItem(uint64_t version) {
+      std::lock_guard<std::mutex> lock(_mutex);
+      if (_playlist.empty() || version != _playlistVersion) {
+        return false;
+      }
+
+      _playlist.pop_front();
+      return true;
+    }
+
+    // lock-free, it's checked on the audio thread
+    uint64_t _getPlaylistVersion() const {
+      return _playlistVersion.load(std::memory_order_acquire);
+    }
+
+private:
+    mutable std::mutex _mutex;
+    std::string _inputFilename;
+    std::string _outputFilename;
+    AudioFileFormat _outputFormat = AudioFileFormat::Raw;
+    std::deque<std::string> _playlist;
+    // changed under the mutex
+    std::atomic<uint64_t> _playlistVersion{0};
 };
@@ -28,12 +28,22 @@ NativeInstance::~NativeInstance() = default;
 void NativeInstance::setupGroupCall(
     std::function<void(tgcalls::GroupJoinPayload)> &emitJoinPayloadCallback,
     std::function<void(bool)> &networkStateUpdated,
-    int outgoingAudioBitrateKbit) {
+    int outgoingAudioBitrateKbit,
+    tgcalls::VideoContentType videoContentType) {
   _emitJoinPayloadCallback = emitJoinPayloadCallback;
   _networkStateUpdated = networkStateUpdated;
   _outgoingAudioBitrateKbit = outgoingAudioBitrateKbit;
+  _videoContentType = videoContentType;
 }
 
+namespace {
+
+int minOutgoingVideoBitrateKbitOrDefault(int kbit) {
+  return kbit > 0 ? kbit : tgcalls::GroupInstanceDescriptor().minOutgoingVideoBitrateKbit;
+}
+
+}  // namespace
+
 class PytgcallsRequestMediaChannelDescriptionTask final : public tgcalls::RequestMediaChannelDescriptionTask {
 public:
   PytgcallsRequestMediaChannelDescriptionTask();
@@ -65,13 +75,15 @@ void NativeInstance::createInstanceHolder(
       .createAudioDeviceModule = std::move(createAudioDeviceModule),
       .outgoingAudioBitrateKbit = _outgoingAudioBitrateKbit,
       .disableOutgoingAudioProcessing = true,
-      .videoContentType = tgcalls::VideoContentType::Generic,
+      .videoContentType = _videoContentType,
       .requestMediaChannelDescriptions = [=](
           std::vector<uint32_t> const & ssrcs,
           std::function<void(std::vector<tgcalls::MediaChannelDescription> &&)> done) {
         auto result = std::make_shared<PytgcallsRequestMediaChannelDescriptionTask>();
         return result;
       },
+      .minOutgoingVideoBitrateKbit = minOutgoingVideoBitrateKbitOrDefault(_minOutgoingVideoBitrateKbit),
+      .maxOutgoingVideoBitrateKbit = _maxOutgoingVideoBitrateKbit,
       // deprecated
 //      .participantDescriptionsRequired =
 //      [=](std::vector<uint32_t> const &ssrcs) {
@@ -238,17 +250,58 @@ void NativeInstance::setAudioInputDevice(std::string id) const {
   instanceHolder->groupNativeInstance->setAudioInputDevice(std::move(id));
 }
 
-void NativeInstance::setVideoCapture(std::function<std::string()> getNextFrameBuffer, float fps, int width, int height) {
+void NativeInstance::setVideoCapture(std::function<py::object()> getNextFrameBuffer, float fps, int width, int height,
+                                     PixelFormat pixelFormat, int targetWidth, int targetHeight) {
+  _videoTickStats = std::make_shared<TickStats>();
+  _videoSource = std::make_shared<PythonSource>(std::move(getNextFrameBuffer), fps, width, height, pixelFormat,
+                                                targetWidth, targetHeight);
   _videoCapture = tgcalls::VideoCaptureInterface::Create(
       tgcalls::StaticThreads::getThreads(),
-      PythonVideoTrackSource::createPtr(
-          std::make_unique<PythonSource>(std::move(getNextFrameBuffer), fps, width, height),fps),
+      PythonVideoTrackSource::createPtr(_videoSource, fps, _videoTickStats),
       "python_video_track_source"
   );
 
   instanceHolder->groupNativeInstance->setVideoCapture(std::move(_videoCapture));
 }
 
+void NativeInstance::setOutgoingVideoBitrate(int minBitrateKbit, int maxBitrateKbit) {
+  _minOutgoingVideoBitrateKbit = minBitrateKbit;
+  _maxOutgoingVideoBitrateKbit = maxBitrateKbit;
+  if (instanceHolder && instanceHolder->groupNativeInstance) {
+    instanceHolder->groupNativeInstance->setOutgoingVideoBitrate(
+        minOutgoingVideoBitrateKbitOrDefault(minBitrateKbit), maxBitrateKbit
+    );
+  }
+}
+
+void NativeInstance::setStaticVideoFrame(const py::object &frame) const {
+  if (_videoSource) {
+    _videoSource->setStaticFrame(frame);
+  }
+}
+
+void NativeInstance::clearStaticVideoFrame() const {
+  if (_videoSource) {
+    _videoSource->clearStaticFrame();
+  }
+}
+
+void NativeInstance::addIncomingVideoOutput(std::string endpointId, PythonVideoSink::Callback onFrame, float fps,
+                                            int maxWidth, int maxHeight, PixelFormat pixelFormat) {
+  auto sink = std::make_shared<PythonVideoSink>(std::move(onFrame), fps, maxWidth, maxHeight, pixelFormat);
+  instanceHolder->groupNativeInstance->addIncomingVideoOutput(endpointId, sink);
+  // the previous sink of the endpoint expires and is dropped by lib_tgcalls
+  _incomingVideoSinks[std::move(endpointId)] = std::move(sink);
+}
+
+void NativeInstance::removeIncomingVideoOutput(std::string const &endpointId) {
+  _incomingVideoSinks.erase(endpointId);
+}
+
+void NativeInstance::setRequestedVideoChannels(std::vector<tgcalls::VideoChannelDescription> channels) const {
+  instanceHolder->groupNativeInstance->setRequestedVideoChannels(std::move(channels));
+}
+
 void NativeInstance::startCall(vector<RtcServer> servers,
                                std::array<uint8_t, 256> authKey,
                                bool isOutgoing, string logPath) {
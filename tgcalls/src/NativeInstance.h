@@ -1,5 +1,7 @@
 #pragma once
 
+#include <map>
+
 #include <pybind11/pybind11.h>
 
 #include <modules/audio_device/include/audio_device.h>
@@ -13,6 +15,7 @@
 
 #include "video/PythonSource.h"
 #include "video/PythonVideoTrackSource.h"
+#include "video/PythonVideoSink.h"
 
 namespace py = pybind11;
 
@@ -24,6 +27,10 @@ public:
     string _logPath;
 
     int _outgoingAudioBitrateKbit = 128;
+    tgcalls::VideoContentType _videoContentType = tgcalls::VideoContentType::Generic;
+    // 0 keeps the default of lib_tgcalls
+    int _minOutgoingVideoBitrateKbit = 0;
+    int _maxOutgoingVideoBitrateKbit = 0;
 
     std::function<void(const std::vector<uint8_t> &data)> signalingDataEmittedCallback;
 
@@ -33,6 +40,12 @@ public:
     std::shared_ptr<FileAudioDeviceDescriptor> _fileAudioDeviceDescriptor;
     std::shared_ptr<RawAudioDeviceDescriptor> _rawAudioDeviceDescriptor;
     std::shared_ptr<tgcalls::VideoCaptureInterface> _videoCapture;
+    // pacing of the video source thread. Replaced on each setVideoCapture
+    // frame source of the current video capture, it's shared with the video thread
+    std::shared_ptr<PythonSource> _videoSource;
+    std::shared_ptr<TickStats> _videoTickStats = std::make_shared<TickStats>();
+    // lib_tgcalls keeps weak pointers to sinks, so they live here until removed. One per endpoint
+    std::map<std::string, std::shared_ptr<PythonVideoSink>> _incomingVideoSinks;
 
     NativeInstance(bool, string);
     ~NativeInstance();
@@ -42,7 +55,8 @@ public:
     void setupGroupCall(
             std::function<void(tgcalls::GroupJoinPayload)> &,
             std::function<void(bool)> &,
-            int
+            int,
+            tgcalls::VideoContentType
     );
 
     void startGroupCall(std::shared_ptr<FileAudioDeviceDescriptor>);
@@ -68,7 +82,13 @@ public:
     void setAudioOutputDevice(std::string id) const;
     void setAudioInputDevice(std::string id) const;
 
-    void setVideoCapture(std::function<std::string()>, float, int, int);
+    void setVideoCapture(std::function<py::object()>, float, int, int, PixelFormat, int, int);
+    void setOutgoingVideoBitrate(int, int);
+    void setStaticVideoFrame(const py::object &) const;
+    void clearStaticVideoFrame() const;
+    void addIncomingVideoOutput(std::string, PythonVideoSink::Callback, float, int, int, PixelFormat);
+    void removeIncomingVideoOutput(std::string const &);
+    void setRequestedVideoChannels(std::vector<tgcalls::VideoChannelDescription>) const;
 
     void receiveSignalingData(std::vector<uint8_t> &data) const;
     void setJoinResponsePayload(std::string const &) const;
@@ -0,0 +1,170 @@
+#include "OggOpusFileDecoder.h"
+
+#include <algorithm>
+#include <cstring>
+
+#include <opus.h>
+
+namespace {
+
+// 120 ms, the longest Opus packet
+const int kMaxPacketFrames = 5760;
+const size_t kPageHeaderSize = 27;
+const uint8_t kLastPageFlag = 0x04;
+const size_t kOpusHeadSize = 19;
+
+uint64_t readLittleEndian(const uint8_t *data, size_t size) {
+  uint64_t value = 0;
+  for (size_t i = 0; i < size; i++) {
+    value |= static_cast<uint64_t>(data[i]) << (8 * i);
+  }
+  return value;
+}
+
+}  // namespace
+
+OggOpusFileDecoder::OggOpusFileDecoder(webrtc::FileWrapper file) : AudioFileDecoder(std::move(file)) {}
+
+OggOpusFileDecoder::~OggOpusFileDecoder() {
+  if (_decoder) {
+    opus_decoder_destroy(_decoder);
+  }
+}
+
+bool OggOpusFileDecoder::decode() {
+  if (_isEnded) {
+    return false;
+  }
+  if (!readPacket(_packet)) {
+    _isEnded = true;
+    return false;
+  }
+
+  _pcm.resize(kMaxPacketFrames * kNumChannels);
+  auto frames = _packet.empty() ? 0 : opus_decode(
+      _decoder, _packet.data(), static_cast<opus_int32>(_packet.size()), _pcm.data(), kMaxPacketFrames, 0);
+  if (frames <= 0) {
+    // broken packet is skipped
+    _pcm.clear();
+    return true;
+  }
+
+  auto start = _decodedSamples;
+  _decodedSamples += frames;
+
+  int64_t first = std::min<int64_t>(std::max<int64_t>(_preSkip - start, 0), frames);
+  int64_t last = frames;
+  if (_isLastPage && _granulePosition >= 0) {
+    // granule position of the last page is the end of the stream, the rest of the last packet is padding
+    last = std::min<int64_t>(std::max(_granulePosition - start, first), frames);
+  }
+
+  _pcm.resize(last * kNumChannels);
+  _pcm.erase(_pcm.begin(), _pcm.begin() + first * kNumChannels);
+  return true;
+}
+
+bool OggOpusFileDecoder::reset() {
+  if (!_file.Rewind()) {
+    return false;
+  }
+
+  _serialNumber = -1;
+  _isLastPage = false;
+  _granulePosition = -1;
+  _segmentSizes.clear();
+  _segmentIndex = 0;
+  _page.clear();
+  _pagePosition = 0;
+  _decodedSamples = 0;
+  _isEnded = false;
+
+  // identification header
+  if (!readPacket(_packet) || _packet.size() < kOpusHeadSize || memcmp(_packet.data(), "OpusHead", 8) != 0) {
+    return false;
+  }
+  auto channels = _packet[9];
+  auto mappingFamily = _packet[18];
+  if (channels == 0 || channels > 2 || mappingFamily != 0) {
+    return false;
+  }
+  _preSkip = static_cast<int64_t>(readLittleEndian(_packet.data() + 10, 2));
+  auto outputGain = static_cast<int16_t>(readLittleEndian(_packet.data() + 16, 2));
+
+  // comment header isn't used
+  if (!readPacket(_packet)) {
+    return false;
+  }
+
+  // mono is decoded to both channels
+  if (!_decoder) {
+    int error;
+    _decoder = opus_decoder_create(kSampleRate, kNumChannels, &error);
+    if (error != OPUS_OK) {
+      _decoder = nullptr;
+      return false;
+    }
+  } else {
+    opus_decoder_ctl(_decoder, OPUS_RESET_STATE);
+  }
+  opus_decoder_ctl(_decoder, OPUS_SET_GAIN(outputGain));
+
+  return true;
+}
+
+bool OggOpusFileDecoder::readPage() {
+  while (true) {
+    uint8_t header[kPageHeaderSize];
+    if (_file.Read(header, kPageHeaderSize) != kPageHeaderSize || memcmp(header, "OggS", 4) != 0) {
+      return false;
+    }
+
+    auto segmentCount = header[26];
+    _segmentSizes.resize(segmentCount);
+    if (_file.Read(_segmentSizes.data(), segmentCount) != segmentCount) {
+      return false;
+    }
+
+    size_t pageSize = 0;
+    for (auto size : _segmentSizes) {
+      pageSize += size;
+    }
+    _page.resize(pageSize);
+    if (_file.Read(_page.data(), pageSize) != pageSize) {
+      return false;
+    }
+
+    auto serialNumber = static_cast<int64_t>(readLittleEndian(header + 14, 4));
+    if (_serialNumber == -1) {
+      _serialNumber = serialNumber;
+    }
+    if (serialNumber != _serialNumber) {
+      continue;
+    }
+
+    _isLastPage = header[5] & kLastPageFlag;
+    _granulePosition = static_cast<int64_t>(readLittleEndian(header + 6, 8));
+    _segmentIndex = 0;
+    _pagePosition = 0;
+    return true;
+  }
+}
+
+bool OggOpusFileDecoder::readPacket(std::vector<uint8_t> &packet) {
+  packet.clear();
+  while (true) {
+    // packet ends with a segment shorter than 255 bytes, it can continue on the next page
+    while (_segmentIndex < _segmentSizes.size()) {
+      auto size = _segmentSizes[_segmentIndex++];
+      packet.insert(packet.end(), _page.begin() + _pagePosition, _page.begin() + _pagePosition + size);
+      _pagePosition += size;
+      if (size < 255) {
+        return true;
+      }
+    }
+
+    if (_isLastPage || !readPage()) {
+      return false;
+    }
+  }
+}
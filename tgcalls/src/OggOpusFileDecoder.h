@@ -0,0 +1,46 @@
+#pragma once
+
+#include <cstdint>
+#include <vector>
+
+#include "AudioFileDecoder.h"
+
+struct OpusDecoder;
+
+// Ogg/Opus files (RFC 7845) decoded by libopus. Only the first logical stream is played,
+// multichannel streams (mapping family other than 0) aren't supported
+class OggOpusFileDecoder : public AudioFileDecoder {
+public:
+  explicit OggOpusFileDecoder(webrtc::FileWrapper file);
+
+  ~OggOpusFileDecoder() override;
+
+protected:
+  bool decode() override;
+
+  bool reset() override;
+
+private:
+  // reads the next page of the stream to _page. Pages of other streams are skipped
+  bool readPage();
+
+  bool readPacket(std::vector<uint8_t> &packet);
+
+  OpusDecoder *_decoder = nullptr;
+
+  // -1 until the first page is read
+  int64_t _serialNumber = -1;
+  bool _isLastPage = false;
+  int64_t _granulePosition = -1;
+  std::vector<uint8_t> _segmentSizes;
+  size_t _segmentIndex = 0;
+  std::vector<uint8_t> _page;
+  size_t _pagePosition = 0;
+
+  std::vector<uint8_t> _packet;
+  // samples at the beginning of the stream which aren't played
+  int64_t _preSkip = 0;
+  // decoded samples per channel, including skipped ones. Compared with granule position to trim the end
+  int64_t _decodedSamples = 0;
+  bool _isEnded = false;
+};
@@ -0,0 +1,185 @@
+#include "OggOpusFileEncoder.h"
+
+#include <algorithm>
+#include <cstring>
+#include <random>
+
+#include <opus.h>
+
+namespace {
+
+// 20 ms
+const int kFrameSize = 960;
+// recommended by libopus as enough for any packet
+const size_t kMaxPacketSize = 4000;
+// libopus supports 6-510 kbit/s
+const int kMinBitrateKbit = 6;
+const int kMaxBitrateKbit = 510;
+const size_t kPacketsPerPage = 50;
+const size_t kMaxPageSegments = 255;
+
+const uint8_t kFirstPageFlag = 0x02;
+const uint8_t kLastPageFlag = 0x04;
+const size_t kCrcOffset = 22;
+
+const char kVendor[] = "tgcalls";
+
+void appendLittleEndian(std::vector<uint8_t> &data, uint64_t value, size_t size) {
+  for (size_t i = 0; i < size; i++) {
+    data.push_back(static_cast<uint8_t>(value >> (8 * i)));
+  }
+}
+
+// CRC-32 of Ogg: polynomial 0x04c11db7, no reflection, zero initial value
+uint32_t oggCrc(const std::vector<uint8_t> &data) {
+  static const auto table = [] {
+    std::vector<uint32_t> table(256);
+    for (uint32_t i = 0; i < 256; i++) {
+      auto value = i << 24;
+      for (int bit = 0; bit < 8; bit++) {
+        value = (value & 0x80000000) ? (value << 1) ^ 0x04c11db7 : value << 1;
+      }
+      table[i] = value;
+    }
+    return table;
+  }();
+
+  uint32_t crc = 0;
+  for (auto byte : data) {
+    crc = (crc << 8) ^ table[((crc >> 24) ^ byte) & 0xff];
+  }
+  return crc;
+}
+
+}  // namespace
+
+OggOpusFileEncoder::OggOpusFileEncoder(webrtc::FileWrapper file, int bitrateKbit)
+    : AudioFileEncoder(std::move(file)),
+      _bitrateKbit(std::min(std::max(bitrateKbit, kMinBitrateKbit), kMaxBitrateKbit)) {}
+
+OggOpusFileEncoder::~OggOpusFileEncoder() {
+  if (_encoder) {
+    opus_encoder_destroy(_encoder);
+  }
+}
+
+bool OggOpusFileEncoder::write(const int8_t *data, size_t size) {
+  auto samples = reinterpret_cast<const int16_t *>(data);
+  _frame.insert(_frame.end(), samples, samples + size / sizeof(int16_t));
+  _inputSamples += size / sizeof(int16_t) / kNumChannels;
+
+  size_t position = 0;
+  for (; position + kFrameSize * kNumChannels <= _frame.size(); position += kFrameSize * kNumChannels) {
+    if (!encodeFrame(_frame.data() + position)) {
+      return false;
+    }
+  }
+  _frame.erase(_frame.begin(), _frame.begin() + position);
+
+  return true;
+}
+
+bool OggOpusFileEncoder::start() {
+  int error;
+  _encoder = opus_encoder_create(kSampleRate, kNumChannels, OPUS_APPLICATION_AUDIO, &error);
+  if (error != OPUS_OK) {
+    _encoder = nullptr;
+    return false;
+  }
+  opus_encoder_ctl(_encoder, OPUS_SET_BITRATE(_bitrateKbit * 1000));
+
+  opus_int32 lookahead = 0;
+  opus_encoder_ctl(_encoder, OPUS_GET_LOOKAHEAD(&lookahead));
+  _preSkip = lookahead;
+
+  std::random_device random;
+  _serialNumber = random();
+  _packet.resize(kMaxPacketSize);
+
+  // identification header
+  std::vector<uint8_t> header = {'O', 'p', 'u', 's', 'H', 'e', 'a', 'd', 1, kNumChannels};
+  appendLittleEndian(header, _preSkip, 2);
+  appendLittleEndian(header, kSampleRate, 4);
+  // output gain and mapping family
+  appendLittleEndian(header, 0, 2);
+  header.push_back(0);
+  addPacket(header.data(), header.size());
+  if (!writePage(kFirstPageFlag, 0)) {
+    return false;
+  }
+
+  // comment header without comments
+  header = {'O', 'p', 'u', 's', 'T', 'a', 'g', 's'};
+  appendLittleEndian(header, sizeof(kVendor) - 1, 4);
+  header.insert(header.end(), kVendor, kVendor + sizeof(kVendor) - 1);
+  appendLittleEndian(header, 0, 4);
+  addPacket(header.data(), header.size());
+  return writePage(0, 0);
+}
+
+bool OggOpusFileEncoder::finish() {
+  // the end is padded with silence, so the delayed samples come out of the encoder.
+  // Padding is cut by the granule position of the last page
+  auto isCompleted = true;
+  while (isCompleted && _encodedSamples < _inputSamples + _preSkip) {
+    _frame.resize(kFrameSize * kNumChannels, 0);
+    isCompleted = encodeFrame(_frame.data());
+    _frame.clear();
+  }
+
+  return isCompleted && writePage(kLastPageFlag, _inputSamples + _preSkip);
+}
+
+bool OggOpusFileEncoder::encodeFrame(const int16_t *samples) {
+  auto size = opus_encode(_encoder, samples, kFrameSize, _packet.data(), static_cast<opus_int32>(_packet.size()));
+  if (size < 0) {
+    return false;
+  }
+  _encodedSamples += kFrameSize;
+
+  // packet of 4000 bytes takes 16 segments
+  if (_segmentSizes.size() + size / 255 + 1 > kMaxPageSegments && !writePage(0, _encodedSamples - kFrameSize)) {
+    return false;
+  }
+  addPacket(_packet.data(), size);
+
+  if (_pagePackets == kPacketsPerPage) {
+    return writePage(0, _encodedSamples);
+  }
+  return true;
+}
+
+bool OggOpusFileEncoder::writePage(uint8_t flags, int64_t granulePosition) {
+  std::vector<uint8_t> page = {'O', 'g', 'g', 'S', 0, flags};
+  appendLittleEndian(page, granulePosition, 8);
+  appendLittleEndian(page, _serialNumber, 4);
+  appendLittleEndian(page, _pageSequenceNumber++, 4);
+  appendLittleEndian(page, 0, 4);
+  page.push_back(static_cast<uint8_t>(_segmentSizes.size()));
+  page.insert(page.end(), _segmentSizes.begin(), _segmentSizes.end());
+  page.insert(page.end(), _pageData.begin(), _pageData.end());
+
+  auto crc = oggCrc(page);
+  for (size_t i = 0; i < 4; i++) {
+    page[kCrcOffset + i] = static_cast<uint8_t>(crc >> (8 * i));
+  }
+
+  _segmentSizes.clear();
+  _pageData.clear();
+  _pagePackets = 0;
+
+  return append(page.data(), page.size());
+}
+
+void OggOpusFileEncoder::addPacket(const uint8_t *data, size_t size) {
+  // lacing: segments of 255 bytes and the last shorter one, possibly empty
+  for (auto rest = size; ; rest -= 255) {
+    _segmentSizes.push_back(static_cast<uint8_t>(std::min<size_t>(rest, 255)));
+    if (rest < 255) {
+      break;
+    }
+  }
+
+  _pageData.insert(_pageData.end(), data, data + size);
+  _pagePackets++;
+}
@@ -0,0 +1,49 @@
+#pragma once
+
+#include <cstdint>
+#include <vector>
+
+#include "AudioFileEncoder.h"
+
+struct OpusEncoder;
+
+// Ogg/Opus (RFC 7845) encoded by libopus. Pages are flushed every second
+class OggOpusFileEncoder : public AudioFileEncoder {
+public:
+  OggOpusFileEncoder(webrtc::FileWrapper file, int bitrateKbit);
+
+  ~OggOpusFileEncoder() override;
+
+  bool write(const int8_t *data, size_t size) override;
+
+protected:
+  bool start() override;
+
+  bool finish() override;
+
+private:
+  bool encodeFrame(const int16_t *samples);
+
+  // buffered packets are written as one page
+  bool writePage(uint8_t flags, int64_t granulePosition);
+
+  void addPacket(const uint8_t *data, size_t size);
+
+  OpusEncoder *_encoder = nullptr;
+  int _bitrateKbit;
+
+  uint32_t _serialNumber = 0;
+  uint32_t _pageSequenceNumber = 0;
+  std::vector<uint8_t> _segmentSizes;
+  std::vector<uint8_t> _pageData;
+  size_t _pagePackets = 0;
+
+  // samples per channel. Pre-skip is the delay of the encoder
+  int64_t _preSkip = 0;
+  int64_t _inputSamples = 0;
+  int64_t _encodedSamples = 0;
+
+  // interleaved samples of the incomplete frame
+  std::vector<int16_t> _frame;
+  std::vector<uint8_t> _packet;
+};
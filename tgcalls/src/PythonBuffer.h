@@ -0,0 +1,37 @@
+#pragma once
+
+#include <cstdint>
+
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+// RAII view over C-contiguous memory of any object supporting the buffer protocol
+// (bytes, bytearray, memoryview, NumPy arrays). GIL must be held during the whole lifetime.
+class PythonBuffer {
+public:
+  explicit PythonBuffer(const py::handle &obj, bool writable = false) {
+    auto flags = PyBUF_C_CONTIGUOUS | (writable ? PyBUF_WRITABLE : 0);
+    if (PyObject_GetBuffer(obj.ptr(), &_view, flags) != 0) {
+      throw py::error_already_set();
+    }
+  }
+
+  ~PythonBuffer() {
+    PyBuffer_Release(&_view);
+  }
+
+  PythonBuffer(const PythonBuffer &) = delete;
+  PythonBuffer &operator=(const PythonBuffer &) = delete;
+
+  int8_t *data() const {
+    return (int8_t *) _view.buf;
+  }
+
+  size_t size() const {
+    return (size_t) _view.len;
+  }
+
+private:
+  Py_buffer _view{};
+};
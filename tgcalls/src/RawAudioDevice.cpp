@@ -10,28 +10,35 @@
 #include <rtc_base/time_utils.h>
 #include <system_wrappers/include/sleep.h>
 
-// TODO set from Python
-const int kRecordingFixedSampleRate = 48000;
-const size_t kRecordingNumChannels = 1;
-const int kPlayoutFixedSampleRate = 48000;
-const size_t kPlayoutNumChannels = 1;
+const int kRecordingFixedSampleRate = RawAudioDeviceDescriptor::kSampleRate;
+const size_t kRecordingNumChannels = RawAudioDeviceDescriptor::kNumChannels;
+const int kPlayoutFixedSampleRate = RawAudioDeviceDescriptor::kSampleRate;
+const size_t kPlayoutNumChannels = RawAudioDeviceDescriptor::kNumChannels;
 const size_t kPlayoutBufferSize =
     kPlayoutFixedSampleRate / 100 * kPlayoutNumChannels * 2;
 const size_t kRecordingBufferSize =
     kRecordingFixedSampleRate / 100 * kRecordingNumChannels * 2;
+// native threads work by 10 ms. Up to 10 missed ticks are caught up, older ones are skipped
+const auto kTickPeriod = std::chrono::milliseconds(10);
+const auto kMaxTickLag = std::chrono::milliseconds(100);
 
 RawAudioDevice::RawAudioDevice(std::shared_ptr<RawAudioDeviceDescriptor> RawAudioDeviceDescriptor)
     : _ptrAudioBuffer(nullptr),
       _recordingBuffer(nullptr),
       _playoutBuffer(nullptr),
       _playoutFramesLeft(0),
+      _playoutStagingPosition(0),
+      _recordedStagingLength(0),
+      _wasPlayoutPaused(false),
+      _wasRecordingPaused(false),
       _recordingBufferSizeIn10MS(0),
       _recordingFramesIn10MS(0),
       _playoutFramesIn10MS(0),
       _playing(false),
       _recording(false),
-      _lastCallPlayoutMillis(0),
-      _lastCallRecordMillis(0),
+      // playout of WebRTC is recording for Python and vice versa
+      _playoutScheduler(kTickPeriod, kMaxTickLag, RawAudioDeviceDescriptor->_recordingTickStats),
+      _recordingScheduler(kTickPeriod, kMaxTickLag, RawAudioDeviceDescriptor->_playoutTickStats),
       _rawAudioDeviceDescriptor(std::move(RawAudioDeviceDescriptor)) {}
 
 RawAudioDevice::~RawAudioDevice() = default;
@@ -191,6 +198,10 @@ int32_t RawAudioDevice::StartPlayout() {
     return -1;
   }
 
+  _recordedStagingBuffer.resize(_rawAudioDeviceDescriptor->_callbackBufferSize());
+  _recordedStagingLength = 0;
+
+  _playoutScheduler.reset();
   _ptrThreadPlay.reset(new rtc::PlatformThread(
       PlayThreadFunc, this, "webrtc_audio_module_play_thread",
       rtc::kRealtimePriority));
@@ -234,6 +245,11 @@ int32_t RawAudioDevice::StartRecording() {
     _recordingBuffer = new int8_t[_recordingBufferSizeIn10MS];
   }
 
+  // empty staging buffer is filled on the first tick
+  _playoutStagingBuffer.resize(_rawAudioDeviceDescriptor->_callbackBufferSize());
+  _playoutStagingPosition = _playoutStagingBuffer.size();
+
+  _recordingScheduler.reset();
   _ptrThreadRec.reset(new rtc::PlatformThread(
       RecThreadFunc, this, "webrtc_audio_module_capture_thread",
       rtc::kRealtimePriority));
@@ -408,30 +424,34 @@ bool RawAudioDevice::PlayThreadProcess() {
   if (!_playing) {
     return false;
   }
-  int64_t currentTime = rtc::TimeMillis();
+  _playoutScheduler.wait();
   mutex_.Lock();
 
-  if (_lastCallPlayoutMillis == 0 ||
-      currentTime - _lastCallPlayoutMillis >= 10) {
+  {
     mutex_.Unlock();
     _ptrAudioBuffer->RequestPlayoutData(_playoutFramesIn10MS);
     mutex_.Lock();
 
     _playoutFramesLeft = _ptrAudioBuffer->GetPlayoutData(_playoutBuffer);
     RTC_DCHECK_EQ(_playoutFramesIn10MS, _playoutFramesLeft);
-    if (!_rawAudioDeviceDescriptor->_isRecordingPaused()) {
-      _rawAudioDeviceDescriptor->_setRecordedBuffer(_playoutBuffer, kPlayoutBufferSize);
+    bool isRecordingPaused = _rawAudioDeviceDescriptor->_isRecordingPaused;
+    if (isRecordingPaused != _wasRecordingPaused) {
+      // don't glue audio before and after the pause
+      _recordedStagingLength = 0;
+      _wasRecordingPaused = isRecordingPaused;
+    }
+    if (!isRecordingPaused) {
+      memcpy(_recordedStagingBuffer.data() + _recordedStagingLength, _playoutBuffer, kPlayoutBufferSize);
+      _recordedStagingLength += kPlayoutBufferSize;
+      if (_recordedStagingLength == _recordedStagingBuffer.size()) {
+        _rawAudioDeviceDescriptor->_setRecordedBuffer(_recordedStagingBuffer.data(), _recordedStagingLength);
+        _recordedStagingLength = 0;
+      }
     }
-    _lastCallPlayoutMillis = currentTime;
   }
   _playoutFramesLeft = 0;
   mutex_.Unlock();
 
-  int64_t deltaTimeMillis = rtc::TimeMillis() - currentTime;
-  if (deltaTimeMillis < 10) {
-    webrtc::SleepMs(10 - deltaTimeMillis);
-  }
-
   return true;
 }
 
@@ -440,30 +460,39 @@ bool RawAudioDevice::RecThreadProcess() {
     return false;
   }
 
-  int64_t currentTime = rtc::TimeMillis();
+  _recordingScheduler.wait();
   mutex_.Lock();
 
-  if (_lastCallRecordMillis == 0 || currentTime - _lastCallRecordMillis >= 10) {
-    if (!_rawAudioDeviceDescriptor->_isPlayoutPaused()) {
-      auto recordingStringBuffer = _rawAudioDeviceDescriptor->_getPlayoutBuffer(kRecordingBufferSize);
-//      in prev impl was setting of _recordingBuffer
-      _ptrAudioBuffer->SetRecordedBuffer((int8_t *) recordingStringBuffer->data(), _recordingFramesIn10MS);
+  {
+    bool isPlayoutPaused = _rawAudioDeviceDescriptor->_isPlayoutPaused;
+    if (isPlayoutPaused != _wasPlayoutPaused) {
+      // the rest of audio taken before the pause is outdated after it
+      _playoutStagingPosition = _playoutStagingBuffer.size();
+      _wasPlayoutPaused = isPlayoutPaused;
+    }
+    if (!isPlayoutPaused) {
+      if (_rawAudioDeviceDescriptor->_inputRingBuffer) {
+        _rawAudioDeviceDescriptor->_inputRingBuffer->read(_recordingBuffer, kRecordingBufferSize);
+      } else {
+        if (_playoutStagingPosition == _playoutStagingBuffer.size()) {
+          _rawAudioDeviceDescriptor->_getPlayoutBuffer(_playoutStagingBuffer.data(), _playoutStagingBuffer.size());
+          _playoutStagingPosition = 0;
+        }
+        memcpy(_recordingBuffer, _playoutStagingBuffer.data() + _playoutStagingPosition, kRecordingBufferSize);
+        _playoutStagingPosition += kRecordingBufferSize;
+      }
+      _ptrAudioBuffer->SetRecordedBuffer(_recordingBuffer, _recordingFramesIn10MS);
 
-      _lastCallRecordMillis = currentTime;
       mutex_.Unlock();
       _ptrAudioBuffer->DeliverRecordedData();
       mutex_.Lock();
-
-      delete recordingStringBuffer;
     }
   }
 
   mutex_.Unlock();
 
-  int64_t deltaTimeMillis = rtc::TimeMillis() - currentTime;
-  if (deltaTimeMillis < 10) {
-    webrtc::SleepMs(10 - deltaTimeMillis);
-  }
+  // callback takes the GIL, it must not be called under the mutex
+  _rawAudioDeviceDescriptor->_notifyInputSpace();
 
   return true;
 }
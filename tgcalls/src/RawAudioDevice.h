@@ -2,6 +2,7 @@
 
 #include <memory>
 #include <string>
+#include <vector>
 
 #include <modules/audio_device/audio_device_impl.h>
 #include <modules/audio_device/audio_device_generic.h>
@@ -10,6 +11,7 @@
 #include <rtc_base/time_utils.h>
 
 #include "RawAudioDeviceDescriptor.h"
+#include "TickScheduler.h"
 
 namespace rtc {
   class PlatformThread;
@@ -144,6 +146,14 @@ private:
   webrtc::AudioDeviceBuffer *_ptrAudioBuffer;
   int8_t *_recordingBuffer;  // In bytes.
   int8_t *_playoutBuffer;    // In bytes.
+  // Python callbacks work with callback period, WebRTC with 10 ms slices of these buffers
+  std::vector<int8_t> _playoutStagingBuffer;   // from Python
+  size_t _playoutStagingPosition;
+  std::vector<int8_t> _recordedStagingBuffer;  // to Python
+  size_t _recordedStagingLength;
+  // staging buffers are reset when pause is switched
+  bool _wasPlayoutPaused;
+  bool _wasRecordingPaused;
   uint32_t _playoutFramesLeft;
   webrtc::Mutex mutex_;
 
@@ -156,8 +166,8 @@ private:
 
   bool _playing;
   bool _recording;
-  int64_t _lastCallPlayoutMillis;
-  int64_t _lastCallRecordMillis;
+  TickScheduler _playoutScheduler;
+  TickScheduler _recordingScheduler;
 
   std::shared_ptr<RawAudioDeviceDescriptor> _rawAudioDeviceDescriptor;
 };
@@ -1,12 +1,104 @@
 #include "RawAudioDeviceDescriptor.h"
 
+#include <algorithm>
+#include <cstring>
+
+namespace {
+
+// C++ exceptions of pybind11, like cast_error of a wrong returned type, aren't Python errors yet
+void discardAsUnraisable(const std::exception &e, const char *context) {
+  PyErr_SetString(PyExc_RuntimeError, e.what());
+  py::error_already_set().discard_as_unraisable(context);
+}
+
+// exceptions of Python side must not escape to the native audio thread, they are reported as unraisable.
+// The view is released even when the callback raised. Release fails when the callback kept an export of it
+bool callViewCallback(const std::function<void(py::memoryview, size_t)> &callback,
+                      const py::memoryview &view,
+                      size_t length,
+                      const char *context) {
+  auto isCalled = true;
+  try {
+    callback(view, length);
+  } catch (py::error_already_set &e) {
+    e.discard_as_unraisable(context);
+    isCalled = false;
+  } catch (const std::exception &e) {
+    discardAsUnraisable(e, context);
+    isCalled = false;
+  }
+
+  try {
+    view.attr("release")();
+  } catch (py::error_already_set &e) {
+    e.discard_as_unraisable(context);
+    isCalled = false;
+  } catch (const std::exception &e) {
+    discardAsUnraisable(e, context);
+    isCalled = false;
+  }
+
+  return isCalled;
+}
+
+}  // namespace
+
 void RawAudioDeviceDescriptor::_setRecordedBuffer(int8_t *frame, size_t length) const {
-  auto bytes = std::string((const char *) frame, sizeof(int8_t) * length);
-  _setRecordedBufferCallback(bytes, length);
+  py::gil_scoped_acquire acquire;
+
+  if (_setRecordedBufferViewCallback) {
+    auto view = py::memoryview::from_memory((const void *) frame, (ssize_t) length);
+    callViewCallback(_setRecordedBufferViewCallback, view, length, "recorded audio callback");
+  } else {
+    try {
+      _setRecordedBufferCallback(py::bytes((const char *) frame, length), length);
+    } catch (py::error_already_set &e) {
+      e.discard_as_unraisable("recorded audio callback");
+    } catch (const std::exception &e) {
+      discardAsUnraisable(e, "recorded audio callback");
+    }
+  }
+}
+
+void RawAudioDeviceDescriptor::_getPlayoutBuffer(int8_t *buffer, size_t length) const {
+  py::gil_scoped_acquire acquire;
+
+  if (_getPlayedBufferViewCallback) {
+    memset(buffer, 0, length);
+
+    auto view = py::memoryview::from_memory((void *) buffer, (ssize_t) length);
+    if (!callViewCallback(_getPlayedBufferViewCallback, view, length, "played audio callback")) {
+      // partially written data isn't sent
+      memset(buffer, 0, length);
+    }
+  } else {
+    std::string frame;
+    try {
+      frame = _getPlayedBufferCallback(length);
+    } catch (py::error_already_set &e) {
+      e.discard_as_unraisable("played audio callback");
+    } catch (const std::exception &e) {
+      discardAsUnraisable(e, "played audio callback");
+    }
+
+    auto copied = std::min(frame.size(), length);
+    memcpy(buffer, frame.data(), copied);
+    memset(buffer + copied, 0, length - copied);
+  }
 }
 
-std::string *RawAudioDeviceDescriptor::_getPlayoutBuffer(size_t length) const {
-  std::string frame = _getPlayedBufferCallback(length);
+void RawAudioDeviceDescriptor::_notifyInputSpace() const {
+  if (!_inputRingBuffer || !_inputRingBuffer->takeSpaceNotificationRequest() || !_inputSpaceCallback) {
+    return;
+  }
+
+  py::gil_scoped_acquire acquire;
 
-  return new std::string{frame};
+  try {
+    _inputSpaceCallback();
+  } catch (py::error_already_set &e) {
+    e.discard_as_unraisable("audio input space callback");
+  } catch (const std::exception &e) {
+    discardAsUnraisable(e, "audio input space callback");
+  }
 }
@@ -1,20 +1,52 @@
 #pragma once
 
+#include <algorithm>
+#include <atomic>
 #include <string>
 #include <functional>
+#include <memory>
 
 #include <pybind11/pybind11.h>
 
+#include "AudioRingBuffer.h"
+#include "TickScheduler.h"
+
 namespace py = pybind11;
 
 class RawAudioDeviceDescriptor {
 public:
+    // format of PCM in both directions. Python side resamples to it, so WebRTC doesn't need to
+    static constexpr int kSampleRate = 48000;
+    static constexpr size_t kNumChannels = 1;
+
     std::function<std::string(size_t)> _getPlayedBufferCallback = nullptr;
     std::function<void(const py::bytes &frame, size_t)> _setRecordedBufferCallback = nullptr;
 
-    std::function<bool()> _isPlayoutPaused = nullptr;
-    std::function<bool()> _isRecordingPaused = nullptr;
+    // zero-copy mode. The memoryview is valid only until the callback returns
+    std::function<void(py::memoryview, size_t)> _getPlayedBufferViewCallback = nullptr;
+    std::function<void(py::memoryview, size_t)> _setRecordedBufferViewCallback = nullptr;
+
+    // push mode. When it's set, played data is taken from the buffer without calling Python
+    std::shared_ptr<AudioRingBuffer> _inputRingBuffer = nullptr;
+    // called from the native thread after a read when Python requested notification about free space
+    std::function<void()> _inputSpaceCallback = nullptr;
+
+    std::atomic<bool> _isPlayoutPaused{false};
+    std::atomic<bool> _isRecordingPaused{false};
+
+    // pacing of native threads. Playout is the thread sending audio to the call
+    std::shared_ptr<TickStats> _playoutTickStats = std::make_shared<TickStats>();
+    std::shared_ptr<TickStats> _recordingTickStats = std::make_shared<TickStats>();
+
+    // how often Python callbacks are called. Multiple of 10 ms, applied on start of the device.
+    // The native thread works with 10 ms slices of one big buffer, so it adds this latency
+    size_t _callbackPeriodMs = 10;
+
+    size_t _callbackBufferSize() const {
+        return kSampleRate / 1000 * kNumChannels * 2 * (std::max<size_t>(_callbackPeriodMs / 10, 1) * 10);
+    }
 
     void _setRecordedBuffer(int8_t*, size_t) const;
-    std::string* _getPlayoutBuffer(size_t) const;
+    void _getPlayoutBuffer(int8_t*, size_t) const;
+    void _notifyInputSpace() const;
 };
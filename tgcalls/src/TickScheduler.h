@@ -0,0 +1,69 @@
+#pragma once
+
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <memory>
+#include <thread>
+
+// counters shared with Python. Written by one thread, read by any
+struct TickStats {
+  std::atomic<uint64_t> ticks{0};
+  // ticks started later than one period after their deadline
+  std::atomic<uint64_t> lateTicks{0};
+  // ticks dropped because the thread was behind by more than allowed lag
+  std::atomic<uint64_t> skippedTicks{0};
+};
+
+// Paces a thread by absolute deadlines on the monotonic clock. Sleeping until the deadline
+// instead of for (period - work time) doesn't accumulate errors, and time lost in one tick
+// is made up by the next ones. When the thread is behind by more than maxLag, missed ticks
+// are skipped instead of running them back to back.
+class TickScheduler {
+public:
+  using Clock = std::chrono::steady_clock;
+
+  TickScheduler(Clock::duration period, Clock::duration maxLag, std::shared_ptr<TickStats> stats = nullptr)
+      : _period(period), _maxLag(maxLag), _stats(std::move(stats)) {}
+
+  // the next tick starts right now
+  void reset() {
+    _deadline = Clock::time_point();
+  }
+
+  // blocks until the deadline of the next tick
+  void wait() {
+    auto now = Clock::now();
+    if (_deadline == Clock::time_point()) {
+      _deadline = now;
+    }
+
+    if (now < _deadline) {
+      std::this_thread::sleep_until(_deadline);
+    } else if (now - _deadline >= _period) {
+      if (_stats) {
+        _stats->lateTicks++;
+      }
+
+      auto lag = now - _deadline;
+      if (lag > _maxLag) {
+        auto skipped = lag / _period;
+        _deadline += skipped * _period;
+        if (_stats) {
+          _stats->skippedTicks += skipped;
+        }
+      }
+    }
+
+    _deadline += _period;
+    if (_stats) {
+      _stats->ticks++;
+    }
+  }
+
+private:
+  Clock::duration _period;
+  Clock::duration _maxLag;
+  Clock::time_point _deadline{};
+  std::shared_ptr<TickStats> _stats;
+};
@@ -0,0 +1,145 @@
+#include "WavFileDecoder.h"
+
+#include <algorithm>
+#include <cstring>
+
+#include <common_audio/include/audio_util.h>
+
+namespace {
+
+class WavHeaderFileReader : public webrtc::WavHeaderReader {
+public:
+  explicit WavHeaderFileReader(webrtc::FileWrapper &file) : _file(file) {}
+
+  size_t Read(void *buf, size_t num_bytes) override {
+    auto count = _file.Read(buf, num_bytes);
+    _position += count;
+    return count;
+  }
+
+  bool SeekForward(uint32_t num_bytes) override {
+    if (!_file.SeekRelative(num_bytes)) {
+      return false;
+    }
+    _position += num_bytes;
+    return true;
+  }
+
+  int64_t GetPosition() override {
+    return _position;
+  }
+
+private:
+  webrtc::FileWrapper &_file;
+  int64_t _position = 0;
+};
+
+size_t greatestCommonDivisor(size_t a, size_t b) {
+  while (b != 0) {
+    auto rest = a % b;
+    a = b;
+    b = rest;
+  }
+  return a;
+}
+
+}  // namespace
+
+WavFileDecoder::WavFileDecoder(webrtc::FileWrapper file) : AudioFileDecoder(std::move(file)) {}
+
+bool WavFileDecoder::decode() {
+  auto frames = std::min(_chunkFrames, _unreadSamples / _numChannels);
+  if (frames == 0) {
+    return false;
+  }
+
+  auto frameSize = _numChannels * _bytesPerSample;
+  _chunk.resize(frames * frameSize);
+  frames = _file.Read(_chunk.data(), _chunk.size()) / frameSize;
+  if (frames == 0) {
+    // data chunk is shorter than the header says
+    _unreadSamples = 0;
+    return false;
+  }
+  _unreadSamples -= frames * _numChannels;
+
+  // the last chunk is padded with silence for the resampler, the padding is cut from its output
+  auto outputFrames = frames;
+  if (!_resamplers.empty()) {
+    outputFrames = (frames * _resampledChunkFrames + _chunkFrames - 1) / _chunkFrames;
+  }
+
+  auto outputChannels = std::min(_numChannels, kNumChannels);
+  _pcm.assign(outputFrames * kNumChannels, 0);
+  for (size_t channel = 0; channel < outputChannels; channel++) {
+    _channelSamples.assign(_chunkFrames, 0);
+    for (size_t i = 0; i < frames; i++) {
+      auto sample = _chunk.data() + (i * _numChannels + channel) * _bytesPerSample;
+      if (_format == webrtc::WavFormat::kWavFormatIeeeFloat) {
+        float value;
+        memcpy(&value, sample, sizeof(value));
+        _channelSamples[i] = webrtc::FloatToS16(value);
+      } else {
+        memcpy(&_channelSamples[i], sample, sizeof(int16_t));
+      }
+    }
+
+    auto samples = _channelSamples.data();
+    if (!_resamplers.empty()) {
+      _resampledSamples.resize(_resampledChunkFrames);
+      _resamplers[channel]->Resample(
+          _channelSamples.data(), _chunkFrames, _resampledSamples.data(), _resampledChunkFrames);
+      samples = _resampledSamples.data();
+    }
+
+    for (size_t i = 0; i < outputFrames; i++) {
+      _pcm[i * kNumChannels + channel] = samples[i];
+    }
+  }
+
+  if (outputChannels == 1) {
+    for (size_t i = 0; i < outputFrames; i++) {
+      _pcm[i * kNumChannels + 1] = _pcm[i * kNumChannels];
+    }
+  }
+
+  return true;
+}
+
+bool WavFileDecoder::reset() {
+  if (!_file.Rewind()) {
+    return false;
+  }
+
+  WavHeaderFileReader reader(_file);
+  size_t numSamples;
+  if (!webrtc::ReadWavHeader(
+      &reader, &_numChannels, &_sampleRate, &_format, &_bytesPerSample, &numSamples, &_dataStartPosition)) {
+    return false;
+  }
+  if (!(_format == webrtc::WavFormat::kWavFormatPcm && _bytesPerSample == sizeof(int16_t))
+      && !(_format == webrtc::WavFormat::kWavFormatIeeeFloat && _bytesPerSample == sizeof(float))) {
+    return false;
+  }
+  if (!_file.SeekTo(_dataStartPosition)) {
+    return false;
+  }
+  _unreadSamples = numSamples;
+
+  // 10 ms, or the shortest part with whole count of frames before and after resampling
+  _resamplers.clear();
+  _chunkFrames = _sampleRate / 100;
+  if (_sampleRate != kSampleRate) {
+    auto divisor = greatestCommonDivisor(_sampleRate, kSampleRate);
+    auto sourceFrames = _sampleRate / divisor;
+    auto multiplier = std::max<size_t>(1, (_chunkFrames + sourceFrames - 1) / sourceFrames);
+
+    _chunkFrames = sourceFrames * multiplier;
+    _resampledChunkFrames = kSampleRate / divisor * multiplier;
+    for (size_t channel = 0; channel < std::min(_numChannels, kNumChannels); channel++) {
+      _resamplers.push_back(std::make_unique<webrtc::PushSincResampler>(_chunkFrames, _resampledChunkFrames));
+    }
+  }
+
+  return true;
+}
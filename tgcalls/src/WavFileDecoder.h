@@ -0,0 +1,39 @@
+#pragma once
+
+#include <memory>
+#include <vector>
+
+#include <common_audio/resampler/push_sinc_resampler.h>
+#include <common_audio/wav_header.h>
+
+#include "AudioFileDecoder.h"
+
+// 16 bit PCM and float WAV files of any sample rate. Mono is played on both channels,
+// only the first two channels of multichannel files are played
+class WavFileDecoder : public AudioFileDecoder {
+public:
+  explicit WavFileDecoder(webrtc::FileWrapper file);
+
+protected:
+  bool decode() override;
+
+  bool reset() override;
+
+private:
+  size_t _numChannels = 0;
+  int _sampleRate = 0;
+  webrtc::WavFormat _format = webrtc::WavFormat::kWavFormatPcm;
+  size_t _bytesPerSample = 0;
+  int64_t _dataStartPosition = 0;
+  // of all channels
+  size_t _unreadSamples = 0;
+
+  // frames of the file decoded at once. Resampler takes exactly this count
+  size_t _chunkFrames = 0;
+  size_t _resampledChunkFrames = 0;
+  std::vector<std::unique_ptr<webrtc::PushSincResampler>> _resamplers;
+
+  std::vector<uint8_t> _chunk;
+  std::vector<int16_t> _channelSamples;
+  std::vector<int16_t> _resampledSamples;
+};
@@ -0,0 +1,50 @@
+#include "WavFileEncoder.h"
+
+#include <algorithm>
+#include <limits>
+
+#include <common_audio/wav_header.h>
+
+// the size field of WAV is 32 bit. Longer recordings are written, but their header is capped (about 6 hours)
+const size_t kMaxHeaderSamples =
+    (std::numeric_limits<uint32_t>::max() - webrtc::kPcmWavHeaderSize) / sizeof(int16_t)
+    / AudioFileEncoder::kNumChannels * AudioFileEncoder::kNumChannels;
+
+WavFileEncoder::WavFileEncoder(webrtc::FileWrapper file) : AudioFileEncoder(std::move(file)) {}
+
+bool WavFileEncoder::write(const int8_t *data, size_t size) {
+  // samples of a failed write aren't counted, so the header and the next seek match the written data
+  if (!append(data, size)) {
+    return false;
+  }
+
+  _numSamples += size / sizeof(int16_t);
+  return true;
+}
+
+bool WavFileEncoder::start() {
+  return writeHeader(true);
+}
+
+bool WavFileEncoder::finish() {
+  return _file.Rewind() && writeHeader(false);
+}
+
+bool WavFileEncoder::updateHeaders() {
+  return finish() && _file.SeekTo(webrtc::kPcmWavHeaderSize + _numSamples * sizeof(int16_t));
+}
+
+bool WavFileEncoder::writeHeader(bool isAppended) {
+  uint8_t header[webrtc::MaxWavHeaderSize()];
+  size_t headerSize;
+  webrtc::WriteWavHeader(
+      kNumChannels,
+      kSampleRate,
+      webrtc::WavFormat::kWavFormatPcm,
+      std::min(_numSamples, kMaxHeaderSamples),
+      header,
+      &headerSize);
+
+  // the first header counts in the file size, later it's overwritten
+  return isAppended ? append(header, headerSize) : _file.Write(header, headerSize);
+}
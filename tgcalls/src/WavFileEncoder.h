@@ -0,0 +1,24 @@
+#pragma once
+
+#include "AudioFileEncoder.h"
+
+// 16 bit PCM WAV. The header is written with zero length first, updated on sync and completed on close
+class WavFileEncoder : public AudioFileEncoder {
+public:
+  explicit WavFileEncoder(webrtc::FileWrapper file);
+
+  bool write(const int8_t *data, size_t size) override;
+
+protected:
+  bool start() override;
+
+  bool finish() override;
+
+  bool updateHeaders() override;
+
+private:
+  bool writeHeader(bool isAppended);
+
+  // of all channels
+  size_t _numSamples = 0;
+};
@@ -4,8 +4,10 @@
 #include <pybind11/smart_holder.h>
 #include <pybind11/stl.h>
 #include <pybind11/functional.h>
+#include <pybind11/numpy.h>
 
 #include "NativeInstance.h"
+#include "PythonBuffer.h"
 
 namespace py = pybind11;
 
@@ -17,6 +19,9 @@ PYBIND11_TYPE_CASTER_BASE_HOLDER(T, std::unique_ptr<T>)
 
 PYBIND11_SMART_HOLDER_TYPE_CASTERS(FileAudioDeviceDescriptor)
 PYBIND11_SMART_HOLDER_TYPE_CASTERS(RawAudioDeviceDescriptor)
+PYBIND11_SMART_HOLDER_TYPE_CASTERS(AudioRingBuffer)
+PYBIND11_SMART_HOLDER_TYPE_CASTERS(TickStats)
+PYBIND11_SMART_HOLDER_TYPE_CASTERS(AudioOutputStats)
 
 PYBIND11_TYPE_CASTER_BASE_HOLDER(FileAudioDeviceDescriptor, std::shared_ptr<FileAudioDeviceDescriptor)
 PYBIND11_TYPE_CASTER_BASE_HOLDER(RawAudioDeviceDescriptor, std::shared_ptr<RawAudioDeviceDescriptor>)
@@ -81,21 +86,143 @@ PYBIND11_MODULE(tgcalls, m) {
             .def_readwrite("ssrcs", &tgcalls::GroupJoinPayloadVideoSourceGroup::ssrcs)
             .def_readwrite("semantics", &tgcalls::GroupJoinPayloadVideoSourceGroup::semantics);
 
+    py::enum_<AudioFileFormat>(m, "AudioFileFormat")
+            .value("Raw", AudioFileFormat::Raw)
+            .value("Wav", AudioFileFormat::Wav)
+            .value("OggOpus", AudioFileFormat::OggOpus);
+
+    py::enum_<AudioOutputSyncPolicy>(m, "AudioOutputSyncPolicy")
+            .value("Never", AudioOutputSyncPolicy::Never)
+            .value("OnClose", AudioOutputSyncPolicy::OnClose)
+            .value("Periodic", AudioOutputSyncPolicy::Periodic);
+
     py::classh<FileAudioDeviceDescriptor>(m, "FileAudioDeviceDescriptor")
             .def(py::init<>())
-            .def_readwrite("getInputFilename", &FileAudioDeviceDescriptor::_getInputFilename)
-            .def_readwrite("getOutputFilename", &FileAudioDeviceDescriptor::_getOutputFilename)
-            .def_readwrite("isEndlessPlayout", &FileAudioDeviceDescriptor::_isEndlessPlayout)
-            .def_readwrite("isPlayoutPaused", &FileAudioDeviceDescriptor::_isPlayoutPaused)
-            .def_readwrite("isRecordingPaused", &FileAudioDeviceDescriptor::_isRecordingPaused)
-            .def_readwrite("playoutEndedCallback", &FileAudioDeviceDescriptor::_playoutEndedCallback);
+            .def_property("inputFilename", &FileAudioDeviceDescriptor::getInputFilename, &FileAudioDeviceDescriptor::setInputFilename)
+            .def_property("outputFilename", &FileAudioDeviceDescriptor::getOutputFilename, &FileAudioDeviceDescriptor::setOutputFilename)
+            .def_property("outputFormat", &FileAudioDeviceDescriptor::getOutputFormat, &FileAudioDeviceDescriptor::setOutputFormat)
+            .def_property("isEndlessPlayout", [](const FileAudioDeviceDescriptor &self) {
+                return self._isEndlessPlayout.load();
+            }, [](FileAudioDeviceDescriptor &self, bool value) {
+                self._isEndlessPlayout = value;
+            })
+            .def_property("isPlayoutPaused", [](const FileAudioDeviceDescriptor &self) {
+                return self._isPlayoutPaused.load();
+            }, [](FileAudioDeviceDescriptor &self, bool value) {
+                self._isPlayoutPaused = value;
+            })
+            .def_property("isRecordingPaused", [](const FileAudioDeviceDescriptor &self) {
+                return self._isRecordingPaused.load();
+            }, [](FileAudioDeviceDescriptor &self, bool value) {
+                self._isRecordingPaused = value;
+            })
+            .def_readwrite("playoutEndedCallback", &FileAudioDeviceDescriptor::_playoutEndedCallback)
+            .def("enqueueInputFilename", &FileAudioDeviceDescriptor::enqueueInputFilename)
+            .def("clearPlaylist", &FileAudioDeviceDescriptor::clearPlaylist)
+            .def_property_readonly("playlist", &FileAudioDeviceDescriptor::getPlaylist)
+            .def_readonly("playoutTickStats", &FileAudioDeviceDescriptor::_playoutTickStats)
+            .def_readonly("recordingTickStats", &FileAudioDeviceDescriptor::_recordingTickStats)
+            .def_property("outputBufferMs", [](const FileAudioDeviceDescriptor &self) {
+                return self._outputBufferMs.load();
+            }, [](FileAudioDeviceDescriptor &self, int value) {
+                self._outputBufferMs = value;
+            })
+            .def_property("outputSyncPolicy", [](const FileAudioDeviceDescriptor &self) {
+                return self._outputSyncPolicy.load();
+            }, [](FileAudioDeviceDescriptor &self, AudioOutputSyncPolicy value) {
+                self._outputSyncPolicy = value;
+            })
+            .def_property("outputSyncIntervalMs", [](const FileAudioDeviceDescriptor &self) {
+                return self._outputSyncIntervalMs.load();
+            }, [](FileAudioDeviceDescriptor &self, int value) {
+                self._outputSyncIntervalMs = value;
+            })
+            .def_property("outputSegmentDurationMs", [](const FileAudioDeviceDescriptor &self) {
+                return self._outputSegmentDurationMs.load();
+            }, [](FileAudioDeviceDescriptor &self, int value) {
+                self._outputSegmentDurationMs = value;
+            })
+            .def_property("outputSegmentMaxBytes", [](const FileAudioDeviceDescriptor &self) {
+                return self._outputSegmentMaxBytes.load();
+            }, [](FileAudioDeviceDescriptor &self, uint64_t value) {
+                self._outputSegmentMaxBytes = value;
+            })
+            .def_property("outputBitrateKbit", [](const FileAudioDeviceDescriptor &self) {
+                return self._outputBitrateKbit.load();
+            }, [](FileAudioDeviceDescriptor &self, int value) {
+                self._outputBitrateKbit = value;
+            })
+            .def_readwrite("recordingSegmentCompletedCallback", &FileAudioDeviceDescriptor::_recordingSegmentCompletedCallback)
+            .def_readonly("outputStats", &FileAudioDeviceDescriptor::_outputStats);
 
     py::classh<RawAudioDeviceDescriptor>(m, "RawAudioDeviceDescriptor")
             .def(py::init<>())
+            .def_readonly_static("sampleRate", &RawAudioDeviceDescriptor::kSampleRate)
+            .def_readonly_static("channels", &RawAudioDeviceDescriptor::kNumChannels)
             .def_readwrite("setRecordedBufferCallback", &RawAudioDeviceDescriptor::_setRecordedBufferCallback)
             .def_readwrite("getPlayedBufferCallback", &RawAudioDeviceDescriptor::_getPlayedBufferCallback)
-            .def_readwrite("isPlayoutPaused", &RawAudioDeviceDescriptor::_isPlayoutPaused)
-            .def_readwrite("isRecordingPaused", &RawAudioDeviceDescriptor::_isRecordingPaused);
+            .def_readwrite("setRecordedBufferViewCallback", &RawAudioDeviceDescriptor::_setRecordedBufferViewCallback)
+            .def_readwrite("getPlayedBufferViewCallback", &RawAudioDeviceDescriptor::_getPlayedBufferViewCallback)
+            .def_readwrite("inputRingBuffer", &RawAudioDeviceDescriptor::_inputRingBuffer)
+            .def_readwrite("inputSpaceCallback", &RawAudioDeviceDescriptor::_inputSpaceCallback)
+            .def_readwrite("callbackPeriodMs", &RawAudioDeviceDescriptor::_callbackPeriodMs)
+            .def_readonly("playoutTickStats", &RawAudioDeviceDescriptor::_playoutTickStats)
+            .def_readonly("recordingTickStats", &RawAudioDeviceDescriptor::_recordingTickStats)
+            .def_property("isPlayoutPaused", [](const RawAudioDeviceDescriptor &self) {
+                return self._isPlayoutPaused.load();
+            }, [](RawAudioDeviceDescriptor &self, bool value) {
+                self._isPlayoutPaused = value;
+            })
+            .def_property("isRecordingPaused", [](const RawAudioDeviceDescriptor &self) {
+                return self._isRecordingPaused.load();
+            }, [](RawAudioDeviceDescriptor &self, bool value) {
+                self._isRecordingPaused = value;
+            });
+
+    py::classh<AudioRingBuffer>(m, "AudioRingBuffer")
+            .def(py::init<size_t>())
+            .def("write", [](AudioRingBuffer &self, const py::object &data) {
+                PythonBuffer buffer(data);
+                return self.write(buffer.data(), buffer.size());
+            })
+            .def("clear", &AudioRingBuffer::clear)
+            .def("requestSpaceNotification", &AudioRingBuffer::requestSpaceNotification)
+            .def_property_readonly("capacity", &AudioRingBuffer::capacity)
+            .def_property_readonly("available", &AudioRingBuffer::available)
+            .def_property_readonly("freeSpace", &AudioRingBuffer::freeSpace)
+            .def_property_readonly("underruns", &AudioRingBuffer::underruns)
+            .def_property_readonly("underrunBytes", &AudioRingBuffer::underrunBytes);
+
+    py::classh<TickStats>(m, "TickStats")
+            .def_property_readonly("ticks", [](const TickStats &self) {
+                return self.ticks.load();
+            })
+            .def_property_readonly("lateTicks", [](const TickStats &self) {
+                return self.lateTicks.load();
+            })
+            .def_property_readonly("skippedTicks", [](const TickStats &self) {
+                return self.skippedTicks.load();
+            });
+
+    py::classh<AudioOutputStats>(m, "AudioOutputStats")
+            .def_property_readonly("writtenBytes", [](const AudioOutputStats &self) {
+                return self.writtenBytes.load();
+            })
+            .def_property_readonly("droppedBytes", [](const AudioOutputStats &self) {
+                return self.droppedBytes.load();
+            })
+            .def_property_readonly("syncs", [](const AudioOutputStats &self) {
+                return self.syncs.load();
+            })
+            .def_property_readonly("completedSegments", [](const AudioOutputStats &self) {
+                return self.completedSegments.load();
+            })
+            .def_property_readonly("lagMs", [](const AudioOutputStats &self) {
+                return self.lagMs.load();
+            })
+            .def_property_readonly("maxLagMs", [](const AudioOutputStats &self) {
+                return self.maxLagMs.load();
+            });
 
     py::class_<tgcalls::GroupInstanceInterface::AudioDevice>(m, "AudioDevice")
             .def_readwrite("name", &tgcalls::GroupInstanceInterface::AudioDevice::name)
@@ -114,6 +241,37 @@ PYBIND11_MODULE(tgcalls, m) {
             .value("GroupConnectionModeBroadcast", tgcalls::GroupConnectionMode::GroupConnectionModeBroadcast)
             .export_values();
 
+    // None disables outgoing video, it's not a choice for pytgcalls
+    py::enum_<tgcalls::VideoContentType>(m, "VideoContentType")
+            .value("Generic", tgcalls::VideoContentType::Generic)
+            .value("Screencast", tgcalls::VideoContentType::Screencast);
+
+    py::enum_<PixelFormat>(m, "PixelFormat")
+            .value("I420", PixelFormat::I420)
+            .value("NV12", PixelFormat::NV12)
+            .value("BGR", PixelFormat::BGR)
+            .value("RGBA", PixelFormat::RGBA);
+
+    py::class_<tgcalls::MediaSsrcGroup>(m, "MediaSsrcGroup")
+            .def(py::init<>())
+            .def_readwrite("semantics", &tgcalls::MediaSsrcGroup::semantics)
+            .def_readwrite("ssrcs", &tgcalls::MediaSsrcGroup::ssrcs);
+
+    py::class_<tgcalls::VideoChannelDescription> videoChannelDescription(m, "VideoChannelDescription");
+
+    py::enum_<tgcalls::VideoChannelDescription::Quality>(videoChannelDescription, "Quality")
+            .value("Thumbnail", tgcalls::VideoChannelDescription::Quality::Thumbnail)
+            .value("Medium", tgcalls::VideoChannelDescription::Quality::Medium)
+            .value("Full", tgcalls::VideoChannelDescription::Quality::Full);
+
+    videoChannelDescription
+            .def(py::init<>())
+            .def_readwrite("audioSsrc", &tgcalls::VideoChannelDescription::audioSsrc)
+            .def_readwrite("endpointId", &tgcalls::VideoChannelDescription::endpointId)
+            .def_readwrite("ssrcGroups", &tgcalls::VideoChannelDescription::ssrcGroups)
+            .def_readwrite("minQuality", &tgcalls::VideoChannelDescription::minQuality)
+            .def_readwrite("maxQuality", &tgcalls::VideoChannelDescription::maxQuality);
+
     py::class_<NativeInstance>(m, "NativeInstance")
             .def(py::init<bool, string>())
             .def("startCall", &NativeInstance::startCall)
@@ -136,6 +294,13 @@ PYBIND11_MODULE(tgcalls, m) {
             .def("setJoinResponsePayload", &NativeInstance::setJoinResponsePayload)
             .def("setConnectionMode", &NativeInstance::setConnectionMode)
             .def("setVideoCapture", &NativeInstance::setVideoCapture)
+            .def("setOutgoingVideoBitrate", &NativeInstance::setOutgoingVideoBitrate)
+            .def("setStaticVideoFrame", &NativeInstance::setStaticVideoFrame)
+            .def("clearStaticVideoFrame", &NativeInstance::clearStaticVideoFrame)
+            .def("addIncomingVideoOutput", &NativeInstance::addIncomingVideoOutput)
+            .def("removeIncomingVideoOutput", &NativeInstance::removeIncomingVideoOutput)
+            .def("setRequestedVideoChannels", &NativeInstance::setRequestedVideoChannels)
+            .def_readonly("videoTickStats", &NativeInstance::_videoTickStats)
             .def("emitJoinPayload", &NativeInstance::emitJoinPayload)
             .def("receiveSignalingData", &NativeInstance::receiveSignalingData)
             .def("setSignalingDataEmittedCallback", &NativeInstance::setSignalingDataEmittedCallback);
@@ -1,25 +1,131 @@
 #include "PythonSource.h"
 
+#include <algorithm>
 
-PythonSource::PythonSource(std::function<std::string()> getNextFrameBuffer, float fps, int width, int height):
-  _fps(fps), _width(width), _height(height) {
+#include "../PythonBuffer.h"
+
+
+PythonSource::PythonSource(std::function<py::object()> getNextFrameBuffer, float fps, int width, int height,
+                           PixelFormat pixelFormat, int requiredWidth, int requiredHeight):
+  _fps(fps), _width(width), _height(height), _pixelFormat(pixelFormat),
+  _required_width(requiredWidth > 0 ? requiredWidth : kDefaultRequiredWidth),
+  _required_height(requiredHeight > 0 ? requiredHeight : kDefaultRequiredHeight) {
   _getNextFrameBuffer = std::move(getNextFrameBuffer);
 }
 
 webrtc::VideoFrame PythonSource::next_frame() {
-  auto *frame = new std::string{_getNextFrameBuffer()};
+  rtc::scoped_refptr<webrtc::VideoFrameBuffer> buffer;
+  {
+    std::lock_guard<std::mutex> lock(_staticFrameMutex);
+    buffer = _staticFrame;
+  }
+
+  if (!buffer) {
+    // libyuv reads the Python buffer in place, so the object must stay alive and locked until conversion ends
+    py::gil_scoped_acquire acquire;
+
+    try {
+      buffer = toBuffer(_getNextFrameBuffer ? _getNextFrameBuffer() : py::none());
+    } catch (py::error_already_set &e) {
+      // there is nobody to catch it on the video thread
+      e.discard_as_unraisable("video frame callback");
+      buffer = toBuffer(py::none());
+    }
+  }
+
+  return webrtc::VideoFrame::Builder()
+  .set_video_frame_buffer(buffer)
+  .build();
+}
 
+void PythonSource::setStaticFrame(const py::object &frame) {
+  auto buffer = toBuffer(frame);
+
+  std::lock_guard<std::mutex> lock(_staticFrameMutex);
+  _staticFrame = std::move(buffer);
+}
+
+void PythonSource::clearStaticFrame() {
+  std::lock_guard<std::mutex> lock(_staticFrameMutex);
+  _staticFrame = nullptr;
+}
+
+rtc::scoped_refptr<webrtc::VideoFrameBuffer> PythonSource::toBuffer(const py::object &frame) const {
   rtc::scoped_refptr<webrtc::I420Buffer> buffer = webrtc::I420Buffer::Create(_width, _height);
 
-  libyuv::ABGRToI420((uint8_t *) frame->data(), _width * 4,
-                     buffer->MutableDataY(), buffer->StrideY(),
+  int rows = 0;
+  if (!frame.is_none()) {
+    PythonBuffer view(frame);
+    rows = convert((const uint8_t *) view.data(), view.size(), buffer.get());
+  }
+
+  if (rows < _height) {
+    // same black as webrtc::I420Buffer::SetBlack
+    libyuv::I420Rect(buffer->MutableDataY(), buffer->StrideY(),
                      buffer->MutableDataU(), buffer->StrideU(),
                      buffer->MutableDataV(), buffer->StrideV(),
-                     _width, _height);
+                     0, rows, _width, _height - rows, 0, 128, 128);
+  }
 
-  delete frame;
+  return buffer->Scale(_required_width, _required_height);
+}
 
-  return webrtc::VideoFrame::Builder()
-  .set_video_frame_buffer(buffer->Scale(_required_width, _required_height))
-  .build();
+int PythonSource::convert(const uint8_t *data, size_t size, webrtc::I420Buffer *buffer) const {
+  int chromaWidth = (_width + 1) / 2;
+  int chromaHeight = (_height + 1) / 2;
+  size_t lumaSize = (size_t) _width * _height;
+
+  switch (_pixelFormat) {
+    case PixelFormat::I420: {
+      // planar frames can't be converted partially
+      if (size < lumaSize + (size_t) chromaWidth * chromaHeight * 2) {
+        return 0;
+      }
+      const uint8_t *u = data + lumaSize;
+      const uint8_t *v = u + chromaWidth * chromaHeight;
+      libyuv::I420Copy(data, _width, u, chromaWidth, v, chromaWidth,
+                       buffer->MutableDataY(), buffer->StrideY(),
+                       buffer->MutableDataU(), buffer->StrideU(),
+                       buffer->MutableDataV(), buffer->StrideV(),
+                       _width, _height);
+      return _height;
+    }
+    case PixelFormat::NV12: {
+      if (size < lumaSize + (size_t) chromaWidth * 2 * chromaHeight) {
+        return 0;
+      }
+      libyuv::NV12ToI420(data, _width, data + lumaSize, chromaWidth * 2,
+                         buffer->MutableDataY(), buffer->StrideY(),
+                         buffer->MutableDataU(), buffer->StrideU(),
+                         buffer->MutableDataV(), buffer->StrideV(),
+                         _width, _height);
+      return _height;
+    }
+    case PixelFormat::BGR: {
+      // B, G, R bytes in memory are RGB24 in terms of libyuv
+      int rows = std::min(_height, (int) (size / (_width * 3)));
+      if (rows) {
+        libyuv::RGB24ToI420(data, _width * 3,
+                            buffer->MutableDataY(), buffer->StrideY(),
+                            buffer->MutableDataU(), buffer->StrideU(),
+                            buffer->MutableDataV(), buffer->StrideV(),
+                            _width, rows);
+      }
+      return rows;
+    }
+    case PixelFormat::RGBA: {
+      // R, G, B, A bytes in memory are ABGR in terms of libyuv
+      int rows = std::min(_height, (int) (size / (_width * 4)));
+      if (rows) {
+        libyuv::ABGRToI420(data, _width * 4,
+                           buffer->MutableDataY(), buffer->StrideY(),
+                           buffer->MutableDataU(), buffer->StrideU(),
+                           buffer->MutableDataV(), buffer->StrideV(),
+                           _width, rows);
+      }
+      return rows;
+    }
+  }
+
+  return 0;
 }
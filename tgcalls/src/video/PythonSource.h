@@ -2,26 +2,57 @@
 
 #include <functional>
 #include <memory>
+#include <mutex>
 #include <string>
 #include <api/scoped_refptr.h>
 #include <api/video/video_frame.h>
 #include <api/video/i420_buffer.h>
 #include <libyuv.h>
+#include <pybind11/pybind11.h>
 
+namespace py = pybind11;
+
+
+// layout of frames returned from Python. Planes of YUV formats go one after another without padding
+enum class PixelFormat {
+  I420,
+  NV12,
+  BGR,
+  RGBA,
+};
 
 class PythonSource {
 public:
-  PythonSource(std::function<std::string()>, float, int, int);
+  // frames are scaled to the target size for the encoder. 0 means the default one
+  PythonSource(std::function<py::object()>, float, int, int, PixelFormat, int = 0, int = 0);
   ~PythonSource() = default;
 
   webrtc::VideoFrame next_frame();
 
+  // static frame mode. The frame is converted once and sent until it's cleared or replaced, Python isn't called.
+  // Must be called with the GIL
+  void setStaticFrame(const py::object &frame);
+  void clearStaticFrame();
+
 private:
-  std::function<std::string()> _getNextFrameBuffer = nullptr;
+  // returns frame as any object with buffer protocol (bytes, bytearray, memoryview, NumPy array) or None
+  std::function<py::object()> _getNextFrameBuffer = nullptr;
   float _fps;
   int _width;
   int _height;
+  PixelFormat _pixelFormat;
+
+  std::mutex _staticFrameMutex;
+  rtc::scoped_refptr<webrtc::VideoFrameBuffer> _staticFrame = nullptr;
+
+  // converts and scales the frame to the required size. Missing rows are black. Must be called with the GIL
+  rtc::scoped_refptr<webrtc::VideoFrameBuffer> toBuffer(const py::object &frame) const;
+  // returns count of converted rows
+  int convert(const uint8_t *data, size_t size, webrtc::I420Buffer *buffer) const;
+
+  static constexpr int kDefaultRequiredWidth = 1280;
+  static constexpr int kDefaultRequiredHeight = 720;
 
-  int _required_width = 1280;
-  int _required_height = 720;
+  int _required_width;
+  int _required_height;
 };
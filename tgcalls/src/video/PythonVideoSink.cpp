@@ -0,0 +1,184 @@
+#include "PythonVideoSink.h"
+
+#include <algorithm>
+#include <vector>
+#include <rtc_base/time_utils.h>
+
+// a frame is decoded while the previous one is delivered, more just adds latency
+const size_t kMaxQueuedFrames = 2;
+
+
+PythonVideoSink::PythonVideoSink(Callback onFrame, float fps, int maxWidth, int maxHeight, PixelFormat pixelFormat):
+  _onFrame(std::move(onFrame)), _periodUs(fps > 0 ? (int64_t) (rtc::kNumMicrosecsPerSec / fps) : 0),
+  _maxWidth(maxWidth), _maxHeight(maxHeight), _pixelFormat(pixelFormat), _thread(&PythonVideoSink::run, this) {}
+
+PythonVideoSink::~PythonVideoSink() {
+  {
+    std::lock_guard<std::mutex> lock(_framesMutex);
+    _isStopping = true;
+    _frames.clear();
+  }
+  _condition.notify_one();
+
+  if (PyGILState_Check()) {
+    // the frame being delivered waits for the GIL held by this thread
+    py::gil_scoped_release release;
+    _thread.join();
+  } else {
+    _thread.join();
+  }
+}
+
+bool PythonVideoSink::take(int64_t nowUs) {
+  std::lock_guard<std::mutex> lock(_mutex);
+  if (nowUs < _nextFrameUs) {
+    return false;
+  }
+
+  // the next deadline is counted from the previous one, so jitter of incoming frames doesn't lower fps.
+  // After a gap it starts over
+  _nextFrameUs += _periodUs;
+  if (_nextFrameUs <= nowUs) {
+    _nextFrameUs = nowUs + _periodUs;
+  }
+  return true;
+}
+
+void PythonVideoSink::fit(int width, int height, int &outWidth, int &outHeight) const {
+  double scale = 1;
+  if (_maxWidth > 0 && width > _maxWidth) {
+    scale = std::min(scale, (double) _maxWidth / width);
+  }
+  if (_maxHeight > 0 && height > _maxHeight) {
+    scale = std::min(scale, (double) _maxHeight / height);
+  }
+
+  outWidth = width;
+  outHeight = height;
+  if (scale < 1) {
+    // even sides keep chroma planes aligned
+    outWidth = std::max(2, (int) (width * scale) & ~1);
+    outHeight = std::max(2, (int) (height * scale) & ~1);
+  }
+}
+
+void PythonVideoSink::OnFrame(const webrtc::VideoFrame &frame) {
+  if (!take(rtc::TimeMicros())) {
+    return;
+  }
+
+  rtc::scoped_refptr<webrtc::I420BufferInterface> source = frame.video_frame_buffer()->ToI420();
+  if (!source) {
+    return;
+  }
+  if (frame.rotation() != webrtc::kVideoRotation_0) {
+    source = webrtc::I420Buffer::Rotate(*source, frame.rotation());
+  }
+
+  int width, height;
+  fit(source->width(), source->height(), width, height);
+  if (width != source->width() || height != source->height()) {
+    rtc::scoped_refptr<webrtc::I420Buffer> scaled = webrtc::I420Buffer::Create(width, height);
+    scaled->ScaleFrom(*source);
+    source = scaled;
+  }
+
+  int chromaWidth = (width + 1) / 2;
+  int chromaHeight = (height + 1) / 2;
+  size_t lumaSize = (size_t) width * height;
+
+  // converted without the GIL. The array takes ownership of the memory on the delivery thread
+  std::vector<py::ssize_t> shape;
+  std::unique_ptr<std::vector<uint8_t>> data(new std::vector<uint8_t>());
+  switch (_pixelFormat) {
+    case PixelFormat::I420: {
+      data->resize(lumaSize + (size_t) chromaWidth * chromaHeight * 2);
+      uint8_t *u = data->data() + lumaSize;
+      uint8_t *v = u + chromaWidth * chromaHeight;
+      libyuv::I420Copy(source->DataY(), source->StrideY(),
+                       source->DataU(), source->StrideU(),
+                       source->DataV(), source->StrideV(),
+                       data->data(), width, u, chromaWidth, v, chromaWidth,
+                       width, height);
+      shape = {(py::ssize_t) data->size()};
+      break;
+    }
+    case PixelFormat::NV12: {
+      data->resize(lumaSize + (size_t) chromaWidth * 2 * chromaHeight);
+      libyuv::I420ToNV12(source->DataY(), source->StrideY(),
+                         source->DataU(), source->StrideU(),
+                         source->DataV(), source->StrideV(),
+                         data->data(), width, data->data() + lumaSize, chromaWidth * 2,
+                         width, height);
+      shape = {(py::ssize_t) data->size()};
+      break;
+    }
+    case PixelFormat::BGR: {
+      data->resize(lumaSize * 3);
+      // B, G, R bytes in memory are RGB24 in terms of libyuv
+      libyuv::I420ToRGB24(source->DataY(), source->StrideY(),
+                          source->DataU(), source->StrideU(),
+                          source->DataV(), source->StrideV(),
+                          data->data(), width * 3, width, height);
+      shape = {height, width, 3};
+      break;
+    }
+    case PixelFormat::RGBA: {
+      data->resize(lumaSize * 4);
+      // R, G, B, A bytes in memory are ABGR in terms of libyuv
+      libyuv::I420ToABGR(source->DataY(), source->StrideY(),
+                         source->DataU(), source->StrideU(),
+                         source->DataV(), source->StrideV(),
+                         data->data(), width * 4, width, height);
+      shape = {height, width, 4};
+      break;
+    }
+  }
+
+  push({std::move(data), std::move(shape), width, height});
+}
+
+void PythonVideoSink::push(Frame frame) {
+  {
+    std::lock_guard<std::mutex> lock(_framesMutex);
+    if (_isStopping) {
+      return;
+    }
+    if (_frames.size() >= kMaxQueuedFrames) {
+      _frames.pop_front();
+    }
+    _frames.push_back(std::move(frame));
+  }
+  _condition.notify_one();
+}
+
+void PythonVideoSink::run() {
+  while (true) {
+    Frame frame;
+    {
+      std::unique_lock<std::mutex> lock(_framesMutex);
+      _condition.wait(lock, [this] { return _isStopping || !_frames.empty(); });
+      if (_isStopping) {
+        return;
+      }
+
+      frame = std::move(_frames.front());
+      _frames.pop_front();
+    }
+
+    py::gil_scoped_acquire acquire;
+
+    auto data = frame.data.release();
+    py::capsule owner(data, [](void *p) {
+      delete reinterpret_cast<std::vector<uint8_t> *>(p);
+    });
+    py::array_t<uint8_t> array(frame.shape, data->data(), owner);
+
+    try {
+      _onFrame(std::move(array), frame.width, frame.height);
+    } catch (py::error_already_set &e) {
+      // there is nobody to catch it on the delivery thread
+      e.discard_as_unraisable("incoming video frame callback");
+    }
+  }
+}
@@ -0,0 +1,67 @@
+#pragma once
+
+#include <condition_variable>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+#include <api/video/video_frame.h>
+#include <api/video/video_sink_interface.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+
+#include "PythonSource.h"
+
+namespace py = pybind11;
+
+
+// Passes incoming video of an endpoint to Python. Frames are decimated, scaled down and converted on the decoder
+// thread, so Python gets only frames which it asked for. The callback is called on its own thread, the decoder
+// thread never waits for the GIL. When Python is too slow, the oldest waiting frame is dropped.
+class PythonVideoSink : public rtc::VideoSinkInterface<webrtc::VideoFrame> {
+public:
+  // frame as NumPy array, its width and height. I420 and NV12 frames are flat arrays with planes one after another,
+  // BGR and RGBA ones have (height, width, channels) shape
+  using Callback = std::function<void(py::array, int, int)>;
+
+  // zero fps means every frame, zero width or height means no limit for the side
+  PythonVideoSink(Callback, float, int, int, PixelFormat);
+
+  // waiting frames are dropped, the thread is joined
+  ~PythonVideoSink() override;
+
+  void OnFrame(const webrtc::VideoFrame &) override;
+
+private:
+  struct Frame {
+    std::unique_ptr<std::vector<uint8_t>> data;
+    std::vector<py::ssize_t> shape;
+    int width = 0;
+    int height = 0;
+  };
+
+  Callback _onFrame;
+  int64_t _periodUs;
+  int _maxWidth;
+  int _maxHeight;
+  PixelFormat _pixelFormat;
+
+  std::mutex _mutex;
+  int64_t _nextFrameUs = 0;
+
+  std::mutex _framesMutex;
+  std::condition_variable _condition;
+  std::deque<Frame> _frames;
+  bool _isStopping = false;
+
+  // the last one, it's started when the rest is initialized
+  std::thread _thread;
+
+  bool take(int64_t nowUs);
+  void fit(int width, int height, int &outWidth, int &outHeight) const;
+  void push(Frame frame);
+  void run();
+};
@@ -1,21 +1,23 @@
-#include <system_wrappers/include/sleep.h>
+#include <rtc_base/time_utils.h>
 
 #include "PythonVideoTrackSource.h"
 
 
 class PythonVideoSource : public rtc::VideoSourceInterface<webrtc::VideoFrame> {
 public:
-  PythonVideoSource(std::unique_ptr<PythonSource> source, int fps) {
-    // TODO rewrite this thread
+  PythonVideoSource(std::shared_ptr<PythonSource> source, float fps, std::shared_ptr<TickStats> stats) {
     _data = std::make_shared<Data>();
     _data->is_running = true;
 
-    std::thread([fps, data = _data, source = std::move(source)] {
+    // frames later than one period are skipped, so the stream keeps its duration
+    auto period = std::chrono::duration_cast<TickScheduler::Clock::duration>(std::chrono::duration<double>(1 / fps));
+    std::thread([scheduler = TickScheduler(period, period, std::move(stats)), data = _data,
+                 source = std::move(source)]() mutable {
       std::uint32_t step = 0;
       while (data->is_running) {
+        scheduler.wait();
         step++;
 
-        int64_t current_time = rtc::TimeMillis();
         auto frame = source->next_frame();
 
         frame.set_id(static_cast<std::uint16_t>(step));
@@ -24,11 +26,6 @@ public:
         if (data->is_running) {
           data->broadcaster.OnFrame(frame);
         }
-
-        int64_t delta_time_millis = rtc::TimeMillis() - current_time;
-        if (delta_time_millis < 1000 / fps) {
-          webrtc::SleepMs(1000 / fps - delta_time_millis);
-        }
       }
     }).detach();
   }
@@ -60,12 +57,14 @@ private:
 
 class PythonVideoSourceImpl : public webrtc::VideoTrackSource {
 public:
-  static rtc::scoped_refptr<PythonVideoSourceImpl> Create(std::unique_ptr<PythonSource> source, float fps) {
-    return rtc::scoped_refptr<PythonVideoSourceImpl>(new rtc::RefCountedObject<PythonVideoSourceImpl>(std::move(source), fps));
+  static rtc::scoped_refptr<PythonVideoSourceImpl> Create(std::shared_ptr<PythonSource> source, float fps,
+                                                          std::shared_ptr<TickStats> stats) {
+    return rtc::scoped_refptr<PythonVideoSourceImpl>(
+        new rtc::RefCountedObject<PythonVideoSourceImpl>(std::move(source), fps, std::move(stats)));
   }
 
-  explicit PythonVideoSourceImpl(std::unique_ptr<PythonSource> source, float fps) :
-    VideoTrackSource(false), source_(std::move(source), fps) {
+  explicit PythonVideoSourceImpl(std::shared_ptr<PythonSource> source, float fps, std::shared_ptr<TickStats> stats) :
+    VideoTrackSource(false), source_(std::move(source), fps, std::move(stats)) {
   }
 
 protected:
@@ -75,13 +74,15 @@ protected:
   }
 };
 
-std::function<webrtc::VideoTrackSourceInterface*()> PythonVideoTrackSource::create(std::unique_ptr<PythonSource> frame_source, float fps) {
-  auto source = PythonVideoSourceImpl::Create(std::move(frame_source), fps);
+std::function<webrtc::VideoTrackSourceInterface*()> PythonVideoTrackSource::create(std::shared_ptr<PythonSource> frame_source, float fps,
+                                                                                    std::shared_ptr<TickStats> stats) {
+  auto source = PythonVideoSourceImpl::Create(std::move(frame_source), fps, std::move(stats));
   return [source] {
     return source.get();
   };
 }
 
-rtc::scoped_refptr<webrtc::VideoTrackSourceInterface> PythonVideoTrackSource::createPtr(std::unique_ptr<PythonSource> frame_source, float fps) {
-  return PythonVideoSourceImpl::Create(std::move(frame_source), fps);
+rtc::scoped_refptr<webrtc::VideoTrackSourceInterface> PythonVideoTrackSource::createPtr(std::shared_ptr<PythonSource> frame_source, float fps,
+                                                                                        std::shared_ptr<TickStats> stats) {
+  return PythonVideoSourceImpl::Create(std::move(frame_source), fps, std::move(stats));
 }
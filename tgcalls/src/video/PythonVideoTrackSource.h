@@ -9,6 +9,7 @@
 #include <libyuv.h>
 
 #include "PythonSource.h"
+#include "../TickScheduler.h"
 
 namespace webrtc {
   class VideoTrackSourceInterface;
@@ -17,6 +18,8 @@ namespace webrtc {
 
 class PythonVideoTrackSource {
 public:
-  static std::function<webrtc::VideoTrackSourceInterface*()> create(std::unique_ptr<PythonSource> source, float fps);
-  static rtc::scoped_refptr<webrtc::VideoTrackSourceInterface> createPtr(std::unique_ptr<PythonSource> source, float fps);
+  static std::function<webrtc::VideoTrackSourceInterface*()> create(std::shared_ptr<PythonSource> source, float fps,
+                                                                    std::shared_ptr<TickStats> stats = nullptr);
+  static rtc::scoped_refptr<webrtc::VideoTrackSourceInterface> createPtr(std::shared_ptr<PythonSource> source, float fps,
+                                                                         std::shared_ptr<TickStats> stats = nullptr);
 };
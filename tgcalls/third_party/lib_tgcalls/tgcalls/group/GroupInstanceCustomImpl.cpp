@@ -1344,6 +1344,7 @@ public:
     _outgoingAudioBitrateKbit(descriptor.outgoingAudioBitrateKbit),
     _disableOutgoingAudioProcessing(descriptor.disableOutgoingAudioProcessing),
     _minOutgoingVideoBitrateKbit(descriptor.minOutgoingVideoBitrateKbit),
+    _maxOutgoingVideoBitrateKbit(descriptor.maxOutgoingVideoBitrateKbit),
     _videoContentType(descriptor.videoContentType),
     _videoCodecPreferences(std::move(descriptor.videoCodecPreferences)),
     _eventLog(std::make_unique<webrtc::RtcEventLogNull>()),
@@ -2400,6 +2401,13 @@ public:
             } else {
                 preferences.max_bitrate_bps = std::max(preferences.min_bitrate_bps, (1020 + 32) * 1000);
             }
+            // pytgcalls: 0 keeps the default max
+            if (_maxOutgoingVideoBitrateKbit > 0) {
+                preferences.max_bitrate_bps = std::max(preferences.min_bitrate_bps, _maxOutgoingVideoBitrateKbit * 1024);
+                if (preferences.start_bitrate_bps > preferences.max_bitrate_bps) {
+                    preferences.start_bitrate_bps = preferences.max_bitrate_bps;
+                }
+            }
         } else {
             preferences.min_bitrate_bps = 32000;
             if (resetStartBitrate) {
@@ -3324,6 +3332,12 @@ public:
         adjustBitratePreferences(false);
     }
 
+    void setOutgoingVideoBitrate(int minKbit, int maxKbit) {
+        _minOutgoingVideoBitrateKbit = minKbit;
+        _maxOutgoingVideoBitrateKbit = maxKbit;
+        adjustBitratePreferences(false);
+    }
+
     void setVolume(uint32_t ssrc, double volume) {
         auto current = _volumeBySsrc.find(ssrc);
         if (current != _volumeBySsrc.end() && std::abs(current->second - volume) < 0.0001) {
@@ -3466,6 +3480,8 @@ private:
     int _outgoingAudioBitrateKbit{32};
     bool _disableOutgoingAudioProcessing{false};
     int _minOutgoingVideoBitrateKbit{100};
+    // 0 is the default limit
+    int _maxOutgoingVideoBitrateKbit{0};
     VideoContentType _videoContentType{VideoContentType::None};
     std::vector<VideoCodecName> _videoCodecPreferences;
 
@@ -3664,6 +3680,12 @@ void GroupInstanceCustomImpl::addIncomingVideoOutput(std::string const &endpoint
     });
 }
 
+void GroupInstanceCustomImpl::setOutgoingVideoBitrate(int minKbit, int maxKbit) {
+    _internal->perform(RTC_FROM_HERE, [minKbit, maxKbit](GroupInstanceCustomInternal *internal) {
+        internal->setOutgoingVideoBitrate(minKbit, maxKbit);
+    });
+}
+
 void GroupInstanceCustomImpl::setVolume(uint32_t ssrc, double volume) {
     _internal->perform(RTC_FROM_HERE, [ssrc, volume](GroupInstanceCustomInternal *internal) {
         internal->setVolume(ssrc, volume);
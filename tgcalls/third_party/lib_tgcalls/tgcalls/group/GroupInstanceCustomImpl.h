@@ -42,6 +42,7 @@ public:
     void addIncomingVideoOutput(std::string const &endpointId, std::weak_ptr<rtc::VideoSinkInterface<webrtc::VideoFrame>> sink);
     
     void setVolume(uint32_t ssrc, double volume);
+    void setOutgoingVideoBitrate(int minKbit, int maxKbit);
     void setRequestedVideoChannels(std::vector<VideoChannelDescription> &&requestedVideoChannels);
 
     void getStats(std::function<void(GroupInstanceStats)> completion);
@@ -159,6 +159,8 @@ struct GroupInstanceDescriptor {
     std::vector<VideoCodecName> videoCodecPreferences;
     std::function<std::shared_ptr<RequestMediaChannelDescriptionTask>(std::vector<uint32_t> const &, std::function<void(std::vector<MediaChannelDescription> &&)>)> requestMediaChannelDescriptions;
     int minOutgoingVideoBitrateKbit{100};
+    // 0 is the default limit
+    int maxOutgoingVideoBitrateKbit{0};
 };
 
 template <typename T>